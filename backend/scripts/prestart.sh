@@ -2,3 +2,6 @@
 
 # Create initial data in DB
 python /app/src/initial_data.py
+
+# Move Redis keys to the hash tagged layout, skipped once done
+python -m src.cache.key_migration
@@ -3,4 +3,4 @@ set -e
 
 sh /prestart.sh
 
-exec gunicorn -k uvicorn.workers.UvicornWorker -c gunicorn_conf.py src.main:app
+exec gunicorn -k src.core.uvicorn_worker.UvicornWorker -c gunicorn_conf.py src.main:app
@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from typing import List
 
-from src import schemas
+from fastapi import APIRouter, Depends, Query
+
+from src import models, schemas
+from src.api import deps
+from src.cache.lifecycle import key_lifecycle
 from src.core.config import settings
 
 router = APIRouter()
@@ -9,3 +13,10 @@ router = APIRouter()
 @router.get("/version/")
 async def version() -> schemas.Version:
     return schemas.Version(version=settings.PROJECT_VERSION)
+
+
+@router.get("/redis/memory/")
+async def redis_memory_report(
+    samples: int = Query(100, ge=1, le=10000), user: models.User = Depends(deps.get_user)
+) -> List[schemas.RedisKeyFamilyReport]:
+    return await key_lifecycle.report(samples)
@@ -40,6 +40,7 @@ async def load_test_recollect(
     await collector.path_cache.clear_path_cache()
     await collector.clear_collected_load_tests_cache()
     await crud.script_history.clear_history(db)
+    await crud.load_test_history.clear_history(db)
     await crud.load_test.clear(db)
     await collector.collect_and_save_load_tests_in_db(db)
     await collector.prime_collected_cache(db)
@@ -2,7 +2,7 @@ import asyncio
 import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends, WebSocket
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import crud, models
@@ -69,7 +69,9 @@ async def get_script_history_records(script_id: str) -> ScriptHistoryDisplay:
 
 @router.get("/{script_id}/{execution_id}/")
 async def get_one_script_history(script_id: str, execution_id: str) -> ScriptFullHistory:
-    return await Reporter(script_id=script_id).get_script_history(execution_id)
+    if not (history := await Reporter(script_id=script_id).get_script_history(execution_id)):
+        raise HTTPException(status_code=404, detail="Item not found")
+    return history
 
 
 @router.post("/run/")
@@ -2,7 +2,7 @@ import asyncio
 import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,7 +13,7 @@ from src.modules.auto_test.collector import Collector
 from src.modules.auto_test.manager import TestManager
 from src.modules.auto_test.reporter import Reporter
 from src.modules.environment.env import prime_environment_cache
-from src.schemas.auto_test.auto_test_history import AutoTestHistory, TestResultTree
+from src.schemas.auto_test.auto_test_history import AutoTestHistory, TestResultTree, TestResultTreeChanges
 from src.schemas.auto_test.test_run import StartTestRunRequest, StartTestRunResponse, TestRun
 from src.schemas.environment import AutoTestEnv, AutoTestEnvUpdate, AutoTestEnvUpdateRequest, EnvEnum
 from src.tasks import run_tests
@@ -53,8 +53,9 @@ async def get_test_runs(root_folder: str, env: EnvEnum, db: AsyncSession = Depen
 
 @router.get("/test_run/statistic/{test_run_id}")
 async def get_test_run_statistic(test_run_id: str) -> TestRun:
-    reporter = Reporter(test_run_id)
-    return await reporter.get_test_run_statistic()
+    if not (test_run := await Reporter(test_run_id).get_test_run_statistic()):
+        raise HTTPException(status_code=404, detail="Item not found")
+    return test_run
 
 
 @router.get("/test_run/{test_run_id}/test/{auto_test_id}")
@@ -68,8 +69,16 @@ async def get_test_run_item(test_run_id: str, auto_test_id: str) -> AutoTestHist
 
 @router.get("/test_run/tree/{test_run_id}")
 async def get_test_run_tree(test_run_id: str) -> TestResultTree:
-    reporter = Reporter(test_run_id)
-    return await reporter.get_test_run_tree()
+    if not (tree := await Reporter(test_run_id).get_test_run_tree()):
+        raise HTTPException(status_code=404, detail="Item not found")
+    return tree
+
+
+@router.get("/test_run/tree/{test_run_id}/changes/")
+async def get_test_run_tree_changes(test_run_id: str, since: int = Query(ge=0)) -> TestResultTreeChanges:
+    if not (changes := await Reporter(test_run_id).get_test_run_tree_changes(since)):
+        raise HTTPException(status_code=404, detail="Item not found")
+    return changes
 
 
 @router.get("/stat/")
@@ -4,3 +4,4 @@ from .auto_test.auto_test_history_stages import AutoTestHistoryStagesCache
 from .auto_test.auto_test_paths import AutoTestPathsCache
 from .auto_test.auto_test_tags import AutoTestTagsCache
 from .auto_test.test_run import TestRunCache
+from .auto_test.test_run_tree import TestRunTreeCache
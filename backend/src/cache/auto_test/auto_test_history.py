@@ -1,8 +1,8 @@
-import asyncio
-from typing import List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from src.cache.base import CacheBase
-from src.schemas.auto_test.auto_test_history import AutoTestHistory, AutoTestHistoryUpdate
+from src.cache.keys import hash_tag
+from src.schemas.auto_test.auto_test_history import AutoTestHistory, AutoTestHistoryUpdate, StatusEnum
 
 
 class AutoTestHistoryCache(CacheBase[AutoTestHistory, AutoTestHistoryUpdate]):
@@ -10,14 +10,55 @@ class AutoTestHistoryCache(CacheBase[AutoTestHistory, AutoTestHistoryUpdate]):
         self.run_id = run_id
         super().__init__(AutoTestHistory)
 
+    def get_key(self, test_id: str) -> str:
+        return f"{hash_tag(self.run_id)}:autotest:{test_id}"
+
     async def create(self, data: AutoTestHistory):
-        await self._save_model(f"{self.run_id}:autotest:{data.test_id}", data)
+        await self._save_model(self.get_key(data.test_id), data)
+
+    async def create_multi(self, data: List[AutoTestHistory]):
+        await self._save_models_many({self.get_key(history.test_id): history for history in data})
 
     async def get(self, test_id: str) -> AutoTestHistory | None:
-        return await self._get_model(f"{self.run_id}:autotest:{test_id}")
+        return await self._get_model(self.get_key(test_id))
 
     async def get_multi(self, test_ids: List[str]) -> List[AutoTestHistory]:
-        return await asyncio.gather(*[self.get(test_id) for test_id in test_ids])
+        return await self._get_models_many([self.get_key(test_id) for test_id in test_ids])
 
     async def update(self, test_id: str, data: AutoTestHistoryUpdate):
-        return await self._update_model(f"{self.run_id}:autotest:{test_id}", data)
+        return await self._update_model(self.get_key(test_id), data)
+
+    async def transition_status(
+        self,
+        test_id: str,
+        status: StatusEnum,
+        counter_keys: List[str],
+        final_statuses: Iterable[StatusEnum] = (),
+        journal: Tuple[str, Dict[str, Any]] | None = None,
+    ) -> int:
+        return await self._transition_status(
+            self.get_key(test_id),
+            "status",
+            self._encode_status(status),
+            status,
+            counter_keys,
+            final_statuses,
+            journal,
+        )
+
+    async def transition_status_many(
+        self,
+        transitions: List[Tuple[str, StatusEnum, List[str], Tuple[str, Dict[str, Any]] | None]],
+        final_statuses: Iterable[StatusEnum] = (),
+    ) -> List[int]:
+        """Transitions (test id, status, counter keys, journal) in one pipeline, the results are in the same order"""
+        return await self._transition_status_many(
+            [
+                (self.get_key(test_id), "status", self._encode_status(status), status, *rest)
+                for test_id, status, *rest in transitions
+            ],
+            final_statuses,
+        )
+
+    def _encode_status(self, status: StatusEnum) -> str:
+        return self.converter.encode_to_dict(AutoTestHistoryUpdate(status=status), exclude_unset=True)["status"]
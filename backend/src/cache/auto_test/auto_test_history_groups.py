@@ -1,7 +1,7 @@
-import asyncio
 from typing import Dict, List
 
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.schemas.auto_test.auto_test_history import AutoTestGroup
 from src.schemas.auto_test.common import ResultByStatus
 
@@ -16,20 +16,37 @@ class AutoTestHistoryGroupsCache(CacheBase[AutoTestGroup, AutoTestGroup]):
         result_by_status = group.result_by_status.model_dump()
         group.result_by_status = None
         group_dict = self.converter.encode_to_dict(group)
-        await self._save_dict(f"{self.run_id}:groups:{group_id}:info", group_dict)
-        await self._save_dict(f"{self.run_id}:groups:{group_id}:result", result_by_status)
+        async with self.pipeline():
+            await self._save_dict(f"{hash_tag(self.run_id)}:groups:{group_id}:info", group_dict)
+            await self._save_dict(f"{hash_tag(self.run_id)}:groups:{group_id}:result", result_by_status)
 
     async def get(self, group_name: str) -> AutoTestGroup:
-        group = await self._get_model(f"{self.run_id}:groups:{group_name}:info")
-        result_by_status = await self._get_decoded_dict(f"{self.run_id}:groups:{group_name}:result")
-        group.result_by_status = ResultByStatus(**result_by_status)
-        return group
+        return (await self.get_multi([group_name]))[0]
 
     async def create_multi(self, data: Dict[str, AutoTestGroup]):
-        await asyncio.gather(*[self.create(group_id, group) for group_id, group in data.items()])
+        async with self.pipeline():
+            for group_id, group in data.items():
+                await self.create(group_id, group)
 
     async def get_multi(self, groups: List[str]) -> List[AutoTestGroup]:
-        return await asyncio.gather(*[self.get(group_name) for group_name in groups])
+        keys = [
+            f"{hash_tag(self.run_id)}:groups:{group_name}:{part}"
+            for group_name in groups
+            for part in ("info", "result")
+        ]
+        results = await self._get_dicts_many(keys)
+        multi = []
+        for info, result_by_status in zip(results[::2], results[1::2]):
+            group = self.converter.decode_from_dict(info)
+            group.result_by_status = ResultByStatus(**self.converter.decode_dict(result_by_status))
+            multi.append(group)
+        return multi
+
+    def get_result_key(self, group_name: str) -> str:
+        return f"{hash_tag(self.run_id)}:groups:{group_name}:result"
+
+    def get_keys(self, group_name: str) -> List[str]:
+        return [f"{hash_tag(self.run_id)}:groups:{group_name}:info", self.get_result_key(group_name)]
 
     async def increment_by(self, group_name: str, status_name: str, value: int):
-        await self._increment_value_in_dict(f"{self.run_id}:groups:{group_name}:result", status_name, value)
+        await self._increment_value_in_dict(self.get_result_key(group_name), status_name, value)
@@ -1,4 +1,7 @@
+from typing import Dict, List
+
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.schemas.auto_test.auto_test_history import AutoTestStages, StageResult
 
 
@@ -7,18 +10,31 @@ class AutoTestHistoryStagesCache(CacheBase[StageResult, StageResult]):
         self.run_id = run_id
         super().__init__(StageResult)
 
+    def get_key(self, test_id: str) -> str:
+        return f"{hash_tag(self.run_id)}:autotest:{test_id}:stages"
+
     async def create_multi(self, test_id: str, data: AutoTestStages):
         data = {k: self.converter.encode_to_str(data) for k, v in data.model_dump().items()}
-        await self._save_dict(f"{self.run_id}:autotest:{test_id}:stages", data)
+        await self._save_dict(self.get_key(test_id), data)
 
     async def update(self, test_id: str, stage_name: str, data: StageResult):
         data = self.converter.encode_to_str(data)
-        await self._update_key_value_in_dict(f"{self.run_id}:autotest:{test_id}:stages", stage_name, data)
+        await self._update_key_value_in_dict(self.get_key(test_id), stage_name, data)
+
+    async def update_many(self, test_id: str, data: Dict[str, StageResult]):
+        data = {stage_name: self.converter.encode_to_str(result) for stage_name, result in data.items()}
+        await self._save_dict(self.get_key(test_id), data)
 
     async def get(self, test_id: str, stage_name: str) -> StageResult:
-        return await self._get_key_value_from_dict(f"{self.run_id}:autotest:{test_id}:stages", stage_name)
+        return await self._get_key_value_from_dict(self.get_key(test_id), stage_name)
 
-    async def get_all(self, test_id: str) -> AutoTestStages:
-        result = await self._get_dict(f"{self.run_id}:autotest:{test_id}:stages")
+    def _decode_stages(self, result: dict) -> AutoTestStages:
         data = {k.decode("UTF-8"): self.converter.decode_from_bytes(v) for k, v in result.items()}
         return AutoTestStages(**data)
+
+    async def get_all(self, test_id: str) -> AutoTestStages:
+        return self._decode_stages(await self._get_dict(self.get_key(test_id)))
+
+    async def get_all_multi(self, test_ids: List[str]) -> List[AutoTestStages]:
+        results = await self._get_dicts_many([self.get_key(test_id) for test_id in test_ids])
+        return [self._decode_stages(result) for result in results]
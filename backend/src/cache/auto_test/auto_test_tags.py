@@ -29,13 +29,14 @@ class AutoTestTagsCache(CacheBase[Dict, Dict]):
         await self._add_to_set(f"{self.root_key}:{root_folder}:{tag}", *test_ids)
 
     async def save_tags(self, tests: List[AutoTest], collected_root_folders: List[str]):
-        await self.clear_all_tags(collected_root_folders)
         sorted_tests = sorted(tests, key=lambda x: x.root_folder)
         tests_by_folder = {k: list(v) for k, v in groupby(sorted_tests, key=attrgetter("root_folder"))}
-        for root_folder, tests in tests_by_folder.items():
-            tests_by_tag = self._classes_to_tag_dict(tests)
-            for tag, tests in tests_by_tag.items():
-                await self._save_tag(root_folder, tag, [test.id for test in tests])
+        async with self.pipeline():
+            await self.clear_all_tags(collected_root_folders)
+            for root_folder, tests in tests_by_folder.items():
+                tests_by_tag = self._classes_to_tag_dict(tests)
+                for tag, tests in tests_by_tag.items():
+                    await self._save_tag(root_folder, tag, [test.id for test in tests])
 
     async def get_by_tags(self, tags: List[str], root_folder: str) -> List[str]:
         data = await asyncio.gather(*[self._get_set(f"{self.root_key}:{root_folder}:{tag}") for tag in tags])
@@ -43,8 +44,10 @@ class AutoTestTagsCache(CacheBase[Dict, Dict]):
 
     async def delete_by_folder(self, root_folder: str):
         tags = await self._get_set(f"{self.root_key}:{root_folder}")
-        tags and await asyncio.gather(*[self._delete_key(f"{self.root_key}:{root_folder}:{tag}") for tag in tags])
-        await self._delete_key(f"{self.root_key}:{root_folder}")
+        async with self.pipeline():
+            for tag in tags or []:
+                await self._delete_key(f"{self.root_key}:{root_folder}:{tag}")
+            await self._delete_key(f"{self.root_key}:{root_folder}")
 
     async def clear_all_tags(self, collected_root_folders: List[str]):
         await asyncio.gather(*[self.delete_by_folder(root_folder) for root_folder in collected_root_folders])
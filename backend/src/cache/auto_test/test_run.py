@@ -1,7 +1,11 @@
+from typing import List
+
 from fastapi import WebSocket
 from pydantic import BaseModel
 
 from src.cache.base import CacheBase, Event, EventChannel, EventType, RedisChannel
+from src.cache.keys import hash_tag
+from src.schemas.auto_test.auto_test_history import TestResultTreeChange
 from src.schemas.auto_test.common import ResultByStatus
 from src.schemas.auto_test.test_run import TestRun, TestRunStatus, TestRunUpdate
 
@@ -9,31 +13,36 @@ from src.schemas.auto_test.test_run import TestRun, TestRunStatus, TestRunUpdate
 class TestRunCache(CacheBase[TestRun, TestRunUpdate]):
     def __init__(self, run_id: str):
         self.run_id = run_id
-        self.root_key = f"{run_id}:info"
+        self.root_key = f"{hash_tag(run_id)}:info"
+        self.result_key = f"{self.root_key}:result"
         super().__init__(TestRun)
 
     async def create(self, data: TestRun):
         data = data.model_copy()
         result_by_status = data.result_by_status.model_dump()
         data.result_by_status = None
-        await self._save_model(self.root_key, data)
-        await self._save_dict(f"{self.root_key}:result", result_by_status)
-
-    async def get(self) -> TestRun:
-        test_run = await self._get_model(self.root_key)
-        result_by_status = await self._get_decoded_dict(f"{self.root_key}:result")
-        test_run.result_by_status = ResultByStatus(**result_by_status)
+        async with self.pipeline():
+            await self._save_model(self.root_key, data)
+            await self._save_dict(self.result_key, result_by_status)
+
+    async def get(self) -> TestRun | None:
+        test_run, result_by_status = await self._get_dicts_many([self.root_key, self.result_key])
+        # Keys of finished runs expire after RUN_REDIS_RETENTION
+        if not test_run:
+            return None
+        test_run = self.converter.decode_from_dict(test_run)
+        test_run.result_by_status = ResultByStatus(**self.converter.decode_dict(result_by_status))
         return test_run
 
-    async def get_status(self) -> TestRunStatus:
+    async def get_status(self) -> TestRunStatus | None:
         status = await self._get_value_from_model(self.root_key, "status")
-        return TestRunStatus(status)
+        return TestRunStatus(status) if status else None
 
     async def update(self, update: TestRunUpdate):
         await self._update_model(self.root_key, update)
 
     async def increment_by(self, status_name: str, value: int):
-        await self._increment_value_in_dict(f"{self.root_key}:result", status_name, value)
+        await self._increment_value_in_dict(self.result_key, status_name, value)
 
 
 class TestRunEventData(BaseModel):
@@ -46,9 +55,18 @@ class TestRunEvent(Event):
     data: TestRunEventData
 
 
+class TestRunTreeEvent(Event):
+    channel: EventChannel = EventChannel.test_run
+    type: EventType = EventType.tree
+    data: TestResultTreeChange
+
+
 class TestRunChannel(RedisChannel):
+    # Consumed by API clients that expect an event per frame
+    COALESCE_MESSAGES = False
+
     def __init__(self, run_id: str):
-        self.key = f"{run_id}:channel"
+        self.key = f"{hash_tag(run_id)}:channel"
 
     async def update(self, status: TestRunStatus):
         event = TestRunEvent(type=EventType.update, data=TestRunEventData(status=status))
@@ -58,5 +76,11 @@ class TestRunChannel(RedisChannel):
         event = TestRunEvent(type=EventType.current, data=TestRunEventData(status=status))
         await self._write(self.key, event.model_dump_json())
 
+    async def update_tree(self, change: TestResultTreeChange):
+        await self._write(self.key, TestRunTreeEvent(data=change).model_dump_json())
+
+    async def update_tree_many(self, changes: List[TestResultTreeChange]):
+        await self._write_many(self.key, [TestRunTreeEvent(data=change).model_dump_json() for change in changes])
+
     async def proxy_to_ws(self, websocket: WebSocket):
         await super()._proxy_to_ws(self.key, websocket)
@@ -0,0 +1,24 @@
+import json
+from typing import Any, List
+
+from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
+
+
+class TestRunShardsCache(CacheBase[Any, Any]):
+    """Test ids of every shard of a run and the number of shards that didn't finish yet"""
+
+    def __init__(self, run_id: str):
+        self.key = f"{hash_tag(run_id)}:shards"
+        super().__init__()
+
+    async def create(self, shards: List[List[str]]):
+        data = {str(index): json.dumps(test_ids) for index, test_ids in enumerate(shards)}
+        await self._save_dict(self.key, {"remaining": len(shards), **data})
+
+    async def get(self, index: int) -> List[str]:
+        return json.loads(await self._get_value_from_dict(self.key, str(index)))
+
+    async def finish(self) -> bool:
+        """True for the shard that finished last"""
+        return await self._increment_value_in_dict(self.key, "remaining", -1) == 0
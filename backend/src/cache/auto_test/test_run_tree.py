@@ -0,0 +1,69 @@
+import json
+from typing import Any, Dict, List
+
+from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
+from src.schemas.auto_test.auto_test_history import CachedTestResultTree, StatusEnum, TestResultTreeChange
+
+
+class TestRunTreeCache(CacheBase[CachedTestResultTree, CachedTestResultTree]):
+    """
+    The result tree of a run is built once and kept with the version of the last change applied to it.
+    Status transitions of the tests are appended to the journal by the transition script, the version is the length
+    of the journal. A read applies only the journal entries after the cached version.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.key = f"{hash_tag(run_id)}:tree"
+        self.journal_key = f"{hash_tag(run_id)}:tree:journal"
+        super().__init__(CachedTestResultTree)
+
+    @staticmethod
+    def get_journal_entry(test_id: str, groups: List[str]) -> Dict[str, Any]:
+        return {"item": test_id, "groups": groups}
+
+    @staticmethod
+    def to_change(version: int, entry: Dict[str, Any]) -> TestResultTreeChange:
+        status, old = StatusEnum(entry["status"]), entry["old"] and StatusEnum(entry["old"])
+        increments = {status: 1, old: -1} if old else {status: 1}
+        return TestResultTreeChange(
+            version=version,
+            items={entry["item"]: status},
+            groups={group_id: increments for group_id in entry["groups"]},
+        )
+
+    async def create(self, tree: CachedTestResultTree):
+        async with self._get_writer() as conn:
+            await conn.delete(self.journal_key)
+            await conn.set(self.key, tree.model_dump_json())
+
+    async def get_changes(self, since: int) -> List[TestResultTreeChange]:
+        async with self._get_redis() as conn:
+            entries = await conn.lrange(self.journal_key, since, -1)
+        return [self.to_change(version, json.loads(entry)) for version, entry in enumerate(entries, since + 1)]
+
+    async def get(self) -> CachedTestResultTree | None:
+        async with self._get_redis() as conn:
+            async with conn.pipeline(transaction=False) as pipe:
+                pipe.get(self.key)
+                pipe.llen(self.journal_key)
+                cached, version = await pipe.execute()
+        if not cached:
+            return None
+        cached = CachedTestResultTree.model_validate_json(cached)
+        if cached.version < version:
+            for change in await self.get_changes(cached.version):
+                self.apply(cached, change)
+            # Trees stored concurrently are all consistent with their versions, the newest one doesn't matter
+            await self._create_key(self.key, cached.model_dump_json())
+        return cached
+
+    @staticmethod
+    def apply(cached: CachedTestResultTree, change: TestResultTreeChange):
+        for test_id, status in change.items.items():
+            cached.tree.items[test_id].status = status
+        for group_id, increments in change.groups.items():
+            for status, value in increments.items():
+                cached.tree.groups[group_id].result_by_status.increment_by(status, value)
+        cached.version = max(cached.version, change.version)
@@ -1,39 +1,167 @@
 import asyncio
+import hashlib
+import json
+from collections import defaultdict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from enum import StrEnum
-from typing import Any, AsyncGenerator, AsyncIterator, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi import WebSocket
 from pydantic import BaseModel
 from redis.asyncio import Redis
+from redis.exceptions import NoScriptError
 
-from src.cache.connection import redis
+from src.cache.channel_hub import CHANNEL_SHUTDOWN_SIGNAL, channel_hubs, queue_stream_expire, queue_stream_message
+from src.cache.client_cache import client_cache
+from src.cache.connection import get_pipeline, redis
 from src.cache.converter import PydanticRedisConverter
+from src.cache.keys import get_key_index
+from src.cache.websocket_coalescer import WebSocketCoalescer
+from src.core.config import settings
 
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
-async def redis_key_exist_with_wait(
-    conn: Redis, key: str, wait_seconds: float = 5.0, poll_timeout: float = 0.5
-) -> bool:
-    try:
-        async with asyncio.timeout(wait_seconds):
-            while True:
-                if await conn.exists(key):
-                    return True
-                else:
-                    await asyncio.sleep(poll_timeout)
-    except TimeoutError:
-        return False
+class RedisBatch:
+    """Write commands queued within CacheBase.pipeline, sent as non-transactional pipelines of max_size commands"""
 
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.commands: List[Tuple[str, tuple, dict]] = []
 
-async def delete_key_with_delay(conn: Redis, key: str, delay_seconds: float = 60):
-    await asyncio.sleep(delay_seconds)
-    await conn.delete(key)
+    def __getattr__(self, command: str) -> Callable[..., Coroutine[Any, Any, None]]:
+        if command.startswith("_"):
+            raise AttributeError(command)
+
+        async def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            if len(self.commands) >= self.max_size:
+                await self.execute()
+
+        return queue
+
+    async def execute(self):
+        # Commands are taken synchronously, so tasks can keep queueing while the batch is sent
+        commands, self.commands = self.commands, []
+        if not commands:
+            return
+        conn = await redis.get_connection()
+        async with conn.pipeline(transaction=False) as pipe:
+            for command, args, kwargs in commands:
+                getattr(pipe, command)(*args, **kwargs)
+            await pipe.execute()
+
+
+redis_batch: ContextVar[RedisBatch | None] = ContextVar("redis_batch", default=None)
+
+
+class RedisScript:
+    """Lua script called by its SHA, the source is sent only when the server doesn't know it yet"""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source
+        self.sha = hashlib.sha1(source.encode("UTF-8")).hexdigest()
+
+    async def __call__(self, conn: Redis, keys: List[str], args: List[Any]) -> Any:
+        try:
+            return await conn.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await conn.script_load(self.source)
+            return await conn.evalsha(self.sha, len(keys), *keys, *args)
+
+    async def call_many(self, conn: Redis, calls: List[Tuple[List[str], List[Any]]]) -> List[Any]:
+        """Calls sent in one pipeline, the ones rejected for an unknown script are sent again after loading it"""
+        async with conn.pipeline(transaction=False) as pipe:
+            for keys, args in calls:
+                pipe.evalsha(self.sha, len(keys), *keys, *args)
+            results = await pipe.execute(raise_on_error=False)
+        if missing := [i for i, result in enumerate(results) if isinstance(result, NoScriptError)]:
+            await conn.script_load(self.source)
+            for i, result in zip(missing, await self.call_many(conn, [calls[i] for i in missing])):
+                results[i] = result
+        if errors := [result for result in results if isinstance(result, Exception)]:
+            raise errors[0]
+        return results
+
+
+class RedisScriptRegistry:
+    def __init__(self):
+        self.scripts: Dict[str, RedisScript] = {}
+
+    def register(self, name: str, source: str) -> RedisScript:
+        if name in self.scripts and self.scripts[name].source != source:
+            raise ValueError(f"Redis script {name} is already registered with another source")
+        script = self.scripts[name] = RedisScript(name, source)
+        return script
+
+
+redis_scripts = RedisScriptRegistry()
+
+# KEYS: the hash with the status field, counter hashes, the journal list when there is a journal entry.
+# ARGV: field, stored value, status, JSON object of the journal entry or "", statuses that can't be left.
+# The old status is decoded from a raw value or a value written by PydanticRedisConverter (tagged or legacy).
+STATUS_TRANSITION = redis_scripts.register(
+    "status_transition",
+    """
+local function decode(value)
+    if string.sub(value, 1, 3) == "v1:" then
+        return cjson.decode(string.sub(value, 4))
+    elseif string.sub(value, 1, 1) == "[" then
+        return cjson.decode(value)[1]
+    end
+    return value
+end
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+local old = current and decode(current)
+for i = 5, #ARGV do
+    if old == ARGV[i] then
+        return 0
+    end
+end
+if old == ARGV[3] then
+    return 0
+end
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+local counters = ARGV[4] == "" and #KEYS or #KEYS - 1
+for i = 2, counters do
+    if old then
+        redis.call("HINCRBY", KEYS[i], old, -1)
+    end
+    redis.call("HINCRBY", KEYS[i], ARGV[3], 1)
+end
+if ARGV[4] == "" then
+    return 1
+end
+local entry = cjson.decode(ARGV[4])
+entry["old"] = old or cjson.null
+entry["status"] = ARGV[3]
+return redis.call("RPUSH", KEYS[#KEYS], cjson.encode(entry))
+""",
+)
 
 
 class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
+    PIPELINE_MAX_SIZE = 1000
+
     def __init__(self, model_class: Optional[Type[CreateSchemaType]] = None):
         self.converter = PydanticRedisConverter(model_class)
 
@@ -41,24 +169,52 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
     async def _get_redis(self) -> AsyncGenerator[Redis, None]:
         yield await redis.get_connection()
 
+    @asynccontextmanager
+    async def _get_writer(self) -> AsyncGenerator[Redis | RedisBatch, None]:
+        yield batch if (batch := redis_batch.get()) else await redis.get_connection()
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncGenerator[RedisBatch, None]:
+        """
+        Write helpers of all caches called within the block are queued and sent in pipelines instead of
+        one round trip per command, the rest is sent on exit. Reads still go directly to Redis and don't see
+        queued writes, and write helpers return None instead of the command result.
+        """
+        if batch := redis_batch.get():
+            yield batch
+            return
+        batch = RedisBatch(self.PIPELINE_MAX_SIZE)
+        token = redis_batch.set(batch)
+        try:
+            yield batch
+        finally:
+            redis_batch.reset(token)
+            await batch.execute()
+
     async def _create_key(self, key: str, value: Union[str, bytes]):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.set(key, value)
 
     async def _get_key(self, key: str) -> bytes:
         async with self._get_redis() as conn:
             return await conn.get(key)
 
+    async def _get_cached_key(self, key: str) -> bytes:
+        return await client_cache.aget(key, None, lambda: self._get_key(key))
+
+    async def _get_cached_decoded_dict(self, key: str) -> dict:
+        return await client_cache.aget(key, None, lambda: self._get_decoded_dict(key))
+
     async def _get_list_of_keys_from_dict(self, key: str) -> List[str]:
         async with self._get_redis() as conn:
             return await conn.hkeys(key)
 
     async def _delete_key(self, key: str):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.delete(key)
 
     async def _save_dict(self, key: str, data: Dict[str, Union[str, int, float]]):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.hset(key, mapping=data)
 
     async def _get_dict(self, key: str) -> dict:
@@ -70,11 +226,10 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
             raw_dict = await conn.hgetall(key)
             return {k.decode("UTF-8"): v.decode("UTF-8") for k, v in raw_dict.items()}
 
-    async def _get_value_from_model(self, key: str, sub_key: str) -> Any:
+    async def _get_value_from_model(self, key: str, sub_key: str) -> Any | None:
         async with self._get_redis() as conn:
             result = await conn.hmget(key, [sub_key])
-            assert len(result) == 1 and result[0] is not None, f"Incorrect data found for {key}:{sub_key}: {result}"
-            return self.converter.decode_value(result[0])
+            return self.converter.decode_value(result[0].decode("UTF-8")) if result and result[0] else None
 
     async def _get_values_from_dict(self, key: str, sub_keys: List[str]) -> List[str]:
         async with self._get_redis() as conn:
@@ -82,7 +237,7 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
             return [item.decode("UTF-8") for item in result if item]
 
     async def _delete_keys_from_dict(self, key: str, sub_keys: List[str]):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.hdel(key, *sub_keys)
 
     async def _get_value_from_dict(self, key: str, sub_key: str) -> str | None:
@@ -96,11 +251,11 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
             return self.converter.decode_from_bytes(result)
 
     async def _update_key_value_in_dict(self, key: str, sub_key: str, data: str):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.hset(key, sub_key, data)
 
-    async def _increment_value_in_dict(self, key: str, sub_key: str, value: int) -> int:
-        async with self._get_redis() as conn:
+    async def _increment_value_in_dict(self, key: str, sub_key: str, value: int) -> int | None:
+        async with self._get_writer() as conn:
             return await conn.hincrby(key, sub_key, value)
 
     async def _get_list(self, key) -> Optional[List[str | int]]:
@@ -123,7 +278,7 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
             return await conn.rpush(key, *values)
 
     async def _remove_from_list(self, key: str, value: str):
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.lrem(key, 0, value)
 
     async def _save_model(self, key: str, data: CreateSchemaType):
@@ -136,11 +291,121 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
 
     async def _update_model(self, key: str, update: UpdateSchemaType):
         update = self.converter.encode_to_dict(update, exclude_unset=True)
-        async with self._get_redis() as conn:
+        async with self._get_writer() as conn:
             await conn.hset(name=key, mapping=update)
 
-    async def _add_to_set(self, key: str, *values: str):
+    async def _save_models_many(self, data: Dict[str, CreateSchemaType]):
+        async with self.pipeline() as batch:
+            for key, model in data.items():
+                if mapping := self.converter.encode_to_dict(model):
+                    await batch.hset(key, mapping=mapping)
+
+    async def _save_dicts_many(self, data: Dict[str, Dict[str, Union[str, int, float]]]):
+        async with self.pipeline() as batch:
+            for key, mapping in data.items():
+                mapping and await batch.hset(key, mapping=mapping)
+
+    async def _hincr_many(self, increments: Dict[str, Dict[str, int]]):
+        async with self.pipeline() as batch:
+            for key, values in increments.items():
+                for sub_key, value in values.items():
+                    value and await batch.hincrby(key, sub_key, value)
+
+    async def _get_dicts_many(self, keys: List[str]) -> List[dict]:
+        if not keys:
+            return []
         async with self._get_redis() as conn:
+            async with conn.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(key)
+                return await pipe.execute()
+
+    async def _get_decoded_dicts_many(self, keys: List[str]) -> List[dict]:
+        return [self.converter.decode_dict(result) for result in await self._get_dicts_many(keys)]
+
+    async def _get_models_many(self, keys: List[str]) -> List[CreateSchemaType | None]:
+        results = await self._get_dicts_many(keys)
+        return [self.converter.decode_from_dict(result) if result else None for result in results]
+
+    async def _run_script(self, script: RedisScript, keys: List[str], args: List[Any]) -> Any:
+        # Scripts return their result right away, so they are not queued in a batch
+        async with self._get_redis() as conn:
+            return await script(conn, keys, args)
+
+    async def _run_script_many(self, script: RedisScript, calls: List[Tuple[List[str], List[Any]]]) -> List[Any]:
+        if not calls:
+            return []
+        async with self._get_redis() as conn:
+            return await script.call_many(conn, calls)
+
+    @staticmethod
+    def _get_transition_call(
+        key: str,
+        field: str,
+        value: str,
+        status: str,
+        counter_keys: List[str],
+        final_statuses: Iterable[str] = (),
+        journal: Tuple[str, Dict[str, Any]] | None = None,
+    ) -> Tuple[List[str], List[Any]]:
+        journal_key, entry = journal or (None, None)
+        keys = [key, *counter_keys, *([journal_key] if journal else [])]
+        args = [field, value, status, json.dumps(entry) if journal else "", *final_statuses]
+        return keys, args
+
+    async def _transition_status(
+        self,
+        key: str,
+        field: str,
+        value: str,
+        status: str,
+        counter_keys: List[str],
+        final_statuses: Iterable[str] = (),
+        journal: Tuple[str, Dict[str, Any]] | None = None,
+    ) -> int:
+        """
+        Sets the status field and moves one count from the old status to the new one in every counter hash
+        atomically. Nothing is changed when the status is the same or the old one is final.
+        A journal (list key, entry) gets the entry with the "old" and new "status" appended in the same call.
+        Returns 0 without a change, otherwise the length of the journal or 1.
+        """
+        keys, args = self._get_transition_call(key, field, value, status, counter_keys, final_statuses, journal)
+        return await self._run_script(STATUS_TRANSITION, keys, args)
+
+    async def _transition_status_many(
+        self,
+        transitions: List[Tuple[str, str, str, str, List[str], Tuple[str, Dict[str, Any]] | None]],
+        final_statuses: Iterable[str] = (),
+    ) -> List[int]:
+        """Transitions (key, field, value, status, counter keys, journal) in one pipeline, applied in order"""
+        calls = [
+            self._get_transition_call(key, field, value, status, counter_keys, final_statuses, journal)
+            for key, field, value, status, counter_keys, journal in transitions
+        ]
+        return await self._run_script_many(STATUS_TRANSITION, calls)
+
+    async def _add_to_key_indexes(self, keys: Iterable[str]):
+        indexes = defaultdict(set)
+        for key in keys:
+            if index := get_key_index(key):
+                indexes[index].add(key)
+        async with self.pipeline() as batch:
+            for index, index_keys in indexes.items():
+                await batch.sadd(index, *index_keys)
+
+    async def _expire_indexed_keys(self, index: str, seconds: int):
+        """
+        Sets the TTL on the keys recorded in the index and on the index itself. A shorter TTL is kept (EXPIRE LT),
+        such as the one of a closed event stream.
+        """
+        async with self._get_redis() as conn:
+            keys = [key async for key in conn.sscan_iter(index, count=1000)]
+        async with self.pipeline() as batch:
+            for key in [*keys, index]:
+                await batch.expire(key, seconds, lt=True)
+
+    async def _add_to_set(self, key: str, *values: str):
+        async with self._get_writer() as conn:
             await conn.sadd(key, *values)
 
     async def _get_set(self, key: str) -> Optional[List[str]]:
@@ -148,6 +413,11 @@ class CacheBase(Generic[CreateSchemaType, UpdateSchemaType]):
             result = await conn.smembers(key)
         return [item.decode("UTF-8") for item in result] if result else None
 
+    async def _pop_from_set(self, key: str, count: int) -> List[str]:
+        async with self._get_redis() as conn:
+            result = await conn.spop(key, count)
+        return [item.decode("UTF-8") for item in result] if result else []
+
 
 class EventChannel(StrEnum):
     test_run = "test_run"
@@ -156,6 +426,7 @@ class EventChannel(StrEnum):
 class EventType(StrEnum):
     current = "current"
     update = "update"
+    tree = "tree"
 
 
 class Event(BaseModel):
@@ -163,38 +434,67 @@ class Event(BaseModel):
 
 
 class RedisChannel:
-    CHANNEL_SHUTDOWN_SIGNAL = "SHUTDOWN"
-
-    @staticmethod
-    async def _write(key: str, message: Union[bytes, memoryview, str, int, float]):
+    CHANNEL_SHUTDOWN_SIGNAL = CHANNEL_SHUTDOWN_SIGNAL
+    # Approximate MAXLEN of the stream, channels without a snapshot keep the whole history for their listeners
+    STREAM_MAXLEN: int | None = None
+    # Listeners get the snapshot and the messages after it instead of the stream history
+    REPLAY_SNAPSHOT = False
+    # Websocket frames are JSON arrays of coalesced messages, otherwise every message is sent as its own frame
+    COALESCE_MESSAGES = True
+
+    @classmethod
+    async def _write(
+        cls, key: str, message: Union[bytes, memoryview, str, int, float], snapshot: Dict[str, str] | None = None
+    ):
         conn = await redis.get_connection()
-        await conn.xadd(key, {"data": message})
+        async with get_pipeline(conn, transaction=bool(snapshot)) as pipe:
+            queue_stream_message(pipe, key, message, cls.STREAM_MAXLEN, snapshot)
+            queue_stream_expire(pipe, [key])
+            await pipe.execute()
+
+    @classmethod
+    async def _write_many(cls, key: str, messages: List[Union[bytes, memoryview, str, int, float]]):
+        if not messages:
+            return
+        conn = await redis.get_connection()
+        async with conn.pipeline(transaction=False) as pipe:
+            for message in messages:
+                queue_stream_message(pipe, key, message, cls.STREAM_MAXLEN)
+            queue_stream_expire(pipe, [key])
+            await pipe.execute()
 
     async def _close(self, key: str):
         conn = await redis.get_connection()
-        await conn.xadd(key, {"data": self.CHANNEL_SHUTDOWN_SIGNAL})
-        asyncio.create_task(delete_key_with_delay(conn, key, delay_seconds=60 * 5))
+        async with conn.pipeline(transaction=False) as pipe:
+            queue_stream_message(pipe, key, self.CHANNEL_SHUTDOWN_SIGNAL)
+            queue_stream_expire(pipe, [key], settings.CHANNEL_CLOSED_TTL)
+            await pipe.execute()
 
     async def _listen(self, key: str) -> AsyncIterator[Union[bytes, memoryview, str, int, float]]:
-        conn = await redis.get_connection()
-        last_id = "0"
-        while True:
-            if not await redis_key_exist_with_wait(conn, key):
-                break
-            if messages := await conn.xread(streams={key: last_id}, block=0):
-                for _, entries in messages:
-                    for msg_id, message in entries:
-                        last_id = msg_id
-                        decoded_message = message[b"data"].decode("UTF-8")
-                        if decoded_message == self.CHANNEL_SHUTDOWN_SIGNAL:
-                            await conn.delete(key)
-                            break
-                        else:
-                            yield decoded_message
+        async for message in channel_hubs.get(key).listen(key, self.REPLAY_SNAPSHOT):
+            yield message
+
+    @staticmethod
+    def get_coalescing_key(message: str) -> Hashable | None:
+        """Messages with the same key replace each other while waiting for a websocket frame"""
+        return None
 
     async def _proxy_to_ws(self, key: str, websocket: WebSocket):
-        async for message in self._listen(key):
-            await websocket.send_text(message)
+        if not self.COALESCE_MESSAGES:
+            async for message in self._listen(key):
+                await websocket.send_text(message)
+            return
+        coalescer = WebSocketCoalescer(websocket, self.get_coalescing_key)
+        sender = asyncio.create_task(coalescer.run())
+        try:
+            async for message in self._listen(key):
+                if sender.done():
+                    break
+                coalescer.put(message)
+            coalescer.close()
+            await sender
+        finally:
+            sender.cancel()
 
     async def proxy_to_ws(self, *args, **kwargs):
         raise NotImplementedError
@@ -20,12 +20,12 @@ class BaseTestCache(CacheBase, Generic[CollectedType]):
         await self._create_key(f"{self.root_key}:{root_folder}", json.dumps(jsonable_encoder(cached_response)))
 
     async def get(self, root_folder: str) -> CollectedType | None:
-        result = await self._get_key(f"{self.root_key}:{root_folder}")
+        result = await self._get_cached_key(f"{self.root_key}:{root_folder}")
         if result:
             return self.return_model.model_validate_json(result)
 
     async def get_list(self, root_folder: str) -> List[CollectedType] | None:
-        result = await self._get_key(f"{self.root_key}:{root_folder}")
+        result = await self._get_cached_key(f"{self.root_key}:{root_folder}")
         if result:
             return [self.return_model.model_validate(item) for item in json.loads(result)]
 
@@ -1,4 +1,3 @@
-import asyncio
 import json
 from itertools import groupby
 from operator import attrgetter
@@ -6,6 +5,7 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 
 from src.cache.base import CacheBase
+from src.cache.client_cache import client_cache
 from src.core.config import settings
 from src.schemas.common import CollectedObject
 
@@ -21,11 +21,14 @@ class BasePathsCache(CacheBase[Dict, Dict]):
         objects_by_root_folder: Dict[str, List[CollectedObject]] = {
             k: list(v) for k, v in groupby(sorted_objects, key=attrgetter("root_folder"))
         }
-        for root_folder, objects in objects_by_root_folder.items():
-            await self._save_dict(
-                f"{self.root_key}:{root_folder}",
-                {o.id: json.dumps({"path": str(o.path), "name": o.name}) for o in objects},
-            )
+        await self._save_dicts_many(
+            {
+                f"{self.root_key}:{root_folder}": {
+                    o.id: json.dumps({"path": str(o.path), "name": o.name}) for o in objects
+                }
+                for root_folder, objects in objects_by_root_folder.items()
+            }
+        )
 
     async def save_root_folders(self, folders: List[str]):
         await self._delete_key(self.root_key_folders)
@@ -35,17 +38,22 @@ class BasePathsCache(CacheBase[Dict, Dict]):
         return await self._get_list(self.root_key_folders)
 
     async def get(self, object_id: str, root_folder: str) -> Tuple[Path, str] | None:
-        data = await self._get_value_from_dict(f"{self.root_key}:{root_folder}", object_id)
+        if client_cache.enabled:
+            data = (await self._get_cached_decoded_dict(f"{self.root_key}:{root_folder}")).get(object_id)
+        else:
+            data = await self._get_value_from_dict(f"{self.root_key}:{root_folder}", object_id)
         if not data:
             return None
         data = json.loads(data)
         return Path(data["path"]), data["name"]
 
     async def get_multi(self, object_ids: List[str], root_folder: str) -> List[Tuple[Path, str]]:
-        data = await self._get_values_from_dict(f"{self.root_key}:{root_folder}", object_ids)
-        data = [json.loads(item) for item in data]
+        paths = await self._get_cached_decoded_dict(f"{self.root_key}:{root_folder}")
+        data = [json.loads(paths[object_id]) for object_id in object_ids if paths.get(object_id)]
         return [(Path(item["path"]), item["name"]) for item in data]
 
     async def clear_path_cache(self):
         folders = await self._get_list(self.root_key_folders)
-        await asyncio.gather(*[self._delete_key(f"{self.root_key}:{root_folder}") for root_folder in folders])
+        async with self.pipeline():
+            for root_folder in folders or []:
+                await self._delete_key(f"{self.root_key}:{root_folder}")
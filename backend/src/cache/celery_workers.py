@@ -0,0 +1,87 @@
+import time
+from typing import Any, Dict
+
+import redis
+
+from src.cache.base import CacheBase, redis_scripts
+from src.cache.connection import get_pipeline
+from src.cache.keys import hash_tag
+from src.core.config import settings
+
+# One hash tag, so the keys are in one slot for PRUNE_WORKERS
+HEARTBEATS_KEY = f"celery:{hash_tag('workers')}:heartbeats"
+SLOTS_KEY = f"celery:{hash_tag('workers')}:slots"
+BUSY_KEY = f"celery:{hash_tag('workers')}:busy"
+
+# KEYS: heartbeats, slots, busy. ARGV: the heartbeat time before which a host is removed.
+# The scores are read in the script, so a host that sends a heartbeat meanwhile keeps all of its fields.
+PRUNE_WORKERS = redis_scripts.register(
+    "prune_celery_workers",
+    """
+local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+for _, host in ipairs(expired) do
+    redis.call("ZREM", KEYS[1], host)
+    redis.call("HDEL", KEYS[2], host)
+    redis.call("HDEL", KEYS[3], host)
+end
+return #expired
+""",
+)
+
+
+class CeleryWorkerRegistry:
+    """
+    Written by the Celery workers: slots of every host, busy slots, and the last heartbeat in a sorted set.
+    Busy slots are changed by the tasks and set to the count of active requests by every heartbeat, which corrects
+    the count for tasks killed without task_postrun.
+    Uses a sync client because Celery signals are handled outside of an event loop.
+    """
+
+    def __init__(self):
+        self._redis = (redis.RedisCluster if settings.REDIS_CLUSTER else redis.Redis).from_url(settings.REDIS_CACHE)
+
+    def register(self, hostname: str, slots: int):
+        with get_pipeline(self._redis, transaction=True) as pipe:
+            pipe.hset(SLOTS_KEY, hostname, slots)
+            pipe.hset(BUSY_KEY, hostname, 0)
+            pipe.zadd(HEARTBEATS_KEY, {hostname: time.time()})
+            pipe.execute()
+
+    def heartbeat(self, hostname: str, slots: int, busy: int):
+        with get_pipeline(self._redis, transaction=True) as pipe:
+            pipe.hset(SLOTS_KEY, hostname, slots)
+            pipe.hset(BUSY_KEY, hostname, busy)
+            pipe.zadd(HEARTBEATS_KEY, {hostname: time.time()})
+            for key in (HEARTBEATS_KEY, SLOTS_KEY, BUSY_KEY):
+                pipe.expire(key, settings.CELERY_WORKER_HEARTBEAT_TTL)
+            pipe.execute()
+
+    def unregister(self, hostname: str):
+        with get_pipeline(self._redis, transaction=True) as pipe:
+            pipe.zrem(HEARTBEATS_KEY, hostname)
+            pipe.hdel(SLOTS_KEY, hostname)
+            pipe.hdel(BUSY_KEY, hostname)
+            pipe.execute()
+
+    def change_busy(self, hostname: str, value: int):
+        self._redis.hincrby(BUSY_KEY, hostname, value)
+
+
+class CeleryWorkersCache(CacheBase[Any, Any]):
+    async def get_free_slots(self) -> Dict[str, int]:
+        """Free slots of every alive host, hosts without a heartbeat within the TTL are removed"""
+        expired_before = time.time() - settings.CELERY_WORKER_HEARTBEAT_TTL
+        await self._run_script(PRUNE_WORKERS, [HEARTBEATS_KEY, SLOTS_KEY, BUSY_KEY], [expired_before])
+        async with self._get_redis() as conn:
+            async with conn.pipeline(transaction=False) as pipe:
+                pipe.zrangebyscore(HEARTBEATS_KEY, expired_before, "+inf")
+                pipe.hgetall(SLOTS_KEY)
+                pipe.hgetall(BUSY_KEY)
+                alive, slots, busy = await pipe.execute()
+        # One slot of every host can be taken by Celery to process a heartbeat
+        return {
+            host.decode("UTF-8"): max(int(slots.get(host, 0)) - 1 - max(int(busy.get(host, 0)), 0), 0) for host in alive
+        }
+
+    async def get_capacity(self) -> int:
+        return sum((await self.get_free_slots()).values())
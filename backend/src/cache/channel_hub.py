@@ -0,0 +1,192 @@
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, DefaultDict, Dict, Iterable, List, Set, Tuple
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from src.cache.connection import get_pipeline, redis
+from src.cache.keys import get_hash_tag, hash_tag
+from src.core.config import settings
+
+CHANNEL_SHUTDOWN_SIGNAL = "SHUTDOWN"
+BLOCK_MILLISECONDS = 5000
+
+StreamId = Tuple[int, int]
+
+
+async def redis_key_exist_with_wait(
+    conn: Redis, key: str, wait_seconds: float = 5.0, poll_timeout: float = 0.5
+) -> bool:
+    try:
+        async with asyncio.timeout(wait_seconds):
+            while True:
+                if await conn.exists(key):
+                    return True
+                else:
+                    await asyncio.sleep(poll_timeout)
+    except TimeoutError:
+        return False
+
+
+def parse_stream_id(stream_id: bytes) -> StreamId:
+    milliseconds, _, sequence = stream_id.partition(b"-")
+    return int(milliseconds), int(sequence)
+
+
+def get_snapshot_key(key: str) -> str:
+    return f"{key}:snapshot"
+
+
+def queue_stream_message(
+    pipe: Pipeline, key: str, message: str, maxlen: int | None = None, snapshot: Dict[str, str] | None = None
+):
+    """
+    Snapshot fields hold the latest message of every entity of the channel. They are written in the same MULTI
+    as the message, so the snapshot read together with the last stream id is the state right at that id.
+    """
+    snapshot and pipe.hset(get_snapshot_key(key), mapping=snapshot)
+    pipe.xadd(key, {"data": message}, maxlen=maxlen, approximate=True)
+
+
+def queue_stream_expire(pipe: Pipeline, keys: Iterable[str], ttl: int = settings.CHANNEL_TTL):
+    for key in keys:
+        pipe.expire(key, ttl)
+        pipe.expire(get_snapshot_key(key), ttl)
+
+
+class Subscription:
+    def __init__(self):
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue()
+        # None until the history of the stream is replayed, messages read by the hub meanwhile are kept in pending
+        self.last_id: StreamId | None = None
+        self.pending: List[Tuple[StreamId, str]] = []
+        self.closed = False
+
+    def deliver(self, stream_id: StreamId, message: str):
+        if self.closed:
+            return
+        if self.last_id is None:
+            self.pending.append((stream_id, message))
+        elif stream_id > self.last_id:
+            self.last_id = stream_id
+            if message == CHANNEL_SHUTDOWN_SIGNAL:
+                self.closed = True
+                self.queue.put_nowait(None)
+            else:
+                self.queue.put_nowait(message)
+
+    def replay(self, history: List[Tuple[StreamId, str]], snapshot: List[str] = (), cursor: StreamId = (0, 0)):
+        for message in snapshot:
+            self.queue.put_nowait(message)
+        self.last_id = cursor
+        for stream_id, message in history + self.pending:
+            self.deliver(stream_id, message)
+        self.pending = []
+
+
+class RedisChannelHub:
+    """
+    Reads the streams of all channel subscribers of an event loop with one blocking XREAD and fans messages out
+    to asyncio queues. A new subscriber replays the stream history with XRANGE, or gets the snapshot of the channel
+    and the messages after the stream id read with it, and then live messages.
+    The hub wakes up from XREAD through its own stream when a new key is subscribed.
+    On a cluster XREAD takes keys of one slot, a hub reads the channels of one hash tag and its wakeup stream has it.
+    """
+
+    def __init__(self, tag: str | None = None):
+        prefix = f"channel_hub:{hash_tag(tag)}" if tag else "channel_hub"
+        self.wakeup_key = f"{prefix}:{uuid4()}:wakeup"
+        self.subscriptions: DefaultDict[str, Set[Subscription]] = defaultdict(set)
+        self.stream_ids: Dict[str, bytes] = {}
+        self.task: asyncio.Task | None = None
+
+    async def listen(self, key: str, snapshot: bool = False) -> AsyncIterator[str]:
+        conn = await redis.get_connection()
+        if not await redis_key_exist_with_wait(conn, key):
+            return
+        subscription = Subscription()
+        self.subscriptions[key].add(subscription)
+        try:
+            if snapshot:
+                # Without MULTI on a cluster a message written in between is in the snapshot and is delivered again
+                async with get_pipeline(conn, transaction=True) as pipe:
+                    pipe.xrevrange(key, count=1)
+                    pipe.hvals(get_snapshot_key(key))
+                    history, snapshot_messages = await pipe.execute()
+            else:
+                snapshot_messages, history = [], await conn.xrange(key)
+            if key not in self.stream_ids:
+                self.stream_ids[key] = history[-1][0] if history else b"0-0"
+                await self._wake_up(conn)
+            history = [(parse_stream_id(i), message[b"data"].decode("UTF-8")) for i, message in history]
+            if snapshot and history and history[-1][1] != CHANNEL_SHUTDOWN_SIGNAL:
+                # The snapshot covers the stream up to its last message, only later ones are delivered
+                cursor, history = history[-1][0], []
+            else:
+                cursor = (0, 0)
+            subscription.replay(history, [message.decode("UTF-8") for message in snapshot_messages], cursor)
+            if not self.task or self.task.done():
+                self.task = asyncio.create_task(self._run())
+            while (message := await subscription.queue.get()) is not None:
+                yield message
+        finally:
+            self.subscriptions[key].discard(subscription)
+            if not self.subscriptions[key]:
+                del self.subscriptions[key]
+                self.stream_ids.pop(key, None)
+        if subscription.closed:
+            # The first listener that got the shutdown signal removes the channel
+            await conn.delete(key, get_snapshot_key(key))
+
+    async def _wake_up(self, conn: Redis):
+        if self.task and not self.task.done():
+            async with conn.pipeline(transaction=False) as pipe:
+                pipe.xadd(self.wakeup_key, {"data": ""}, maxlen=1)
+                pipe.expire(self.wakeup_key, 60)
+                await pipe.execute()
+
+    async def _run(self):
+        conn = await redis.get_connection()
+        # No await between the check and the exit, so a subscriber never sees a running task that won't read its key
+        while self.stream_ids:
+            try:
+                streams = {self.wakeup_key: "$", **self.stream_ids}
+                messages = await conn.xread(streams=streams, block=BLOCK_MILLISECONDS)
+            except Exception as e:
+                # Stream ids are kept, so reading resumes from the last delivered message
+                print(f"Redis channel hub read failed: {e}", flush=True)
+                await asyncio.sleep(1)
+                continue
+            for key, entries in messages or []:
+                key = key.decode("UTF-8")
+                if key not in self.stream_ids:
+                    continue
+                self.stream_ids[key] = entries[-1][0]
+                for stream_id, message in entries:
+                    stream_id, message = parse_stream_id(stream_id), message[b"data"].decode("UTF-8")
+                    for subscription in list(self.subscriptions.get(key, ())):
+                        subscription.deliver(stream_id, message)
+
+
+class RedisChannelHubs:
+    """A hub per event loop, like the connection pools, and per hash tag of the channel on a cluster"""
+
+    def __init__(self):
+        self._hubs: Dict[Tuple[asyncio.AbstractEventLoop, str | None], RedisChannelHub] = {}
+
+    def get(self, key: str) -> RedisChannelHub:
+        loop = asyncio.get_running_loop()
+        tag = get_hash_tag(key) if settings.REDIS_CLUSTER else None
+        if not (hub := self._hubs.get((loop, tag))):
+            # Hubs of a tag are dropped when idle, a listener that still holds one keeps it running
+            for item in [
+                item for item, hub in self._hubs.items() if item[0].is_closed() or item[1] and not hub.stream_ids
+            ]:
+                del self._hubs[item]
+            hub = self._hubs[loop, tag] = RedisChannelHub(tag)
+        return hub
+
+
+channel_hubs = RedisChannelHubs()
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+import redis
+
+from src.core.config import settings
+
+T = TypeVar("T")
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+CACHED_PREFIXES = ("env:", "collected_")
+
+
+class RedisClientSideCache:
+    """
+    Process local cache of read-mostly keys with server assisted invalidation (CLIENT TRACKING in BCAST mode).
+    A thread subscribed to the invalidation channel drops every key with a tracked prefix modified by anyone.
+    Values are served from memory only while the invalidation connection is alive.
+    """
+
+    def __init__(self, prefixes: tuple[str, ...] = CACHED_PREFIXES):
+        self.prefixes = prefixes
+        # Tracking is per node, invalidations of a cluster would need a connection to every primary
+        self.enabled = settings.REDIS_CLIENT_CACHE and not settings.REDIS_CLUSTER
+        self._data: Dict[str, Dict[Hashable, Any]] = {}
+        self._size = 0
+        # Incremented on every invalidation, a value read during an invalidation is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pid: int | None = None
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Threads don't survive a fork, every process has its own listener
+            self._pid = os.getpid()
+            self._ready.clear()
+            self._data, self._size = {}, 0
+            threading.Thread(target=self._run, name="redis-client-cache", daemon=True).start()
+
+    def _invalidate(self, keys: list | None):
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self._data, self._size = {}, 0
+                return
+            for key in keys:
+                self._size -= len(self._data.pop(key.decode("UTF-8"), {}))
+
+    def _run(self):
+        client = redis.from_url(settings.REDIS_CACHE)
+        while True:
+            subscriber = tracking = None
+            try:
+                subscriber = client.connection_pool.get_connection("SUBSCRIBE")
+                subscriber.send_command("CLIENT", "ID")
+                client_id = subscriber.read_response()
+                subscriber.send_command("SUBSCRIBE", INVALIDATION_CHANNEL)
+                subscriber.read_response()
+                tracking = client.connection_pool.get_connection("CLIENT")
+                prefixes = [item for prefix in self.prefixes for item in ("PREFIX", prefix)]
+                tracking.send_command("CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST", *prefixes)
+                tracking.read_response()
+                self._ready.set()
+                while True:
+                    if subscriber.can_read(timeout=settings.REDIS_CLIENT_CACHE_PING_INTERVAL):
+                        message = subscriber.read_response()
+                        if message[0] == b"message":
+                            self._invalidate(message[2])
+                    else:
+                        # Tracking is bound to the connection, a broken one must stop serving the cached values
+                        tracking.send_command("PING")
+                        tracking.read_response()
+            except Exception as e:
+                print(f"Redis client side cache is disabled until reconnect: {e}", flush=True)
+            finally:
+                self._ready.clear()
+                self._invalidate(None)
+                for connection in (subscriber, tracking):
+                    connection and connection.disconnect()
+            time.sleep(1)
+
+    def _lookup(self, key: str, field: Hashable) -> tuple[bool, Any, int | None]:
+        if not self.enabled or not key.startswith(self.prefixes):
+            return False, None, None
+        self._pid != os.getpid() and self._start()
+        if not self._ready.is_set():
+            return False, None, None
+        with self._lock:
+            if field in (values := self._data.get(key, {})):
+                return True, values[field], None
+            return False, None, self._generation
+
+    def _store(self, key: str, field: Hashable, value: Any, generation: int | None):
+        with self._lock:
+            if generation != self._generation or self._size >= settings.REDIS_CLIENT_CACHE_MAX_ITEMS:
+                return
+            values = self._data.setdefault(key, {})
+            self._size += field not in values
+            values[field] = value
+
+    def get(self, key: str, field: Hashable, fetch: Callable[[], T]) -> T:
+        found, value, generation = self._lookup(key, field)
+        if found:
+            return value
+        value = fetch()
+        generation is not None and self._store(key, field, value, generation)
+        return value
+
+    async def aget(self, key: str, field: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        found, value, generation = self._lookup(key, field)
+        if found:
+            return value
+        value = await fetch()
+        generation is not None and self._store(key, field, value, generation)
+        return value
+
+
+client_cache = RedisClientSideCache()
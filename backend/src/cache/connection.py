@@ -1,21 +1,66 @@
 import asyncio
-from typing import Dict
+import socket
+from contextlib import suppress
+from typing import Dict, List
 
-from redis.asyncio import Redis, from_url
+from redis.asyncio import BlockingConnectionPool, Redis, RedisCluster
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import Connection
 
 from src.core.config import settings
 
 
+def get_pipeline(conn: Redis, transaction: bool = False) -> Pipeline:
+    """
+    Cluster pipelines group commands by the node of their slot and can't run MULTI. Keys written together share
+    a hash tag, so a pipeline touches one slot, but it is atomic only on a single Redis.
+    """
+    return conn.pipeline(transaction=transaction and not settings.REDIS_CLUSTER)
+
+
 class RedisCache:
+    """
+    A connection pool per event loop, because asyncio connections can't be shared between loops.
+    Pools of closed loops are released on the next call, close() releases the pool of the running loop.
+    """
+
     def __init__(self):
-        # Support cache radis connections for several event loops
-        self._connections: Dict[int, Redis] = {}
+        self._clients: Dict[asyncio.AbstractEventLoop, Redis] = {}
+
+    @staticmethod
+    def _get_connections(client: Redis | RedisCluster) -> List[Connection]:
+        pools = client.get_nodes() if isinstance(client, RedisCluster) else [client.connection_pool]
+        return [connection for pool in pools for connection in pool._connections]
+
+    def _release_closed_loops(self):
+        # disconnect() can't run without the loop, the sockets are shut down directly and closed when collected
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            for connection in self._get_connections(self._clients.pop(loop)):
+                if connection._writer and (sock := connection._writer.get_extra_info("socket")):
+                    with suppress(OSError):
+                        sock.shutdown(socket.SHUT_RDWR)
+                connection._reader = connection._writer = None
 
     async def get_connection(self) -> Redis:
-        loop_id = id(asyncio.get_running_loop())
-        if not self._connections.get(loop_id, None):
-            self._connections[loop_id] = await from_url(settings.REDIS_CACHE)
-        return self._connections[loop_id]
+        loop = asyncio.get_running_loop()
+        if not (client := self._clients.get(loop)):
+            self._release_closed_loops()
+            if settings.REDIS_CLUSTER:
+                client = self._clients[loop] = RedisCluster.from_url(
+                    settings.REDIS_CACHE, max_connections=settings.REDIS_MAX_CONNECTIONS
+                )
+                return client
+            pool = BlockingConnectionPool.from_url(
+                settings.REDIS_CACHE,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+            )
+            client = self._clients[loop] = Redis(connection_pool=pool)
+        return client
+
+    async def close(self):
+        if client := self._clients.pop(asyncio.get_running_loop(), None):
+            await client.close(close_connection_pool=True)
 
 
 redis = RedisCache()
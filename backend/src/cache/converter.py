@@ -1,36 +1,55 @@
 import json
 from datetime import datetime
-from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Type, Union
+from typing import Any, Dict, FrozenSet, Type, Union
 
 import pendulum
 from pydantic import BaseModel
+from pydantic_core import from_json, to_json
 from yarl import URL
 
+VERSION_TAG = "v1:"
+
+
+@lru_cache(maxsize=None)
+def datetime_fields(model_class: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(
+        name
+        for name, field in model_class.model_fields.items()
+        if field.annotation is datetime or datetime in getattr(field.annotation, "__args__", ())
+    )
+
+
+def encode_datetime(value: datetime) -> str:
+    # Same values as the legacy format: pendulum keeps the timezone, a plain datetime is stored as naive wall time
+    return value.isoformat() if isinstance(value, pendulum.DateTime) else value.strftime("%Y-%m-%d %H:%M:%S")
+
 
 class PydanticRedisConverter:
+    """
+    Hash fields are stored as VERSION_TAG + JSON produced by the compiled pydantic serializer of the model,
+    types are restored by the model validation on decode. Values of the legacy format, a JSON encoded
+    (value, type name) pair, are still decoded and are replaced on the next write.
+    """
+
     def __init__(self, model_class: Type[BaseModel]):
         self.model_class = model_class
-        self.to_str_types = (str, int, float, URL, Path, datetime)
-        self.to_json_types = (dict, list, tuple, bool)
         self.from_str_types = {item.__name__: item for item in (str, int, float, URL, Path)}
         self.from_json_types = {item.__name__: item for item in (dict, list, bool)}
 
-    def encode_value(self, value: Any) -> Union[str, int, float]:
-        if isinstance(value, Enum):
-            encoded_value, value_type = str(value.value), type(value.value)
-        elif isinstance(value, set):
-            encoded_value, value_type = json.dumps(list(value)), type(value)
-        elif isinstance(value, self.to_json_types):
-            encoded_value, value_type = json.dumps(value, default=str), type(value)
-        elif isinstance(value, self.to_str_types):
-            encoded_value, value_type = str(value), type(value)
-        else:
-            raise NotImplementedError(f"No encoder for type: {type(value)}")
-        return json.dumps((encoded_value, str(value_type.__name__)))
+    def _dump(self, model: BaseModel, exclude_unset=False) -> Dict[str, Any]:
+        data = model.model_dump(mode="json", exclude_none=True, exclude_unset=exclude_unset)
+        for name in datetime_fields(type(model)) & data.keys():
+            data[name] = encode_datetime(getattr(model, name))
+        return data
 
     def decode_value(self, value: str) -> Any:
+        if value.startswith(VERSION_TAG):
+            return from_json(value[len(VERSION_TAG) :])
+        return self.decode_legacy_value(value)
+
+    def decode_legacy_value(self, value: str) -> Any:
         value, value_type = json.loads(value)
         if value_type in self.from_json_types:
             return json.loads(value)
@@ -48,19 +67,20 @@ class PydanticRedisConverter:
             raise NotImplementedError(f"No decoder for type: {value_type}")
 
     def encode_to_dict(self, model: BaseModel, exclude_unset=False) -> Dict[str, Union[str, int, float]]:
-        return {
-            k: self.encode_value(v) for k, v in model.model_dump(exclude_none=True, exclude_unset=exclude_unset).items()
-        }
+        return {k: VERSION_TAG + to_json(v).decode("UTF-8") for k, v in self._dump(model, exclude_unset).items()}
 
     def encode_to_str(self, model: BaseModel) -> str:
-        return json.dumps({k: self.encode_value(v) for k, v in model.model_dump(exclude_none=True).items()})
+        return VERSION_TAG + to_json(self._dump(model)).decode("UTF-8")
 
     def decode_from_dict(self, value: dict):
         return self.model_class(**{k.decode("utf-8"): self.decode_value(v.decode("UTF-8")) for k, v in value.items()})
 
     def decode_from_bytes(self, value: bytes):
-        data = json.loads(value.decode("UTF-8"))
-        return self.model_class(**{k: self.decode_value(v) for k, v in data.items()})
+        value = value.decode("UTF-8")
+        if value.startswith(VERSION_TAG):
+            return self.model_class(**from_json(value[len(VERSION_TAG) :]))
+        data = json.loads(value)
+        return self.model_class(**{k: self.decode_legacy_value(v) for k, v in data.items()})
 
     @staticmethod
     def decode_dict(dictionary: Dict[bytes, bytes]) -> Dict[str, str]:
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import logging
+import re
+from collections import Counter
+from typing import Any, List, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.cache.base import CacheBase
+from src.cache.keys import get_key_index
+from src.cache.lifecycle import UUID_REGEX
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keys of runs and executions named before the hash tags and their tagged names, tagged keys don't match
+LEGACY_KEYS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(rf"({UUID_REGEX})(:.+)"), r"{\1}\2"),
+    (re.compile(rf"(load_test|script)(:[^:{{}}]+)?:({UUID_REGEX})(:.+)"), r"\1\2:{\3}\4"),
+]
+# The key layout version the keys are migrated to, set once the migration has completed without errors
+KEY_LAYOUT_KEY = "redis:key_layout"
+KEY_LAYOUT_VERSION = 1
+
+
+class KeyMigration(CacheBase[Any, Any]):
+    """
+    Moves keys to their hash tagged names with DUMP and RESTORE, which also works between the nodes of a cluster.
+    TTLs are kept and the moved keys are recorded in the key indexes of their runs. A key whose new name already
+    exists was written again by the services, its legacy copy is deleted. Meant to run once before the services start.
+    """
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def get_new_key(key: str) -> str | None:
+        for regex, replacement in LEGACY_KEYS:
+            if match := regex.fullmatch(key):
+                return match.expand(replacement)
+        return None
+
+    async def is_migrated(self) -> bool:
+        async with self._get_redis() as conn:
+            version = await conn.get(KEY_LAYOUT_KEY)
+        return version is not None and int(version) >= KEY_LAYOUT_VERSION
+
+    async def migrate(self, dry_run: bool = False, force: bool = False) -> Counter | None:
+        if not force and await self.is_migrated():
+            return None
+        result = Counter()
+        batch: List[Tuple[bytes, str]] = []
+        async with self._get_redis() as conn:
+            async for key in conn.scan_iter(count=1000):
+                if new_key := self.get_new_key(key.decode("UTF-8", errors="replace")):
+                    batch.append((key, new_key))
+                if len(batch) >= self.BATCH_SIZE:
+                    result += await self._move(conn, batch, dry_run)
+                    batch = []
+            result += await self._move(conn, batch, dry_run)
+            if not dry_run and not result["errors"]:
+                await conn.set(KEY_LAYOUT_KEY, KEY_LAYOUT_VERSION)
+        return result
+
+    @staticmethod
+    async def _move(conn: Redis, batch: List[Tuple[bytes, str]], dry_run: bool) -> Counter:
+        if dry_run or not batch:
+            return Counter(found=len(batch))
+        async with conn.pipeline(transaction=False) as pipe:
+            for key, _ in batch:
+                pipe.dump(key)
+                pipe.pttl(key)
+            dumps = await pipe.execute()
+
+        moved = [
+            (key, new_key, value, ttl) for (key, new_key), value, ttl in zip(batch, dumps[::2], dumps[1::2]) if value
+        ]
+        async with conn.pipeline(transaction=False) as pipe:
+            for _, new_key, value, ttl in moved:
+                pipe.restore(new_key, max(ttl, 0), value)
+            restored = await pipe.execute(raise_on_error=False)
+
+        result = Counter(found=len(batch))
+        async with conn.pipeline(transaction=False) as pipe:
+            for (key, new_key, _, _), response in zip(moved, restored):
+                if not isinstance(response, ResponseError):
+                    pipe.delete(key)
+                    if index := get_key_index(new_key):
+                        pipe.sadd(index, new_key)
+                    result["moved"] += 1
+                elif str(response).startswith("BUSYKEY"):
+                    pipe.delete(key)
+                    result["conflicts"] += 1
+                else:
+                    logger.warning(f"{key.decode('UTF-8', errors='replace')} is not moved to {new_key}: {response}")
+                    result["errors"] += 1
+            await pipe.execute()
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move Redis keys of runs and executions to hash tagged names")
+    parser.add_argument("--dry-run", action="store_true", help="only count the keys to move")
+    parser.add_argument("--force", action="store_true", help="run even if the keys are already migrated")
+    args = parser.parse_args()
+    logger.info("Start Redis key migration")
+    if (result := asyncio.run(KeyMigration().migrate(args.dry_run, args.force))) is None:
+        logger.info(f"Redis keys are already in key layout {KEY_LAYOUT_VERSION}")
+    else:
+        logger.info(f"Redis key migration completed: {dict(result)}")
+
+
+if __name__ == "__main__":
+    main()
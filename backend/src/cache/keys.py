@@ -0,0 +1,26 @@
+# Keys of executions start with their namespace and the hash tag, keys of test runs with the hash tag
+INDEXED_NAMESPACES = ("load_test", "script")
+
+
+def hash_tag(value: str) -> str:
+    """Redis Cluster hashes only the part of a key in braces, keys with the same tag are in the same slot"""
+    return f"{{{value}}}"
+
+
+def get_hash_tag(key: str) -> str | None:
+    start = key.find("{")
+    end = key.find("}", start + 1)
+    return key[start + 1 : end] if start != -1 and end > start + 1 else None
+
+
+def get_key_index(key: str) -> str | None:
+    """
+    The set of the key names of the run or execution a key belongs to, they are expired together through it.
+    Keys without a hash tag or of other namespaces have no index.
+    """
+    if not (tag := get_hash_tag(key)):
+        return None
+    if key.startswith("{"):
+        return f"{hash_tag(tag)}:keys"
+    namespace = key.split(":", 1)[0]
+    return f"{namespace}:{hash_tag(tag)}:keys" if namespace in INDEXED_NAMESPACES else None
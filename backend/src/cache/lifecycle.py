@@ -0,0 +1,133 @@
+import random
+import re
+from collections import defaultdict
+from string import Formatter
+from typing import Any, DefaultDict, Dict, Iterable, List
+
+from src.cache.base import CacheBase
+from src.cache.keys import get_key_index
+from src.modules.auto_test.config import settings as auto_test_settings
+from src.modules.load_test_runner.config import settings as load_test_settings
+from src.modules.script_runner.config import settings as script_settings
+from src.schemas.health import RedisKeyFamilyReport
+
+UUID_REGEX = "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+# Run ids are uuids, it keeps the run family from matching keys of the other families in the report
+PLACEHOLDER_REGEX = {"run_id": UUID_REGEX, "execution_id": UUID_REGEX}
+
+
+class KeyFamily(CacheBase[Any, Any]):
+    """
+    Keys of one kind of data, described by Redis glob patterns with {placeholders} of the run identifiers.
+    Keys of a run get the TTL of the family when the run reaches a terminal state, None keeps them.
+    The keys are found in the key index of the run (see get_key_index), where they are recorded when created.
+    """
+
+    def __init__(self, name: str, patterns: List[str], ttl: int | None = None):
+        self.name = name
+        self.patterns = patterns
+        self.ttl = ttl
+        self.regex = re.compile("|".join(f"(?:{self._to_regex(pattern)})" for pattern in patterns))
+        super().__init__()
+
+    @staticmethod
+    def _to_regex(pattern: str) -> str:
+        parts = []
+        for literal, placeholder, _, _ in Formatter().parse(pattern):
+            parts.append(".*".join(map(re.escape, literal.split("*"))))
+            if placeholder is not None:
+                parts.append(PLACEHOLDER_REGEX.get(placeholder, "[^:]+"))
+        return "".join(parts)
+
+    def match(self, key: str) -> bool:
+        return bool(self.regex.fullmatch(key))
+
+    async def track(self, keys: Iterable[str]):
+        await self._add_to_key_indexes(keys)
+
+    async def expire(self, ttl: int | None = None, **params: str):
+        if (ttl := ttl or self.ttl) is None:
+            return
+        # All patterns of a family are of one run, so they share its index
+        if index := get_key_index(self.patterns[0].format(**params)):
+            await self._expire_indexed_keys(index, ttl)
+
+
+class KeyLifecycle(CacheBase[Any, Any]):
+    def __init__(self):
+        self.families: Dict[str, KeyFamily] = {}
+        super().__init__()
+
+    def register(self, name: str, patterns: List[str], ttl: int | None = None) -> KeyFamily:
+        """Families are matched in the order of registration"""
+        family = self.families[name] = KeyFamily(name, patterns, ttl)
+        return family
+
+    def classify(self, key: str) -> str:
+        return next((name for name, family in self.families.items() if family.match(key)), "other")
+
+    async def report(self, samples: int = 100) -> List[RedisKeyFamilyReport]:
+        """
+        Counts the keys of every family with SCAN and estimates the memory from MEMORY USAGE of a random sample.
+        Scans the whole keyspace, so it is meant for occasional maintenance checks.
+        """
+        counts: DefaultDict[str, int] = defaultdict(int)
+        sampled: DefaultDict[str, List[bytes]] = defaultdict(list)
+        async with self._get_redis() as conn:
+            async for key in conn.scan_iter(count=1000):
+                name = self.classify(key.decode("UTF-8", errors="replace"))
+                counts[name] += 1
+                # Reservoir sampling, every key of the family has the same chance to be measured
+                if len(sampled[name]) < samples:
+                    sampled[name].append(key)
+                elif (index := random.randrange(counts[name])) < samples:
+                    sampled[name][index] = key
+            keys = [key for name in counts for key in sampled[name]]
+            async with conn.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.memory_usage(key)
+                    pipe.ttl(key)
+                results = await pipe.execute()
+        usage = dict(zip(keys, zip(results[::2], results[1::2])))
+
+        report = []
+        for name, count in sorted(counts.items(), key=lambda item: -item[1]):
+            # Keys removed during the scan are not measured
+            measured = [usage[key] for key in sampled[name] if usage[key][0] is not None]
+            sampled_bytes = sum(size for size, _ in measured)
+            without_ttl = sum(ttl == -1 for _, ttl in measured)
+            family = self.families.get(name)
+            report.append(
+                RedisKeyFamilyReport(
+                    name=name,
+                    patterns=family.patterns if family else [],
+                    ttl=family.ttl if family else None,
+                    keys=count,
+                    sampled_keys=len(measured),
+                    sampled_bytes=sampled_bytes,
+                    estimated_bytes=round(sampled_bytes / len(measured) * count) if measured else 0,
+                    estimated_keys_without_ttl=round(without_ttl / len(measured) * count) if measured else 0,
+                )
+            )
+        return report
+
+
+key_lifecycle = KeyLifecycle()
+
+load_test_execution_keys = key_lifecycle.register(
+    "load_test_execution",
+    ["load_test:{load_test_id}:{{{execution_id}}}:*", "load_test:{{{execution_id}}}:*"],
+    load_test_settings.HISTORY_REDIS_RETENTION,
+)
+script_execution_keys = key_lifecycle.register(
+    "script_execution",
+    ["script:{script_id}:{{{execution_id}}}:*", "script:{{{execution_id}}}:*"],
+    script_settings.EXECUTION_REDIS_RETENTION,
+)
+auto_test_run_keys = key_lifecycle.register("auto_test_run", ["{{{run_id}}}:*"], auto_test_settings.RUN_REDIS_RETENTION)
+key_lifecycle.register("collected", ["collected_*"])
+key_lifecycle.register("environment", ["env:*"])
+key_lifecycle.register("pending_runs", [f"{auto_test_settings.AUTO_TEST_PENDING_RUNS}_*"])
+key_lifecycle.register("last_executions", ["load_test:current", "script:last"])
+key_lifecycle.register("celery_workers", ["celery:{{workers}}:*"])
+key_lifecycle.register("channel_hubs", ["channel_hub:*"])
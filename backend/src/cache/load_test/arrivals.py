@@ -0,0 +1,36 @@
+from typing import Any
+
+from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
+from src.cache.write_buffer import RedisWriteBuffer
+from src.schemas.load_test.load_test_history import LoadTestArrivalStatistic
+
+COUNTERS = ("scheduled", "started", "late", "dropped", "failed")
+
+
+class LoadTestArrivalsCache(CacheBase[Any, Any]):
+    def __init__(self, load_test_id: str, execution_id: str, buffer: RedisWriteBuffer | None = None):
+        self.load_test_id = load_test_id
+        self.execution_id = execution_id
+        self.buffer = buffer
+        self.key = f"load_test:{self.load_test_id}:{hash_tag(execution_id)}:arrivals"
+        super().__init__()
+
+    async def add(self, worker_id: str, delta: LoadTestArrivalStatistic):
+        for counter in COUNTERS:
+            if value := getattr(delta, counter):
+                if self.buffer:
+                    await self.buffer.hincrby(self.key, counter, value)
+                else:
+                    await self._increment_value_in_dict(self.key, counter, value)
+        if self.buffer:
+            await self.buffer.hset(self.key, f"max_lag:{worker_id}", str(delta.max_lag))
+        else:
+            await self._update_key_value_in_dict(self.key, f"max_lag:{worker_id}", str(delta.max_lag))
+
+    async def get(self) -> LoadTestArrivalStatistic | None:
+        data = await self._get_decoded_dict(self.key)
+        if not data:
+            return None
+        max_lag = max((float(value) for key, value in data.items() if key.startswith("max_lag:")), default=0)
+        return LoadTestArrivalStatistic(**{counter: int(data.get(counter, 0)) for counter in COUNTERS}, max_lag=max_lag)
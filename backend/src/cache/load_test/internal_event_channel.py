@@ -1,10 +1,13 @@
 import json
-from typing import AsyncIterator
+from typing import AsyncIterator, Dict
 
 from src.cache.base import RedisChannel
+from src.cache.keys import hash_tag
+from src.cache.write_buffer import RedisWriteBuffer
 from src.schemas.load_test.load_test_events import (
     LoadTestInternalEvent,
     LoadTestInternalEventTypeEnum,
+    LoadTestRateSharesUpdate,
     LoadTestStartTaskUpdatesEvent,
     LoadTestStopSpecificWorkerEvent,
     LoadTestStopWorkersEvent,
@@ -15,13 +18,17 @@ from src.schemas.load_test.load_test_history import LoadTestWorkerStatusEnum
 
 
 class LoadTestInternalEventChannel(RedisChannel):
-    def __init__(self, load_test_id: str, execution_id: str):
+    def __init__(self, load_test_id: str, execution_id: str, buffer: RedisWriteBuffer | None = None):
         self.load_test_id = load_test_id
         self.execution_id = execution_id
-        self.key = f"load_test:{execution_id}:internal_channel"
+        self.buffer = buffer
+        self.key = f"load_test:{hash_tag(execution_id)}:internal_channel"
 
     async def _write_event(self, event: LoadTestInternalEvent):
-        await self._write(self.key, event.model_dump_json())
+        if self.buffer:
+            await self.buffer.xadd(self.key, event.model_dump_json())
+        else:
+            await self._write(self.key, event.model_dump_json())
 
     async def send_stop_workers_event(self):
         await self._write_event(LoadTestStopWorkersEvent())
@@ -36,6 +43,9 @@ class LoadTestInternalEventChannel(RedisChannel):
     async def start_task_updates(self):
         await self._write_event(LoadTestStartTaskUpdatesEvent())
 
+    async def update_rate_shares(self, shares: Dict[str, float]):
+        await self._write_event(LoadTestRateSharesUpdate(data=shares))
+
     async def listen(self) -> AsyncIterator[LoadTestInternalEvent]:
         async for message in self._listen(self.key):
             message = json.loads(message)
@@ -48,3 +58,5 @@ class LoadTestInternalEventChannel(RedisChannel):
                     yield LoadTestWorkerStatusUpdate(**message)
                 case LoadTestInternalEventTypeEnum.start_task_updates:
                     yield LoadTestStartTaskUpdatesEvent(**message)
+                case LoadTestInternalEventTypeEnum.rate_shares_update:
+                    yield LoadTestRateSharesUpdate(**message)
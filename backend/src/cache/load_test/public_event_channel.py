@@ -1,21 +1,31 @@
-from typing import Any
+from typing import Any, Dict, Hashable, List
 
 from fastapi import WebSocket
+from pydantic_core import from_json
 
 from src.cache.base import RedisChannel
 from src.cache.base_event_manager import EventManager
+from src.cache.keys import hash_tag
+from src.cache.write_buffer import RedisWriteBuffer
+from src.core.config import settings
 from src.schemas.load_test.load_test_events import (
+    ArrivalMessage,
     ChartMessage,
     ExecutionMessage,
+    LoadTestArrivalEvent,
     LoadTestChartEvent,
     LoadTestEvent,
+    LoadTestEventTypeEnum,
     LoadTestExecutionEvent,
+    LoadTestMetricsEvent,
     LoadTestTaskHistoryEvent,
     LoadTestWorkerEvent,
+    MetricsMessage,
     TaskHistoryMessage,
     WorkerMessage,
 )
 from src.schemas.load_test.load_test_history import (
+    LoadTestArrivalStatistic,
     LoadTestHistoryUpdate,
     LoadTestTaskStatusHistory,
     LoadTestWorkerStatusEnum,
@@ -23,23 +33,68 @@ from src.schemas.load_test.load_test_history import (
 
 
 class LoadTestPublicEventChannel(RedisChannel):
-    async def _write_event(self, execution_id: str, event: LoadTestEvent):
-        await self._write(f"load_test:{execution_id}:channel", event.model_dump_json())
+    """
+    Every event also replaces the latest state of its entity in the channel snapshot: a field per execution attribute,
+    worker and chart, the last task history, arrival and metrics of a kind. A late subscriber gets the snapshot and
+    live events, the history before it is loaded over the API.
+    """
+
+    STREAM_MAXLEN = settings.CHANNEL_MAXLEN
+    REPLAY_SNAPSHOT = True
+
+    def __init__(self, buffer: RedisWriteBuffer | None = None):
+        self.buffer = buffer
+
+    @staticmethod
+    def get_key(execution_id: str) -> str:
+        return f"load_test:{hash_tag(execution_id)}:channel"
+
+    async def _write_event(self, execution_id: str, event: LoadTestEvent, snapshot: Dict[str, LoadTestEvent]):
+        message = event.model_dump_json()
+        snapshot = {field: message if item is event else item.model_dump_json() for field, item in snapshot.items()}
+        if self.buffer:
+            await self.buffer.xadd(self.get_key(execution_id), message, self.STREAM_MAXLEN, snapshot)
+        else:
+            await self._write(self.get_key(execution_id), message, snapshot)
+
+    @staticmethod
+    def get_coalescing_key(message: str) -> Hashable | None:
+        event = from_json(message)
+        data = event["data"]
+        match event["type"]:
+            case LoadTestEventTypeEnum.worker:
+                return event["type"], data["worker_id"]
+            case LoadTestEventTypeEnum.task:
+                return event["type"], data["now_string"]
+            case LoadTestEventTypeEnum.chart if isinstance(data["data"], list) and data["data"]:
+                # The latest value of every chart point, charts are keyed by their x in the dashboard
+                return event["type"], data["chart_name"], str(data["data"][0])
+            case LoadTestEventTypeEnum.arrival:
+                return event["type"]
+            case LoadTestEventTypeEnum.metrics:
+                return event["type"], data["kind"], data["time_string"]
+        # Execution updates are merged by the dashboard, so all of them are sent
+        return None
 
     async def proxy_to_ws(self, execution_id: str, websocket: WebSocket):
-        await super()._proxy_to_ws(f"load_test:{execution_id}:channel", websocket)
+        await super()._proxy_to_ws(self.get_key(execution_id), websocket)
 
     async def update_execution_status(self, load_test_id: str, execution_id: str, update: LoadTestHistoryUpdate):
-        event = LoadTestExecutionEvent(
-            data=ExecutionMessage(load_test_id=load_test_id, update=update.model_dump(exclude_unset=True))
-        )
-        await self._write_event(execution_id, event)
+        update = update.model_dump(exclude_unset=True)
+        event = LoadTestExecutionEvent(data=ExecutionMessage(load_test_id=load_test_id, update=update))
+        snapshot = {
+            f"execution:{name}": LoadTestExecutionEvent(
+                data=ExecutionMessage(load_test_id=load_test_id, update={name: value})
+            )
+            for name, value in update.items()
+        }
+        await self._write_event(execution_id, event, snapshot)
 
     async def update_worker_status(
         self, load_test_id: str, execution_id: str, worker_id: str, status: LoadTestWorkerStatusEnum
     ):
         event = LoadTestWorkerEvent(data=WorkerMessage(load_test_id=load_test_id, worker_id=worker_id, status=status))
-        await self._write_event(execution_id, event)
+        await self._write_event(execution_id, event, {f"worker:{worker_id}": event})
 
     async def update_task_status_history(
         self, load_test_id: str, execution_id: str, now_string: str, data: LoadTestTaskStatusHistory
@@ -47,11 +102,23 @@ class LoadTestPublicEventChannel(RedisChannel):
         event = LoadTestTaskHistoryEvent(
             data=TaskHistoryMessage(load_test_id=load_test_id, now_string=now_string, data=data)
         )
-        await self._write_event(execution_id, event)
+        await self._write_event(execution_id, event, {"task": event})
 
     async def update_task_chart_data(self, load_test_id: str, execution_id: str, chart_name: str, data: Any):
         event = LoadTestChartEvent(data=ChartMessage(load_test_id=load_test_id, chart_name=chart_name, data=data))
-        await self._write_event(execution_id, event)
+        await self._write_event(execution_id, event, {f"chart:{chart_name}": event})
+
+    async def update_arrival_statistic(self, load_test_id: str, execution_id: str, data: LoadTestArrivalStatistic):
+        event = LoadTestArrivalEvent(data=ArrivalMessage(load_test_id=load_test_id, data=data))
+        await self._write_event(execution_id, event, {"arrivals": event})
+
+    async def update_metrics(
+        self, load_test_id: str, execution_id: str, kind: str, time_string: str, data: Dict[str, List[float]]
+    ):
+        event = LoadTestMetricsEvent(
+            data=MetricsMessage(load_test_id=load_test_id, kind=kind, time_string=time_string, data=data)
+        )
+        await self._write_event(execution_id, event, {f"metrics:{kind}": event})
 
 
 class LoadTestEventManager(EventManager):
@@ -1,4 +1,5 @@
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.schemas.load_test.load_test_history import LoadTestHistory, LoadTestHistoryUpdate
 
 
@@ -7,11 +8,14 @@ class LoadTestReportCache(CacheBase[LoadTestHistory, LoadTestHistoryUpdate]):
         self.load_test_id = load_test_id
         super().__init__(LoadTestHistory)
 
+    def get_key(self, execution_id: str) -> str:
+        return f"load_test:{self.load_test_id}:{hash_tag(execution_id)}:data"
+
     async def create(self, execution_id: str, data: LoadTestHistory):
-        await self._save_model(f"load_test:{self.load_test_id}:{execution_id}:data", data)
+        await self._save_model(self.get_key(execution_id), data)
 
     async def get(self, execution_id: str) -> LoadTestHistory | None:
-        return await self._get_model(f"load_test:{self.load_test_id}:{execution_id}:data")
+        return await self._get_model(self.get_key(execution_id))
 
     async def update(self, execution_id: str, data: LoadTestHistoryUpdate):
-        return await self._update_model(f"load_test:{self.load_test_id}:{execution_id}:data", data)
+        return await self._update_model(self.get_key(execution_id), data)
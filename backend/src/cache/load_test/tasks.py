@@ -1,32 +1,46 @@
 import json
 from collections import Counter
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
+from src.cache.write_buffer import RedisWriteBuffer
 from src.schemas.load_test.load_test_history import LoadTestTaskStatusEnum, LoadTestTaskStatusHistory
 
 
 class LoadTestTaskCache(CacheBase[Any, Any]):
-    def __init__(self, load_test_id: str, execution_id: str):
+    def __init__(self, load_test_id: str, execution_id: str, buffer: RedisWriteBuffer | None = None):
         self.load_test_id = load_test_id
         self.execution_id = execution_id
-        self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id)
-        self.key_prefix = f"load_test:{self.load_test_id}:{execution_id}:tasks"
+        self.buffer = buffer
+        self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id, buffer)
+        self.key_prefix = f"load_test:{self.load_test_id}:{hash_tag(execution_id)}:tasks"
+        # Statuses of the tasks created by this instance. With a buffer they are the source of the old status.
+        self.statuses: Dict[str, LoadTestTaskStatusEnum] = {}
         super().__init__()
 
+    def get_keys(self) -> List[str]:
+        return [f"{self.key_prefix}:{part}" for part in ("current", "status_map", "status_map_history")]
+
     async def create_multi(self, tasks_with_status: Dict[str, LoadTestTaskStatusEnum]):
         count_by_status: Dict[LoadTestTaskStatusEnum, int] = dict(Counter(tasks_with_status.values()))
         await self._save_dict(f"{self.key_prefix}:current", tasks_with_status)
         for status, count in count_by_status.items():
             await self._increment_value_in_dict(f"{self.key_prefix}:status_map", status, count)
+        self.statuses.update(tasks_with_status)
         await self.internal_channel.start_task_updates()
 
     async def update_status(self, task_id: str, new_status: LoadTestTaskStatusEnum):
-        old_status = LoadTestTaskStatusEnum(await self._get_value_from_dict(f"{self.key_prefix}:current", task_id))
-        await self._update_key_value_in_dict(f"{self.key_prefix}:current", task_id, new_status)
-        await self._increment_value_in_dict(f"{self.key_prefix}:status_map", old_status, -1)
-        await self._increment_value_in_dict(f"{self.key_prefix}:status_map", new_status, 1)
+        if self.buffer and task_id in self.statuses:
+            old_status, self.statuses[task_id] = self.statuses[task_id], new_status
+            await self.buffer.hset(f"{self.key_prefix}:current", task_id, new_status)
+            await self.buffer.hincrby(f"{self.key_prefix}:status_map", old_status, -1)
+            await self.buffer.hincrby(f"{self.key_prefix}:status_map", new_status, 1)
+            return
+        await self._transition_status(
+            f"{self.key_prefix}:current", task_id, new_status, new_status, [f"{self.key_prefix}:status_map"]
+        )
 
     async def get_current_status_map(self) -> Dict[str, int]:
         return await self._get_decoded_dict(f"{self.key_prefix}:status_map")
@@ -2,16 +2,19 @@ import asyncio
 from typing import Dict
 
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
+from src.cache.write_buffer import RedisWriteBuffer
 from src.schemas.load_test.load_test_history import LoadTestWorkerStatusEnum
 
 
 class LoadTestWorkerCache(CacheBase[str, str]):
-    def __init__(self, load_test_id: str, execution_id: str):
+    def __init__(self, load_test_id: str, execution_id: str, buffer: RedisWriteBuffer | None = None):
         self.load_test_id = load_test_id
         self.execution_id = execution_id
-        self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id)
-        self.key = f"load_test:{self.load_test_id}:{execution_id}:workers"
+        self.buffer = buffer
+        self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id, buffer)
+        self.key = f"load_test:{self.load_test_id}:{hash_tag(execution_id)}:workers"
         super().__init__()
 
     async def create_multi(self, workers_with_status: Dict[str, LoadTestWorkerStatusEnum]):
@@ -24,7 +27,10 @@ class LoadTestWorkerCache(CacheBase[str, str]):
         )
 
     async def update_status(self, worker_id: str, new_status: LoadTestWorkerStatusEnum):
-        await self._update_key_value_in_dict(self.key, worker_id, new_status)
+        if self.buffer:
+            await self.buffer.hset(self.key, worker_id, new_status)
+        else:
+            await self._update_key_value_in_dict(self.key, worker_id, new_status)
         await self.internal_channel.update_worker_status(worker_id, new_status)
 
     async def get(self, worker_id) -> LoadTestWorkerStatusEnum:
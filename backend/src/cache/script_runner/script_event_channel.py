@@ -1,12 +1,15 @@
-from typing import Dict, List
+from typing import Dict, Hashable, List
 
 from fastapi import WebSocket
+from pydantic_core import from_json
 
 from src.cache.base import RedisChannel
 from src.cache.base_event_manager import EventManager
+from src.cache.keys import hash_tag
 from src.schemas.script_runner.script_events import (
     EnvUsedUpdate,
     ErrorsEvent,
+    EventTypeEnum,
     IntermediateErrorsEvent,
     IntermediateResultEvent,
     LogEvent,
@@ -19,14 +22,29 @@ from src.schemas.script_runner.script_history import ScriptError, ScriptResult,
 
 
 class ScriptEventChannel(RedisChannel):
+    @staticmethod
+    def get_key(execution_id: str) -> str:
+        return f"script:{hash_tag(execution_id)}:channel"
+
     async def _write_event(self, execution_id: str, event: ScriptEvent):
-        await self._write(f"script:{execution_id}:channel", event.model_dump_json())
+        await self._write(self.get_key(execution_id), event.model_dump_json())
 
     async def close_channel(self, execution_id):
-        await self._close(f"script:{execution_id}:channel")
+        await self._close(self.get_key(execution_id))
+
+    @staticmethod
+    def get_coalescing_key(message: str) -> Hashable | None:
+        event = from_json(message)
+        match event["type"]:
+            case EventTypeEnum.log:
+                return event["type"], event["message"]["index"]
+            case EventTypeEnum.status | EventTypeEnum.result | EventTypeEnum.errors | EventTypeEnum.env_used:
+                return event["type"]
+        # Intermediate results and errors are accumulated by the client
+        return None
 
     async def proxy_to_ws(self, execution_id: str, websocket: WebSocket):
-        await super()._proxy_to_ws(f"script:{execution_id}:channel", websocket)
+        await super()._proxy_to_ws(self.get_key(execution_id), websocket)
 
     async def update_status(self, script_id: str, execution_id: str, status: ScriptStatusEnum):
         event = StatusEvent(script_id=script_id, message=status)
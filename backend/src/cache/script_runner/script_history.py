@@ -1,4 +1,5 @@
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 from src.schemas.script_runner.script_history import ScriptHistory, ScriptHistoryUpdate
 
 
@@ -7,11 +8,14 @@ class ScriptHistoryCache(CacheBase[ScriptHistory, ScriptHistoryUpdate]):
         self.script_id = script_id
         super().__init__(ScriptHistory)
 
+    def get_key(self, execution_id: str) -> str:
+        return f"script:{self.script_id}:{hash_tag(execution_id)}:data"
+
     async def create(self, execution_id: str, data: ScriptHistory):
-        await self._save_model(f"script:{self.script_id}:{execution_id}:data", data)
+        await self._save_model(self.get_key(execution_id), data)
 
     async def get(self, execution_id: str) -> ScriptHistory | None:
-        return await self._get_model(f"script:{self.script_id}:{execution_id}:data")
+        return await self._get_model(self.get_key(execution_id))
 
     async def update(self, execution_id: str, data: ScriptHistoryUpdate):
-        return await self._update_model(f"script:{self.script_id}:{execution_id}:data", data)
+        return await self._update_model(self.get_key(execution_id), data)
@@ -1,6 +1,7 @@
 from typing import Dict, List
 
 from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
 
 
 class ScriptHistoryLogCache(CacheBase[List, List]):
@@ -8,8 +9,11 @@ class ScriptHistoryLogCache(CacheBase[List, List]):
         self.script_id = script_id
         super().__init__(None)
 
+    def get_key(self, execution_id: str) -> str:
+        return f"script:{self.script_id}:{hash_tag(execution_id)}:log"
+
     async def add(self, execution_id: str, message: str) -> int:
-        return await self._add_to_list(f"script:{self.script_id}:{execution_id}:log", message)
+        return await self._add_to_list(self.get_key(execution_id), message)
 
     async def get(self, execution_id: str) -> Dict[int, str]:
-        return await self._get_enumerate_list(f"script:{self.script_id}:{execution_id}:log")
+        return await self._get_enumerate_list(self.get_key(execution_id))
@@ -0,0 +1,57 @@
+import asyncio
+from itertools import count
+from typing import Callable, Dict, Hashable
+
+from fastapi import WebSocket
+
+from src.core.config import settings
+
+
+class WebSocketCoalescer:
+    """
+    Sends the messages of a websocket connection as frames at most once per interval.
+    A message with a key replaces the pending one with the same key, others are kept in order.
+    A frame of several messages is a JSON array of them, a single message is sent as it is.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        get_key: Callable[[str], Hashable | None],
+        interval: float = settings.WEBSOCKET_FLUSH_INTERVAL,
+    ):
+        self.websocket = websocket
+        self.get_key = get_key
+        self.interval = interval
+        self.pending: Dict[Hashable, str] = {}
+        self._sequence = count()
+        self._has_messages = asyncio.Event()
+        self._closed = False
+
+    def put(self, message: str):
+        if (key := self.get_key(message)) is None:
+            key = next(self._sequence)
+        else:
+            # The latest message goes to the end, so the frame keeps the order in which states were reached
+            self.pending.pop(key, None)
+        self.pending[key] = message
+        self._has_messages.set()
+
+    async def flush(self):
+        messages, self.pending = list(self.pending.values()), {}
+        self._has_messages.clear()
+        if len(messages) == 1:
+            await self.websocket.send_text(messages[0])
+        elif messages:
+            await self.websocket.send_text(f"[{','.join(messages)}]")
+
+    async def run(self):
+        while not self._closed:
+            await self._has_messages.wait()
+            await self.flush()
+            await asyncio.sleep(self.interval)
+        await self.flush()
+
+    def close(self):
+        self._closed = True
+        self._has_messages.set()
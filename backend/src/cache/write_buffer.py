@@ -0,0 +1,150 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import Any, Callable, Coroutine, DefaultDict, Dict, List, Set, Tuple
+
+from src.cache.base import CacheBase
+from src.cache.channel_hub import get_snapshot_key, queue_stream_expire, queue_stream_message
+from src.cache.connection import get_pipeline
+from src.cache.keys import get_key_index
+
+
+class RedisWriteBuffer(CacheBase[Any, Any]):
+    """
+    Coalesces writes in memory and flushes them as one MULTI pipeline on a tick or when max_size is reached.
+    Producers are suspended when max_pending writes are waiting for a flush.
+    """
+
+    def __init__(self, tick: float = 0.25, max_size: int = 1000, max_pending: int = 10000):
+        self.tick = tick
+        self.max_size = max_size
+        self.max_pending = max_pending
+
+        self._hset: DefaultDict[str, Dict[str, str]] = defaultdict(dict)
+        self._hincrby: DefaultDict[str, Counter] = defaultdict(Counter)
+        self._sadd: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._xadd: List[Tuple[str, str, int | None, Dict[str, str] | None]] = []
+        self._size = 0
+        # Keys already recorded in the key indexes of their runs
+        self._indexed: Set[str] = set()
+
+        self._collectors: List[Callable[[], Coroutine[Any, Any, None]]] = []
+        self._running = False
+        self._collecting = False
+        self._lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._in_flight: asyncio.Task | None = None
+        super().__init__()
+
+    def add_collector(self, collector: Callable[[], Coroutine[Any, Any, None]]):
+        """Collectors are awaited right before every flush to put their accumulated state into the buffer"""
+        self._collectors.append(collector)
+
+    async def _reserve(self):
+        self._size += 1
+        if self._size >= self.max_size:
+            self._flush_requested.set()
+        if self._size >= self.max_pending and not self._collecting:
+            if self._running:
+                self._has_space.clear()
+                await self._has_space.wait()
+            else:
+                await self.flush()
+
+    async def hset(self, key: str, field: str, value: str):
+        new_field = field not in self._hset[key]
+        self._hset[key][field] = value
+        new_field and await self._reserve()
+
+    async def hincrby(self, key: str, field: str, value: int):
+        new_field = field not in self._hincrby[key]
+        self._hincrby[key][field] += value
+        new_field and await self._reserve()
+
+    async def sadd(self, key: str, *values: str):
+        new_values = set(values) - self._sadd[key]
+        self._sadd[key].update(values)
+        new_values and await self._reserve()
+
+    async def xadd(self, key: str, message: str, maxlen: int | None = None, snapshot: Dict[str, str] | None = None):
+        self._xadd.append((key, message, maxlen, snapshot))
+        await self._reserve()
+
+    def _take(self) -> Tuple[Dict, Dict, Dict, List]:
+        batch = (self._hset, self._hincrby, self._sadd, self._xadd)
+        self._hset, self._hincrby, self._sadd, self._xadd = (
+            defaultdict(dict),
+            defaultdict(Counter),
+            defaultdict(set),
+            [],
+        )
+        self._size = 0
+        return batch
+
+    def _get_new_index_entries(self, hset: Dict, hincrby: Dict, sadd: Dict, xadd: List) -> Dict[str, Set[str]]:
+        keys = {*hset, *hincrby, *sadd}
+        for key, _, _, snapshot in xadd:
+            keys.add(key)
+            if snapshot:
+                keys.add(get_snapshot_key(key))
+        entries: DefaultDict[str, Set[str]] = defaultdict(set)
+        for key in keys - self._indexed:
+            if index := get_key_index(key):
+                entries[index].add(key)
+        return entries
+
+    async def _execute(self, hset: Dict, hincrby: Dict, sadd: Dict, xadd: List):
+        index_entries = self._get_new_index_entries(hset, hincrby, sadd, xadd)
+        async with self._get_redis() as conn:
+            async with get_pipeline(conn, transaction=True) as pipe:
+                for index, keys in index_entries.items():
+                    pipe.sadd(index, *keys)
+                for key, mapping in hset.items():
+                    pipe.hset(key, mapping=mapping)
+                for key, counter in hincrby.items():
+                    for field, value in counter.items():
+                        value and pipe.hincrby(key, field, value)
+                for key, values in sadd.items():
+                    pipe.sadd(key, *values)
+                # Events go last so that listeners always observe the state they announce
+                for key, message, maxlen, snapshot in xadd:
+                    queue_stream_message(pipe, key, message, maxlen, snapshot)
+                queue_stream_expire(pipe, {key for key, *_ in xadd})
+                await pipe.execute()
+        self._indexed.update(key for keys in index_entries.values() for key in keys)
+
+    async def flush(self):
+        async with self._lock:
+            if self._in_flight and not self._in_flight.done():
+                await self._in_flight
+            self._collecting = True
+            try:
+                for collector in self._collectors:
+                    await collector()
+            finally:
+                self._collecting = False
+            hset, hincrby, sadd, xadd = self._take()
+            self._has_space.set()
+            if not (hset or hincrby or sadd or xadd):
+                return
+            # The batch is already taken from the buffer, so the write must survive cancellation of the flushing task
+            self._in_flight = asyncio.create_task(self._execute(hset, hincrby, sadd, xadd))
+            await asyncio.shield(self._in_flight)
+
+    async def run(self):
+        self._running = True
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._flush_requested.wait(), timeout=self.tick)
+                except TimeoutError:
+                    pass
+                self._flush_requested.clear()
+                await self.flush()
+        finally:
+            self._running = False
+            self._has_space.set()
+
+    async def close(self):
+        await self.flush()
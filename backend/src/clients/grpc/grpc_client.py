@@ -6,6 +6,7 @@ from grpc import ChannelConnectivity, StatusCode, aio
 from pydantic import BaseModel
 
 from src.modules.auto_test.step_manager import step
+from src.modules.load_test_runner.metrics import measure_request
 from src.utils.pydantic_helper import FromProtobufModel
 from src.utils.rate_limiter import RateLimiter
 
@@ -99,11 +100,13 @@ class GrpcClient:
             async with step(f"Make {method_name} gRPC request"):
                 stub = self.server_stub(channel)
                 try:
-                    result = await getattr(stub, method_name)(
-                        self._model_to_grpc_request(request),
-                        timeout=timeout,
-                        metadata=tuple(metadata.items()) if metadata else None,
-                    )
+                    with measure_request(f"{self.server_stub.__name__}.{method_name}") as measurement:
+                        result = await getattr(stub, method_name)(
+                            self._model_to_grpc_request(request),
+                            timeout=timeout,
+                            metadata=tuple(metadata.items()) if metadata else None,
+                        )
+                        measurement.size = result.ByteSize()
                 except aio.AioRpcError as e:
                     self._raise_exception(e, method_name, request)
                 else:
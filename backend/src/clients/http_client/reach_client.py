@@ -8,6 +8,7 @@ from yarl import URL
 
 from src.clients.http_client.client import HttpClient
 from src.modules.auto_test.step_manager import step
+from src.modules.load_test_runner.metrics import endpoint_path, measure_request
 from src.utils.pydantic_helper import BaseResponse
 from src.utils.rate_limiter import RateLimiter
 
@@ -40,11 +41,23 @@ class ReachHttpClient(HttpClient):
 
     @asynccontextmanager
     async def _call(
-        self, uri: str, method: str, expected_status_code: int | None = None, **kwargs
+        self,
+        uri: str,
+        method: str,
+        expected_status_code: int | None = None,
+        metric_name: str | None = None,
+        **kwargs,
     ) -> AsyncGenerator[aiohttp.ClientResponse, None]:
         uri = uri.lstrip("/") if uri.startswith("/") else uri
-        async with step(f"Make {self.name} {method.upper()} request to: {self.base_url / uri}"):
-            async with self.limit, getattr(self.http_session, method)(url=self.base_url / uri, **kwargs) as resp:
+        # Load tests get per endpoint metrics with ids in the path replaced, pass metric_name to group other URIs
+        metric_name = metric_name or f"{self.name} {method.upper()} /{endpoint_path(uri)}"
+        async with step(f"Make {self.name} {method.upper()} request to: {self.base_url / uri}"), self.limit:
+            # The request is measured until the response is received, not while the caller handles it
+            with measure_request(metric_name) as measurement:
+                resp = await getattr(self.http_session, method)(url=self.base_url / uri, **kwargs)
+                measurement.ok = resp.status < 400
+                measurement.size = resp.content_length or 0
+            async with resp:
                 expected_status_code and self.check_status_code(
                     url=self.base_url / uri,
                     method=method,
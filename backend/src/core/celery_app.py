@@ -1,7 +1,11 @@
-import asyncio
+import threading
+from typing import Any
 
 from celery import Celery
+from celery.signals import celeryd_after_setup, task_postrun, task_prerun, worker_shutdown
+from celery.worker import state as worker_state
 
+from src.cache.celery_workers import CeleryWorkerRegistry, CeleryWorkersCache
 from src.core.config import settings
 
 celery_app = Celery(
@@ -12,23 +16,41 @@ celery_app = Celery(
 )
 
 celery_app.conf.task_default_queue = "main-queue"
-celery_inspect = celery_app.control.inspect()
 
+worker_registry = CeleryWorkerRegistry()
+heartbeat_stopped = threading.Event()
 
-def get_max_celery_concurrency() -> int:
-    stats = celery_inspect.stats()
-    max_concurrency = 0
-    for info in stats.values():
-        # One task can be taken by Celery to process a heartbeat.
-        max_concurrency += info["pool"]["max-concurrency"] - 1
-    return max_concurrency
 
+def send_heartbeats(hostname: str, slots: int):
+    while not heartbeat_stopped.wait(settings.CELERY_WORKER_HEARTBEAT_INTERVAL):
+        try:
+            # Requests of the tasks that are running, a killed task is removed from them by the worker
+            worker_registry.heartbeat(hostname, slots, len(worker_state.active_requests))
+        except Exception as e:
+            print(f"Celery worker heartbeat failed: {e}", flush=True)
 
-def get_current_celery_capacity_sync() -> int:
-    active_tasks = sum(len(tasks) for tasks in celery_inspect.active().values())
-    max_concurrency = get_max_celery_concurrency()
-    return max_concurrency - active_tasks
+
+@celeryd_after_setup.connect
+def register_worker(sender: str, instance: Any, **kwargs):
+    worker_registry.register(sender, instance.concurrency)
+    threading.Thread(target=send_heartbeats, args=(sender, instance.concurrency), daemon=True).start()
+
+
+@worker_shutdown.connect
+def unregister_worker(sender: Any, **kwargs):
+    heartbeat_stopped.set()
+    worker_registry.unregister(sender.hostname)
+
+
+@task_prerun.connect
+def take_slot(task: Any, **kwargs):
+    worker_registry.change_busy(task.request.hostname, 1)
+
+
+@task_postrun.connect
+def release_slot(task: Any, **kwargs):
+    worker_registry.change_busy(task.request.hostname, -1)
 
 
 async def get_current_celery_capacity() -> int:
-    return await asyncio.to_thread(get_current_celery_capacity_sync)
+    return await CeleryWorkersCache().get_capacity()
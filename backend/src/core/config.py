@@ -17,8 +17,25 @@ class Settings(BaseSettings):
 
     CELERY_BROKER: str
     CELERY_BACKEND: str
+    CELERY_WORKER_HEARTBEAT_INTERVAL: int = 10
+    CELERY_WORKER_HEARTBEAT_TTL: int = 30
 
     REDIS_CACHE: str
+    REDIS_MAX_CONNECTIONS: int = 200
+    REDIS_POOL_TIMEOUT: float = 10
+    # REDIS_CACHE is a node of a Redis Cluster, pipelines are not transactional and the client side cache is off
+    REDIS_CLUSTER: bool = False
+    # Process local cache of env and collected objects, needs Redis 6+ (CLIENT TRACKING)
+    REDIS_CLIENT_CACHE: bool = False
+    REDIS_CLIENT_CACHE_MAX_ITEMS: int = 10000
+    REDIS_CLIENT_CACHE_PING_INTERVAL: float = 5
+    # Event streams expire when nothing is written for CHANNEL_TTL seconds, or CHANNEL_CLOSED_TTL after the shutdown
+    CHANNEL_TTL: int = 60 * 60 * 24
+    CHANNEL_CLOSED_TTL: int = 60 * 5
+    CHANNEL_MAXLEN: int = 10000
+    # Channel events are coalesced into one websocket frame per interval
+    WEBSOCKET_FLUSH_INTERVAL: float = 0.25
+    WEBSOCKET_PER_MESSAGE_DEFLATE: bool = True
 
     DB_SERVER: str
     DB_USER: str
@@ -0,0 +1,10 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from src.core.config import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "ws_per_message_deflate": settings.WEBSOCKET_PER_MESSAGE_DEFLATE,
+    }
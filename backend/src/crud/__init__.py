@@ -3,6 +3,7 @@ from .auto_test.auto_test_environment import auto_test_env
 from .auto_test.auto_test_history import auto_test_history
 from .auto_test.test_run_history import test_run_history
 from .load_test.load_test import load_test
+from .load_test.load_test_history import load_test_history
 from .script_runner.script import script
 from .script_runner.script_history import script_history
 from .user import user
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pytz import utc
 from sqlalchemy import delete, desc, select
@@ -57,6 +57,14 @@ class CRUDAutoTestHistory(CRUDBase[models.AutoTestHistory, AutoTestHistoryDB, Au
             result_by_status.increment_by(status, count)
         return result_by_status
 
+    async def get_average_durations(self, db: AsyncSession, test_ids: List[str]) -> Dict[str, float]:
+        query_result = await db.execute(
+            select(self.model.test_id, func.avg(self.model.duration))
+            .where(self.model.test_id.in_(test_ids), self.model.duration.is_not(None))
+            .group_by(self.model.test_id)
+        )
+        return {test_id: float(duration) for test_id, duration in query_result}
+
     async def clear_history(self, db: AsyncSession):
         await db.execute(delete(self.model))
 
@@ -28,18 +28,22 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(select(self.model))
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
+        await db.commit() if commit else await db.flush()
         return db_obj
 
-    async def create_multi(self, db: AsyncSession, *, objects_in: List[CreateSchemaType]) -> None:
-        for obj_in in objects_in:
-            query = insert(self.model).values(obj_in.model_dump())
+    async def create_multi(
+        self, db: AsyncSession, *, objects_in: List[CreateSchemaType], batch_size: int = 1000, commit: bool = True
+    ) -> None:
+        """Objects are inserted by multi-row INSERT statements of batch_size rows"""
+        for i in range(0, len(objects_in), batch_size):
+            query = insert(self.model).values([obj_in.model_dump() for obj_in in objects_in[i : i + batch_size]])
             await db.execute(query)
-        await db.commit()
+        if commit:
+            await db.commit()
 
     @staticmethod
     async def update(
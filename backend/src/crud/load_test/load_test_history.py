@@ -0,0 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+from src.crud.base import CRUDBase
+from src.schemas.load_test.load_test_history import LoadTestHistoryDB
+
+
+class CRUDLoadTestHistory(CRUDBase[models.LoadTestHistory, LoadTestHistoryDB, LoadTestHistoryDB]):
+    async def clear_history(self, db: AsyncSession):
+        await self.delete_all(db)
+
+
+load_test_history = CRUDLoadTestHistory(models.LoadTestHistory)
@@ -4,6 +4,8 @@ from src.models.auto_test.auto_test import AutoTest  # noqa
 from src.models.auto_test.auto_test_environment import AutoTestEnvironment  # noqa
 from src.models.auto_test.auto_test_history import AutoTestHistory  # noqa
 from src.models.auto_test.test_run import TestRunHistory  # noqa
+from src.models.load_test.load_test import LoadTest  # noqa
+from src.models.load_test.load_test_history import LoadTestHistory  # noqa
 from src.models.script_runner.script import Script  # noqa
 from src.models.script_runner.script_history import ScriptHistory  # noqa
 from src.models.user import User  # noqa
@@ -3,6 +3,7 @@ from .auto_test.auto_test_environment import AutoTestEnvironment
 from .auto_test.auto_test_history import AutoTestHistory
 from .auto_test.test_run import TestRunHistory
 from .load_test.load_test import LoadTest
+from .load_test.load_test_history import LoadTestHistory
 from .script_runner.script import Script
 from .script_runner.script_history import ScriptHistory
 from .user import User
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, Enum, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, Enum, Float, ForeignKey, Integer, String
 
 from src.db.base_class import Base
 from src.schemas.auto_test.auto_test_history import StatusEnum
@@ -17,3 +17,4 @@ class AutoTestHistory(Base):
     assets_path = Column(JSON, nullable=False, comment="Path to autotest assets directory")
     generated_params = Column(JSON, nullable=False, comment="Variables generated during test")
     errors = Column(JSON, nullable=True, comment="Autotest errors")
+    duration = Column(Float, nullable=True, comment="Seconds from the setup start to the teardown end")
@@ -0,0 +1,31 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+
+from src.db.base_class import Base
+
+
+class LoadTestHistory(Base):
+    id = Column(
+        String(132),
+        primary_key=True,
+        index=True,
+        unique=True,
+        comment="UUID of load test execution",
+    )
+    load_test_id = Column(String(132), ForeignKey("load_test.id"))
+    params = Column(JSON, nullable=False, comment="Load test launch parameter values")
+    config_values = Column(JSON, nullable=False, comment="Load test execution config values")
+    chart_config = Column(JSON, nullable=True, comment="Charts config that load test produced")
+    number_of_tasks = Column(Integer, nullable=False, comment="Number of tasks requested on start")
+    status = Column(String(50), nullable=False, comment="Load test execution final status")
+    failure_reason = Column(String(1000), nullable=True, comment="Failed thresholds of the load test execution")
+    root_folder = Column(String(100), nullable=False, comment="The root folder to which the load test belongs")
+    environment = Column(String(50), nullable=False, comment="Environment on which the load test was executed")
+    workers = Column(JSON, nullable=False, comment="Final statuses of load test workers")
+    resolution = Column(Integer, nullable=False, comment="Task status history bucket size in seconds")
+    task_status_history = Column(JSON, nullable=False, comment="Downsampled task status history")
+    charts = Column(JSON, nullable=False, comment="Charts data")
+    arrivals = Column(JSON, nullable=True, comment="Open model arrival statistic")
+    metrics = Column(JSON, nullable=True, comment="Downsampled per endpoint request metrics")
+    user_id = Column(Integer, ForeignKey("user.id"))
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
@@ -9,6 +9,16 @@ class Settings(BaseSettings):
     ROOT_PATH: Path = Path("src/modules/auto_test/tests")
     ITERATION_NAMES: Set[str] = {"iteration_name", "i_name"}
     AUTO_TEST_PENDING_RUNS: str = "pending_test_run_ids"
+    # Redis keys of a finished test run expire after it, the run tree is only read from Redis
+    RUN_REDIS_RETENTION: int = 60 * 60 * 24 * 30
+    # Tests of a run executed at once, in total and of one test class. Group stages are not limited
+    MAX_TESTS_IN_FLIGHT: int = 100
+    MAX_TESTS_IN_FLIGHT_PER_CLASS: int = 20
+    # A run is split by test class into shards executed by separate Celery tasks, up to the free Celery slots
+    MAX_RUN_SHARDS: int = 8
+    MIN_TESTS_PER_SHARD: int = 50
+    # Rows of one multi-row INSERT when the results of a finished run are saved to the database
+    HISTORY_DB_BATCH_SIZE: int = 500
 
 
 settings = Settings()
@@ -1,12 +1,20 @@
 import asyncio
+import heapq
+import time
 from collections import defaultdict
 from contextlib import asynccontextmanager
 from sys import exc_info
 from traceback import format_exc, format_exception
-from typing import Callable, Coroutine, Dict, List, Type
+from typing import Callable, Coroutine, Dict, List, Tuple, Type
 
 from src.cache.auto_test.test_run import TestRunCache
+from src.cache.auto_test.test_run_shards import TestRunShardsCache
+from src.cache.connection import redis
+from src.cache.lifecycle import auto_test_run_keys
+from src.core.celery_app import celery_app, get_current_celery_capacity
+from src.core.config import settings as app_settings
 from src.modules.auto_test.collector import Collector
+from src.modules.auto_test.config import settings
 from src.modules.auto_test.contexts import (
     auto_test_context,
     auto_test_contexts,
@@ -14,12 +22,14 @@ from src.modules.auto_test.contexts import (
     test_run_context,
 )
 from src.modules.auto_test.reporter import Reporter
+from src.modules.auto_test.run_state import TestRunState
+from src.modules.auto_test.scheduler import TestScheduler
 from src.modules.auto_test.test_abs import TestAbs
 from src.modules.environment.env import env
 from src.schemas.auto_test.auto_test import AutoTest, AutoTestContext, TestClass
 from src.schemas.auto_test.auto_test_history import StageEnum, StageResult, StatusEnum
 from src.schemas.auto_test.common import TestError
-from src.schemas.auto_test.test_run import TestRunStatus
+from src.schemas.auto_test.test_run import TestRun, TestRunStatus
 from src.utils.rate_limiter import Singleton
 
 
@@ -30,15 +40,19 @@ class CancelError(Exception):
 
 class TestManager:
     def __init__(self, run_id: str):
-        self.run_id: run_id
+        self.run_id = run_id
         self.collector = Collector()
         self.reporter = Reporter(run_id)
+        self.run_state = TestRunState(self.reporter)
         self.group_setup_lock = asyncio.Lock()
         self.group_teardown_lock = asyncio.Lock()
         self.tests_in_each_class_counter: Dict[TestClass, int] = {}
         self.group_setup_complete_events: Dict[TestClass, asyncio.Event] = {}
         self.group_teardown_complete_events: Dict[TestClass, asyncio.Event] = {}
         self.test_run_cache = TestRunCache(run_id)
+        self.test_run_shards_cache = TestRunShardsCache(run_id)
+        self.scheduler = TestScheduler(settings.MAX_TESTS_IN_FLIGHT, settings.MAX_TESTS_IN_FLIGHT_PER_CLASS)
+        self.test_durations: Dict[str, float] = {}
 
     @asynccontextmanager
     async def guard(self, phase_name: str, timeout: int = 10 * 60):
@@ -59,16 +73,7 @@ class TestManager:
         async with self.guard("Status change to pending"):
             await self.reporter.update_test_run_status(TestRunStatus.pending)
 
-        async with self.guard("Context preparation"):
-            test_run = await self.test_run_cache.get()
-            test_run_context.set(test_run)
-
-            env.prime_environment(
-                env_name=test_run.env_name,
-                setting_overwrite=test_run.setting_overwrite,
-                env_user_contexts=[auto_test_context],
-                env_user_multi_contexts=[auto_test_contexts],
-            )
+        test_run = await self.prepare_context()
 
         async with self.guard("AutoTest collection"):
             selected_tests = await self.collector.collect_test_by_ids(test_run.test_ids, test_run.root_folder)
@@ -81,7 +86,105 @@ class TestManager:
             await self.reporter.enrich_test_run_with_tests(selected_tests)
             await self.reporter.update_test_run_status(TestRunStatus.primed)
 
+        async with self.guard("Load historical durations"):
+            await self.load_test_durations(selected_tests)
+
+        async with self.guard("Plan shards"):
+            shards = self.plan_shards(selected_tests, await self.get_number_of_shards(len(selected_tests)))
+
+        if len(shards) > 1:
+            async with self.guard("Start shard tasks"):
+                await self.test_run_shards_cache.create([[test.id for test in shard] for shard in shards])
+                await auto_test_run_keys.track([self.test_run_shards_cache.key])
+                await self.reporter.update_test_run_status(TestRunStatus.running)
+                for shard_index in range(len(shards)):
+                    celery_app.send_task(
+                        "src.tasks.run_test_shard", kwargs={"run_id": self.run_id, "shard_index": shard_index}
+                    )
+            return
+
+        async with self.guard("Status change to running"):
+            await self.reporter.update_test_run_status(TestRunStatus.running)
+
+        await self.run_selected_tests(test_run, selected_tests)
+
+        async with self.guard("Finish test run report"):
+            await self.reporter.finish_test_run_report()
+
+    async def run_shard(self, shard_index: int):
+        test_run = await self.prepare_context()
+
+        async with self.guard("AutoTest collection"):
+            test_ids = await self.test_run_shards_cache.get(shard_index)
+            selected_tests = await self.collector.collect_test_by_ids(test_ids, test_run.root_folder)
+
+        async with self.guard("AutoTest priming with env and config"):
+            self.collector.prime_tests_with_env(env, selected_tests)
+            self.collector.prime_tests_with_run_config(test_run.run_config, selected_tests)
+
+        async with self.guard("Load historical durations"):
+            await self.load_test_durations(selected_tests)
+
+        await self.run_selected_tests(test_run, selected_tests)
+
+        async with self.guard("Finish test run report"):
+            # A failed shard never finishes, so the run keeps its error
+            if await self.test_run_shards_cache.finish():
+                await self.reporter.finish_test_run_report()
+
+    async def prepare_context(self) -> TestRun:
+        async with self.guard("Context preparation"):
+            test_run = await self.test_run_cache.get()
+            test_run_context.set(test_run)
+
+            env.prime_environment(
+                env_name=test_run.env_name,
+                setting_overwrite=test_run.setting_overwrite,
+                env_user_contexts=[auto_test_context],
+                env_user_multi_contexts=[auto_test_contexts],
+            )
+        return test_run
+
+    async def load_test_durations(self, selected_tests: List[AutoTest]):
+        durations = await self.reporter.get_test_durations([test.id for test in selected_tests])
+        # Tests without history are expected to take as long as an average test
+        default_duration = sum(durations.values()) / len(durations) if durations else 0
+        self.test_durations = {test.id: durations.get(test.id, default_duration) for test in selected_tests}
+
+    async def get_number_of_shards(self, number_of_tests: int) -> int:
+        if app_settings.RUN_TEST_IN_MAIN_LOOP:
+            return 1
+        number_of_shards = min(settings.MAX_RUN_SHARDS, number_of_tests // settings.MIN_TESTS_PER_SHARD)
+        if number_of_shards <= 1:
+            return 1
+        # The slot of this task is free again when the shards are started
+        return max(min(number_of_shards, await get_current_celery_capacity() + 1), 1)
+
+    def plan_shards(self, selected_tests: List[AutoTest], number_of_shards: int) -> List[List[AutoTest]]:
+        """
+        Whole test classes go to shards, so a group setup and teardown run once in the shard of their tests.
+        Classes are taken longest expected duration first and go to the shard with the least duration.
+        """
+        selected_classes: Dict[TestClass, List[AutoTest]] = defaultdict(list)
+        for test in selected_tests:
+            selected_classes[test.test_class].append(test)
+        class_durations = {
+            test_class: sum(self.test_durations[test.id] for test in tests)
+            for test_class, tests in selected_classes.items()
+        }
+        shards: List[Tuple[float, int, List[AutoTest]]] = [
+            (0, shard_index, []) for shard_index in range(min(number_of_shards, len(selected_classes)) or 1)
+        ]
+        for test_class in sorted(selected_classes, key=lambda item: -class_durations[item]):
+            duration, shard_index, shard = heapq.heappop(shards)
+            shard.extend(selected_classes[test_class])
+            heapq.heappush(shards, (duration + class_durations[test_class], shard_index, shard))
+        return [shard for _, _, shard in sorted(shards, key=lambda item: item[1])]
+
+    async def run_selected_tests(self, test_run: TestRun, selected_tests: List[AutoTest]):
         async with self.guard("Prepare async tasks and events"):
+            # Tests wake up after the group setup in this order, so the first admitted ones are the longest too
+            selected_tests = sorted(selected_tests, key=lambda test: -self.test_durations[test.id])
             selected_classes: Dict[TestClass, List] = defaultdict(list)
             for test in selected_tests:
                 selected_classes[test.test_class].append(test.id)
@@ -98,19 +201,16 @@ class TestManager:
             self.group_setup_complete_events = {test_class: asyncio.Event() for test_class in selected_classes}
             self.group_teardown_complete_events = {test_class: asyncio.Event() for test_class in selected_classes}
 
-        async with self.guard("Status change to running"):
-            await self.reporter.update_test_run_status(TestRunStatus.running)
-
         async with self.guard("Run auto tests", timeout=None):
             for task in asyncio.as_completed([*group_setup, *test_calls, *group_teardown]):
                 await task
 
+        async with self.guard("Report stage results"):
+            await self.run_state.flush()
+
         async with self.guard("Clear run singletons"):
             Singleton.clear_by_test_run(test_run.id)
 
-        async with self.guard("Finish test run report"):
-            await self.reporter.finish_test_run_report()
-
     @asynccontextmanager
     async def stage(self, stage_name: StageEnum, test_contexts: List[AutoTestContext]):
         auto_test_current_step_list.set([])
@@ -136,7 +236,7 @@ class TestManager:
             stage_result.status = StatusEnum.success
 
         stage_result.steps_data = auto_test_current_step_list.get()
-        await self.reporter.update_auto_test_stage(test_contexts, stage_name, stage_result)
+        self.run_state.update_stage(test_contexts, stage_name, stage_result)
 
     async def run_group_setup(self, test_class: TestClass, test_ids: List[str]):
         auto_test_contexts.set([AutoTestContext(id=test_id) for test_id in test_ids])
@@ -151,10 +251,7 @@ class TestManager:
         self, test_class: Type[TestAbs], test_instance: TestAbs, test_context: AutoTestContext, params: Dict
     ):
         async with self.stage(StageEnum.setup, [test_context]):
-            group_setup_stage = await self.reporter.auto_test_history_stages_cache.get(
-                test_context.id, StageEnum.group_setup
-            )
-            if group_setup_stage.status == StatusEnum.fail:
+            if self.run_state.get_status(test_context.id, StageEnum.group_setup) == StatusEnum.fail:
                 raise CancelError("Cancel due to group setup failed")
             for test_parent in test_class.__mro__[::-1]:
                 if issubclass(test_parent, TestAbs) and StageEnum.setup in test_parent.__dict__.keys():
@@ -162,13 +259,9 @@ class TestManager:
 
     async def run_call(self, test_instance: TestAbs, test_context: AutoTestContext, method_name: str, params: Dict):
         async with self.stage(StageEnum.call, [test_context]):
-            group_setup_stage = await self.reporter.auto_test_history_stages_cache.get(
-                test_context.id, StageEnum.group_setup
-            )
-            setup_stage = await self.reporter.auto_test_history_stages_cache.get(test_context.id, StageEnum.setup)
-            if group_setup_stage.status == StatusEnum.fail:
+            if self.run_state.get_status(test_context.id, StageEnum.group_setup) == StatusEnum.fail:
                 raise CancelError("Cancel due to group setup failed")
-            if setup_stage.status == StatusEnum.fail:
+            if self.run_state.get_status(test_context.id, StageEnum.setup) == StatusEnum.fail:
                 raise CancelError("Cancel due to setup failed")
             await getattr(test_instance, method_name)(**params)
 
@@ -176,10 +269,7 @@ class TestManager:
         self, test_class: Type[TestAbs], test_instance: TestAbs, test_context: AutoTestContext, params: Dict
     ):
         async with self.stage(StageEnum.teardown, [test_context]):
-            group_setup_stage = await self.reporter.auto_test_history_stages_cache.get(
-                test_context.id, StageEnum.group_setup
-            )
-            if group_setup_stage.status == StatusEnum.fail:
+            if self.run_state.get_status(test_context.id, StageEnum.group_setup) == StatusEnum.fail:
                 raise CancelError("Cancel due to group setup failed")
             for test_parent in test_class.__mro__:
                 if issubclass(test_parent, TestAbs) and StageEnum.teardown in test_parent.__dict__.keys():
@@ -201,13 +291,23 @@ class TestManager:
         await self.run_call(test_instance, auto_test_context.get(), auto_test.test_method.name, auto_test.params)
         await self.run_teardown(auto_test.test_class.cls, test_instance, auto_test_context.get(), auto_test.params)
 
+    async def _run_one_test_in_thread(self, auto_test: AutoTest):
+        try:
+            await self._run_one_test(auto_test)
+        finally:
+            # The event loop of the thread is closed after the test
+            await self.run_state.flush()
+
     async def run_one_test(self, auto_test: AutoTest):
         await self.group_setup_complete_events[auto_test.test_class].wait()
 
-        if auto_test.run_in_separate_thread:
-            await self.run_in_separate_thread(self._run_one_test, auto_test)
-        else:
-            await self._run_one_test(auto_test)
+        async with self.scheduler.slot(auto_test.test_class, self.test_durations[auto_test.id]):
+            start = time.monotonic()
+            if auto_test.run_in_separate_thread:
+                await self.run_in_separate_thread(self._run_one_test_in_thread, auto_test)
+            else:
+                await self._run_one_test(auto_test)
+            await self.reporter.update_auto_test_duration(auto_test.id, time.monotonic() - start)
 
         self.tests_in_each_class_counter[auto_test.test_class] -= 1
         if self.tests_in_each_class_counter[auto_test.test_class] == 0:
@@ -217,6 +317,9 @@ class TestManager:
     def run_all_sync(self) -> None:
         asyncio.get_event_loop().run_until_complete(self.run_tests())
 
+    def run_shard_sync(self, shard_index: int) -> None:
+        asyncio.get_event_loop().run_until_complete(self.run_shard(shard_index))
+
     @staticmethod
     def _run_in_new_loop(coro: Callable, *args, **kwargs):
         loop = asyncio.new_event_loop()
@@ -225,6 +328,7 @@ class TestManager:
             asyncio.set_event_loop(loop)
             return loop.run_until_complete(coro)
         finally:
+            loop.run_until_complete(redis.close())
             loop.close()
 
     async def run_in_separate_thread(self, coro: Callable, *args, **kwargs) -> Coroutine:
@@ -1,16 +1,25 @@
-import asyncio
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import DefaultDict, Dict, List, Tuple
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import crud
-from src.cache import AutoTestHistoryCache, AutoTestHistoryGroupsCache, AutoTestHistoryStagesCache, AutoTestTagsCache
+from src.cache import (
+    AutoTestHistoryCache,
+    AutoTestHistoryGroupsCache,
+    AutoTestHistoryStagesCache,
+    AutoTestTagsCache,
+    TestRunTreeCache,
+)
 from src.cache.auto_test.pending_runs import PendingRunsCache
 from src.cache.auto_test.test_run import TestRunCache, TestRunChannel
+from src.cache.lifecycle import auto_test_run_keys
 from src.core.config import settings as app_settings
 from src.db.session import SessionLocal
+from src.modules.auto_test.config import settings as auto_test_settings
 from src.schemas import User
 from src.schemas.auto_test.auto_test import AutoTest, AutoTestContext
 from src.schemas.auto_test.auto_test_history import (
@@ -21,11 +30,13 @@ from src.schemas.auto_test.auto_test_history import (
     AutoTestItem,
     AutoTestStages,
     AutoTestStatisticResponse,
+    CachedTestResultTree,
     ResultTreeStatus,
     StageEnum,
     StageResult,
     StatusEnum,
     TestResultTree,
+    TestResultTreeChanges,
 )
 from src.schemas.auto_test.common import TestError
 from src.schemas.auto_test.test_run import (
@@ -39,7 +50,6 @@ from src.schemas.auto_test.test_run import (
     TestRunUpdate,
 )
 from src.schemas.environment import EnvEnum
-from src.utils.async_iterator_utils import batch
 from src.utils.format import format_class_name, format_method_name
 
 
@@ -55,6 +65,9 @@ class Reporter:
             self.auto_test_history_groups_cache = AutoTestHistoryGroupsCache(run_id)
             self.auto_test_history_stages_cache = AutoTestHistoryStagesCache(run_id)
             self.test_run_channel = TestRunChannel(run_id)
+            self.test_run_tree_cache = TestRunTreeCache(run_id)
+        # Histories of the tests reported by this process, stage results are merged into them
+        self.auto_test_histories: Dict[str, AutoTestHistory] = {}
 
     async def start_test_run_report(self, user: User, start_request: StartTestRunRequest) -> StartTestRunResponse:
         start_time = datetime.now(timezone.utc)
@@ -68,6 +81,15 @@ class Reporter:
             **start_request.model_dump(),
         )
         await self.test_run_cache.create(test_run)
+        await auto_test_run_keys.track(
+            [
+                self.test_run_cache.root_key,
+                self.test_run_cache.result_key,
+                self.test_run_channel.key,
+                self.test_run_tree_cache.key,
+                self.test_run_tree_cache.journal_key,
+            ]
+        )
         await self.pending_runs_cache.add(start_request.root_folder, start_request.env_name, self.run_id)
         return StartTestRunResponse(**test_run.model_dump())
 
@@ -80,54 +102,101 @@ class Reporter:
         await self.update_test_run_status(status=TestRunStatus.fail)
         await self.test_run_cache.update(TestRunUpdate(error=error))
         await self.pending_runs_cache.remove(test_run.root_folder, test_run.env_name, self.run_id)
+        await auto_test_run_keys.expire(run_id=self.run_id)
 
-    async def get_test_run_statistic(self) -> TestRun:
+    async def get_test_run_statistic(self) -> TestRun | None:
         return await self.test_run_cache.get()
 
-    async def get_test_run_status(self) -> TestRunStatus:
+    async def get_test_run_status(self) -> TestRunStatus | None:
         return await self.test_run_cache.get_status()
 
     async def enrich_test_run_with_tests(self, auto_tests: List[AutoTest]):
         all_groups: Dict[str, AutoTestGroup] = {}
+        histories: List[AutoTestHistory] = []
         for auto_test in auto_tests:
             auto_test_groups = self._calc_test_groups_and_update_test_run_groups(auto_test, all_groups)
-            history = AutoTestHistory(
-                test_id=auto_test.id,
-                iteration_name=auto_test.iteration_name,
-                method_name=auto_test.test_method.name,
-                description=auto_test.test_method.description,
-                test_run_id=self.run_id,
-                params=auto_test.params,
-                run_config=auto_test.run_config,
-                groups=auto_test_groups,
+            histories.append(
+                AutoTestHistory(
+                    test_id=auto_test.id,
+                    iteration_name=auto_test.iteration_name,
+                    method_name=auto_test.test_method.name,
+                    description=auto_test.test_method.description,
+                    test_run_id=self.run_id,
+                    params=auto_test.params,
+                    run_config=auto_test.run_config,
+                    groups=auto_test_groups,
+                )
+            )
+        async with self.test_run_cache.pipeline():
+            await self.auto_test_history_cache.create_multi(histories)
+            for auto_test in auto_tests:
+                await self.auto_test_history_stages_cache.create_multi(auto_test.id, AutoTestStages())
+            await self.auto_test_history_groups_cache.create_multi(all_groups)
+            await self.test_run_cache.update(TestRunUpdate(group_ids=list(all_groups.keys())))
+            await self.test_run_cache.increment_by(StatusEnum.pending, len(auto_tests))
+            await self.test_run_tree_cache.create(self._build_cached_tree(all_groups, histories))
+            await auto_test_run_keys.track(
+                [self.auto_test_history_cache.get_key(auto_test.id) for auto_test in auto_tests]
+                + [self.auto_test_history_stages_cache.get_key(auto_test.id) for auto_test in auto_tests]
+                + [key for group_id in all_groups for key in self.auto_test_history_groups_cache.get_keys(group_id)]
             )
-            await self.auto_test_history_cache.create(history)
-            await self.auto_test_history_stages_cache.create_multi(auto_test.id, AutoTestStages())
-        await self.auto_test_history_groups_cache.create_multi(all_groups)
-        await self.test_run_cache.update(TestRunUpdate(group_ids=list(all_groups.keys())))
-        await self.test_run_cache.increment_by(StatusEnum.pending, len(auto_tests))
 
-    async def get_test_run_tree(self) -> TestResultTree:
-        test_run = await self.test_run_cache.get()
-        if test_run.status in (TestRunStatus.idle, TestRunStatus.pending):
-            return TestResultTree(status=ResultTreeStatus.idle)
-        elif test_run.status == TestRunStatus.fail:
-            return TestResultTree(status=ResultTreeStatus.failed)
-        else:
-            groups = await self.auto_test_history_groups_cache.get_multi(test_run.group_ids)
-            auto_tests_history = await self.auto_test_history_cache.get_multi(test_run.test_ids)
-            first_level, group_map = [], {}
-            for group in groups:
-                group.root and first_level.append(group.name)
-                group_map[group.id] = group
-            items_map = {
+    @staticmethod
+    def _build_cached_tree(groups: Dict[str, AutoTestGroup], histories: List[AutoTestHistory]) -> CachedTestResultTree:
+        tree = TestResultTree(
+            status=ResultTreeStatus.pending,
+            first_level=[group.name for group in groups.values() if group.root],
+            groups=groups,
+            items={
                 history.test_id: AutoTestItem(name=history.iteration_name, status=history.status)
-                for history in auto_tests_history
-            }
-            tree_status = (
-                ResultTreeStatus.finished if test_run.status == TestRunStatus.success else ResultTreeStatus.pending
-            )
-            return TestResultTree(status=tree_status, first_level=first_level, groups=group_map, items=items_map)
+                for history in histories
+            },
+        )
+        return CachedTestResultTree(tree=tree, item_groups={history.test_id: history.groups for history in histories})
+
+    @staticmethod
+    def _get_tree_status(status: TestRunStatus) -> ResultTreeStatus:
+        if status in (TestRunStatus.idle, TestRunStatus.pending):
+            return ResultTreeStatus.idle
+        elif status == TestRunStatus.fail:
+            return ResultTreeStatus.failed
+        return ResultTreeStatus.finished if status == TestRunStatus.success else ResultTreeStatus.pending
+
+    async def get_test_run_tree(self) -> TestResultTree | None:
+        if not (status := await self.test_run_cache.get_status()):
+            return None
+        tree_status = self._get_tree_status(status)
+        if tree_status in (ResultTreeStatus.idle, ResultTreeStatus.failed):
+            return TestResultTree(status=tree_status)
+        if not (cached := await self.test_run_tree_cache.get()):
+            # Runs started before the tree was cached
+            return await self._build_test_run_tree()
+        cached.tree.status, cached.tree.version = tree_status, cached.version
+        return cached.tree
+
+    async def get_test_run_tree_changes(self, since: int) -> TestResultTreeChanges | None:
+        """Changes of the item statuses and the group results after the version of the tree known by the client"""
+        if not (status := await self.test_run_cache.get_status()):
+            return None
+        tree_status = self._get_tree_status(status)
+        changes = await self.test_run_tree_cache.get_changes(since)
+        version = changes[-1].version if changes else since
+        return TestResultTreeChanges(status=tree_status, version=version, changes=changes)
+
+    async def _build_test_run_tree(self) -> TestResultTree:
+        test_run = await self.test_run_cache.get()
+        groups = await self.auto_test_history_groups_cache.get_multi(test_run.group_ids)
+        auto_tests_history = await self.auto_test_history_cache.get_multi(test_run.test_ids)
+        first_level, group_map = [], {}
+        for group in groups:
+            group.root and first_level.append(group.name)
+            group_map[group.id] = group
+        items_map = {
+            history.test_id: AutoTestItem(name=history.iteration_name, status=history.status)
+            for history in auto_tests_history
+        }
+        tree_status = self._get_tree_status(test_run.status)
+        return TestResultTree(status=tree_status, first_level=first_level, groups=group_map, items=items_map)
 
     async def get_test_run_item(self, auto_test_id: str) -> AutoTestHistory | None:
         item = await self.auto_test_history_cache.get(auto_test_id)
@@ -139,46 +208,103 @@ class Reporter:
         return item
 
     async def get_test_run_items(self, auto_test_ids: List[str]) -> List[AutoTestHistory]:
-        return await asyncio.gather(*[self.get_test_run_item(test_id) for test_id in auto_test_ids])
-
-    async def update_auto_test_stage(
-        self, test_contexts: List[AutoTestContext], stage_name: StageEnum, stage_result: StageResult
-    ):
-        for test_context in test_contexts:
-            test_id = test_context.id
-            await self.auto_test_history_stages_cache.update(test_id, stage_name, stage_result)
-            auto_test_history_current = await self.auto_test_history_cache.get(test_id)
-            auto_test_history_update = AutoTestHistoryUpdate()
-
-            if stage_result.errors:
-                auto_test_history_update.errors = auto_test_history_current.errors | {stage_name: stage_result.errors}
-
-            auto_test_history_update.env_used = auto_test_history_current.env_used | test_context.env_used
-            auto_test_history_update.generated_params = (
-                auto_test_history_current.generated_params | test_context.generated_params
-            )
-            auto_test_history_update.assets_path = auto_test_history_current.assets_path | test_context.assets_path
-            auto_test_history_update.warnings = auto_test_history_current.warnings + test_context.warnings
-            test_context.warnings = []
-
-            test_not_failed = auto_test_history_current.status != StatusEnum.fail
-            stage_is_failed = stage_result.status == StatusEnum.fail
-            stage_is_successful = stage_result.status == StatusEnum.success
-
-            change_to_fail = test_not_failed and stage_is_failed
-            change_to_success = test_not_failed and stage_name == StageEnum.teardown and stage_is_successful
-
-            if change_to_fail or change_to_success:
-                auto_test_history_update.status = stage_result.status
-                for group_name in auto_test_history_current.groups:
-                    await self.auto_test_history_groups_cache.increment_by(group_name, stage_result.status, 1)
-                    await self.auto_test_history_groups_cache.increment_by(
-                        group_name, auto_test_history_current.status, -1
-                    )
-                await self.test_run_cache.increment_by(stage_result.status, 1)
-                await self.test_run_cache.increment_by(auto_test_history_current.status, -1)
-
-            await self.auto_test_history_cache.update(test_id, auto_test_history_update)
+        items = await self.auto_test_history_cache.get_multi(auto_test_ids)
+        all_stages = await self.auto_test_history_stages_cache.get_all_multi(auto_test_ids)
+        for item, stages in zip(items, all_stages):
+            if item:
+                item.stages = stages
+                item.method_name = format_method_name(item.method_name)
+        return items
+
+    async def get_test_durations(self, test_ids: List[str]) -> Dict[str, float]:
+        """Average durations of the tests in the finished runs, tests without history are missing"""
+        try:
+            async with self.db_session() as db:
+                return await crud.auto_test_history.get_average_durations(db, test_ids)
+        except Exception as e:
+            print(f"Exception during reading test durations from db: {e}")
+            return {}
+
+    async def update_auto_test_duration(self, test_id: str, duration: float):
+        await self.auto_test_history_cache.update(test_id, AutoTestHistoryUpdate(duration=duration))
+
+    async def update_auto_test_stages(self, reports: List[Tuple[List[AutoTestContext], StageEnum, StageResult]]):
+        """
+        Stage results are merged into the histories kept in memory, this process is the only writer of its tests.
+        The merged histories and stages are written first, then the status transitions and their tree changes,
+        each in one pipeline.
+        """
+        test_ids = {test_context.id for test_contexts, _, _ in reports for test_context in test_contexts}
+        if unknown := [test_id for test_id in test_ids if test_id not in self.auto_test_histories]:
+            for history in await self.auto_test_history_cache.get_multi(unknown):
+                history and self.auto_test_histories.setdefault(history.test_id, history)
+
+        stages: DefaultDict[str, Dict[StageEnum, StageResult]] = defaultdict(dict)
+        transitions: List[Tuple[AutoTestHistory, StatusEnum, StatusEnum]] = []
+        for test_contexts, stage_name, stage_result in reports:
+            for test_context in test_contexts:
+                if not (history := self.auto_test_histories.get(test_context.id)):
+                    continue
+                stages[history.test_id][stage_name] = stage_result
+
+                if stage_result.errors:
+                    history.errors = history.errors | {stage_name: stage_result.errors}
+                history.env_used = history.env_used | test_context.env_used
+                history.generated_params = history.generated_params | test_context.generated_params
+                history.assets_path = history.assets_path | test_context.assets_path
+                history.warnings = history.warnings + test_context.warnings
+                test_context.warnings = []
+
+                test_not_failed = history.status != StatusEnum.fail
+                stage_is_failed = stage_result.status == StatusEnum.fail
+                stage_is_successful = stage_result.status == StatusEnum.success
+
+                change_to_fail = test_not_failed and stage_is_failed
+                change_to_success = test_not_failed and stage_name == StageEnum.teardown and stage_is_successful
+
+                if change_to_fail or change_to_success:
+                    transitions.append((history, history.status, stage_result.status))
+                    history.status = stage_result.status
+
+        async with self.test_run_cache.pipeline():
+            for test_id, test_stages in stages.items():
+                history = self.auto_test_histories[test_id]
+                await self.auto_test_history_stages_cache.update_many(test_id, test_stages)
+                await self.auto_test_history_cache.update(
+                    test_id,
+                    AutoTestHistoryUpdate(
+                        errors=history.errors,
+                        env_used=history.env_used,
+                        generated_params=history.generated_params,
+                        assets_path=history.assets_path,
+                        warnings=history.warnings,
+                    ),
+                )
+
+        # The check of the current status is repeated by the script, a failed test never changes its status
+        entries = [
+            self.test_run_tree_cache.get_journal_entry(history.test_id, history.groups) for history, *_ in transitions
+        ]
+        versions = await self.auto_test_history_cache.transition_status_many(
+            [
+                (
+                    history.test_id,
+                    status,
+                    [self.test_run_cache.result_key]
+                    + [self.auto_test_history_groups_cache.get_result_key(group_name) for group_name in history.groups],
+                    (self.test_run_tree_cache.journal_key, entry),
+                )
+                for (history, _, status), entry in zip(transitions, entries)
+            ],
+            final_statuses=[StatusEnum.fail],
+        )
+        await self.test_run_channel.update_tree_many(
+            [
+                self.test_run_tree_cache.to_change(version, entry | {"old": old, "status": status})
+                for (_, old, status), entry, version in zip(transitions, entries, versions)
+                if version
+            ]
+        )
 
     async def finish_test_run_report(self):
         await self.update_test_run_status(status=TestRunStatus.success)
@@ -198,15 +324,25 @@ class Reporter:
             group_ids=test_run.group_ids,
         )
         try:
+            histories = await self.get_test_run_items(test_run.test_ids)
+            objects_in = [AutoTestHistoryDB(**history.model_dump()) for history in histories if history]
+            start = time.monotonic()
+            # The run and its tests are saved in one transaction
             async with self.db_session() as db:
-                await crud.test_run_history.create(db, obj_in=test_run_db)
-                for chunk in batch(test_run.test_ids, 5):
-                    auto_test_history_chunk = await self.get_test_run_items(chunk)
-                    objects_in = [AutoTestHistoryDB(**history.model_dump()) for history in auto_test_history_chunk]
-                    await crud.auto_test_history.create_multi(db, objects_in=objects_in)
+                await crud.test_run_history.create(db, obj_in=test_run_db, commit=False)
+                await crud.auto_test_history.create_multi(
+                    db, objects_in=objects_in, batch_size=auto_test_settings.HISTORY_DB_BATCH_SIZE
+                )
+            elapsed = time.monotonic() - start
+            print(
+                f"Test run {self.run_id} saved in db: {len(objects_in)} tests in {elapsed:.2f}s, "
+                f"{len(objects_in) / max(elapsed, 1e-6):.0f} rows/sec",
+                flush=True,
+            )
         except Exception as e:
             print(f"Exception during saving report in db: {e}")
         await self.pending_runs_cache.remove(test_run.root_folder, test_run.env_name, self.run_id)
+        await auto_test_run_keys.expire(run_id=self.run_id)
 
     @staticmethod
     def _calc_test_groups_and_update_test_run_groups(
@@ -238,7 +374,8 @@ class Reporter:
 
     async def get_pending_test_runs(self, root_folder: str, env: EnvEnum) -> List[TestRun]:
         pending_run_ids = await self.pending_runs_cache.get(root_folder, env)
-        return [await TestRunCache(run_id).get() for run_id in pending_run_ids]
+        test_runs = [await TestRunCache(run_id).get() for run_id in pending_run_ids]
+        return [test_run for test_run in test_runs if test_run]
 
     async def _get_test_runs(self, db: AsyncSession, root_folder: str, env: EnvEnum, n=20) -> List[TestRun]:
         test_runs = await self.get_pending_test_runs(root_folder, env)
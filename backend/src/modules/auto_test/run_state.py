@@ -0,0 +1,62 @@
+import asyncio
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Tuple
+
+from src.modules.auto_test.reporter import Reporter
+from src.schemas.auto_test.auto_test import AutoTestContext
+from src.schemas.auto_test.auto_test_history import StageEnum, StageResult, StatusEnum
+
+StageReport = Tuple[List[AutoTestContext], StageEnum, StageResult]
+
+
+class TestRunState:
+    """
+    Stage outcomes of the tests executed by this process, the stage checks of a run read them instead of Redis.
+    Stage results are reported to Redis by a writer task of the event loop in the order they are reached,
+    the reports queued while a batch is written are merged into the next one.
+    """
+
+    def __init__(self, reporter: Reporter):
+        self.reporter = reporter
+        self.stages: DefaultDict[str, Dict[StageEnum, StatusEnum]] = defaultdict(dict)
+        # Tests in a separate thread have their own event loop, a writer can't be shared between loops
+        self._writers: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Queue[StageReport], asyncio.Task]] = {}
+
+    def get_status(self, test_id: str, stage_name: StageEnum) -> StatusEnum:
+        return self.stages[test_id].get(stage_name, StatusEnum.pending)
+
+    def update_stage(self, test_contexts: List[AutoTestContext], stage_name: StageEnum, stage_result: StageResult):
+        reported_contexts = []
+        for test_context in test_contexts:
+            self.stages[test_context.id][stage_name] = stage_result.status
+            # The test goes on while the report waits, warnings of the next stage are not reported with this one
+            reported_contexts.append(test_context.model_copy(deep=True))
+            test_context.warnings = []
+        self._get_queue().put_nowait((reported_contexts, stage_name, stage_result))
+
+    def _get_queue(self) -> asyncio.Queue[StageReport]:
+        loop = asyncio.get_running_loop()
+        if not (writer := self._writers.get(loop)):
+            queue = asyncio.Queue()
+            writer = self._writers[loop] = queue, loop.create_task(self._write(queue))
+        return writer[0]
+
+    async def _write(self, queue: asyncio.Queue[StageReport]):
+        while True:
+            reports = [await queue.get()]
+            while not queue.empty():
+                reports.append(queue.get_nowait())
+            try:
+                await self.reporter.update_auto_test_stages(reports)
+            except Exception as e:
+                print(f"Exception during reporting stage results: {e}", flush=True)
+            finally:
+                for _ in reports:
+                    queue.task_done()
+
+    async def flush(self):
+        """Waits for the stage reports queued in the running event loop and stops its writer"""
+        if writer := self._writers.pop(asyncio.get_running_loop(), None):
+            queue, task = writer
+            await queue.join()
+            task.cancel()
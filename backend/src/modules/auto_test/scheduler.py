@@ -0,0 +1,76 @@
+import asyncio
+import heapq
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import AsyncIterator, DefaultDict, Deque, Hashable, List, Tuple
+
+
+class TestScheduler:
+    """
+    Admits the tests of a run with at most max_in_flight executed at once and max_in_flight_per_class of one class.
+    Waiting tests of a class are admitted longest historical duration first, and classes with waiting tests
+    take turns, so a big class doesn't hold back the others.
+    """
+
+    def __init__(self, max_in_flight: int, max_in_flight_per_class: int | None = None):
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_class = max_in_flight_per_class or max_in_flight
+        self.in_flight = 0
+        self.in_flight_by_class: Counter = Counter()
+        self.waiting: DefaultDict[Hashable, List[Tuple[float, int, asyncio.Future]]] = defaultdict(list)
+        # Classes with waiting tests in the order of their turns
+        self.turns: Deque[Hashable] = deque()
+        self._sequence = count()
+
+    def _can_admit(self, test_class: Hashable) -> bool:
+        return (
+            self.in_flight < self.max_in_flight and self.in_flight_by_class[test_class] < self.max_in_flight_per_class
+        )
+
+    def _admit(self, test_class: Hashable):
+        self.in_flight += 1
+        self.in_flight_by_class[test_class] += 1
+
+    def _release(self, test_class: Hashable):
+        self.in_flight -= 1
+        self.in_flight_by_class[test_class] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        blocked = 0
+        while self.turns and self.in_flight < self.max_in_flight and blocked < len(self.turns):
+            test_class = self.turns.popleft()
+            waiting = self.waiting[test_class]
+            while waiting and waiting[0][-1].cancelled():
+                heapq.heappop(waiting)
+            if not waiting:
+                del self.waiting[test_class]
+                continue
+            if self._can_admit(test_class):
+                self._admit(test_class)
+                heapq.heappop(waiting)[-1].set_result(None)
+                blocked = 0
+            else:
+                blocked += 1
+            self.turns.append(test_class)
+
+    @asynccontextmanager
+    async def slot(self, test_class: Hashable, duration: float = 0) -> AsyncIterator[None]:
+        # Waiting tests of the class are blocked by the class limit, so a new one can't skip ahead of them
+        if self._can_admit(test_class):
+            self._admit(test_class)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self.waiting[test_class], (-duration, next(self._sequence), future))
+            test_class in self.turns or self.turns.append(test_class)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(test_class)
+                raise
+        try:
+            yield
+        finally:
+            self._release(test_class)
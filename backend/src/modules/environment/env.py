@@ -6,6 +6,7 @@ import redis
 from redis.asyncio import Redis
 
 from src import crud
+from src.cache.client_cache import client_cache
 from src.core.config import settings
 from src.modules.environment.default import REPLACE_THIS, DefaultEnv
 from src.schemas.environment import EnvEnum, EnvOverwriteParam, EnvUserContext
@@ -43,7 +44,9 @@ class Environment(DefaultEnv):
         if self._primed:
             if found_overwrite := self._overwrite.get(name):
                 result, secure = found_overwrite.value, found_overwrite.secure
-            elif found_item := self._redis.hget(f"env:{self.env_name}", name):
+            elif found_item := client_cache.get(
+                f"env:{self.env_name}", name, lambda: self._redis.hget(f"env:{self.env_name}", name)
+            ):
                 item = EnvOverwriteParam(**json.loads(found_item.decode("UTF-8")))
                 result, secure = item.value, item.secure
             else:
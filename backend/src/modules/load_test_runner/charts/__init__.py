@@ -0,0 +1,5 @@
+from .base import BaseChart, chart_registry
+from .boxplot import BoxPlot
+from .counters import Apdex, ErrorRatio, RateCounter
+from .gauge import Gauge
+from .percentile import PercentileLine
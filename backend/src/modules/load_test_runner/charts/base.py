@@ -1,15 +1,40 @@
+import copy
+import inspect
+import json
 from abc import ABC
-from typing import Any
+from typing import Any, Dict, List, Type
 
+from src.cache.keys import hash_tag
 from src.cache.load_test.charts import LoadTestChartsCache
+from src.cache.load_test.public_event_channel import LoadTestPublicEventChannel
+from src.cache.write_buffer import RedisWriteBuffer
 from src.modules.load_test_runner.contexts import load_test_context
 
+chart_registry: Dict[str, Type["BaseChart"]] = {}
+
 
 class BaseChart(LoadTestChartsCache, ABC):
+    """Every concrete chart class is registered by its name, the name is used as the chart type in chart configs"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not inspect.isabstract(cls):
+            chart_registry[cls.__name__] = cls
+
     def __init__(self):
         self.name = None
+        self.buffer: RedisWriteBuffer | None = None
         super().__init__()
 
+    @staticmethod
+    def _get_prefix(load_test_id: str, execution_id: str, chart_name: str) -> str:
+        return f"load_test:{load_test_id}:{hash_tag(execution_id)}:charts:{chart_name}"
+
+    @classmethod
+    def get_keys(cls, load_test_id: str, execution_id: str, chart_name: str) -> List[str]:
+        """Keys written by the supervisor, the worker data is flushed through the buffer"""
+        return [f"{cls._get_prefix(load_test_id, execution_id, chart_name)}:current"]
+
     @staticmethod
     def _get_execution_id() -> str:
         context = load_test_context.get()
@@ -20,5 +45,43 @@ class BaseChart(LoadTestChartsCache, ABC):
         context = load_test_context.get()
         return context.load_test_id
 
+    @staticmethod
+    def _get_worker_id() -> str:
+        context = load_test_context.get()
+        return context.worker_id
+
     async def send_update(self, data: Any):
         await self.channel.update_task_chart_data(self._get_load_test_id(), self._get_execution_id(), self.name, data)
+
+    def reset(self):
+        pass
+
+    def for_aggregation(self) -> "BaseChart":
+        """Copy with the same settings and without worker state, used by the supervisor"""
+        chart = copy.copy(self)
+        chart.reset()
+        chart.buffer = None
+        chart.channel = LoadTestPublicEventChannel()
+        return chart
+
+    def attach_buffer(self, buffer: RedisWriteBuffer):
+        self.buffer = buffer
+        self.channel = LoadTestPublicEventChannel(buffer)
+        buffer.add_collector(self.flush)
+
+    async def flush(self):
+        """Called by the worker buffer before every flush to put the locally accumulated data into it"""
+        pass
+
+    async def aggregate(self, load_test_id: str, execution_id: str, chart_name: str):
+        """Called regularly by the supervisor to merge data flushed by all workers"""
+        pass
+
+    async def _save_point(self, load_test_id: str, execution_id: str, chart_name: str, x: str, values: List[float]):
+        prefix = self._get_prefix(load_test_id, execution_id, chart_name)
+        await self._update_key_value_in_dict(f"{prefix}:current", x, json.dumps(values))
+        await self.channel.update_task_chart_data(load_test_id, execution_id, chart_name, [x, *values])
+
+    async def get_chart_data(self, load_test_id: str, execution_id: str, chart_name: str) -> Dict[str, List[float]]:
+        data = await self._get_decoded_dict(f"{self._get_prefix(load_test_id, execution_id, chart_name)}:current")
+        return {key: json.loads(value) for key, value in data.items()}
@@ -1,44 +1,70 @@
-import json
-from typing import Dict, List, NamedTuple
+from typing import Dict, NamedTuple, Set
 
 import pendulum
 
 from src.modules.load_test_runner.charts.base import BaseChart
+from src.modules.load_test_runner.charts.histogram import LatencyHistogram
 
-ChartBox = NamedTuple("ChartBox", [("min", int), ("q1", int), ("median", int), ("q3", int), ("max", int)])
+ChartBox = NamedTuple(
+    "ChartBox",
+    [
+        ("min", float),
+        ("q1", float),
+        ("median", float),
+        ("q3", float),
+        ("max", float),
+        ("p99", float),
+        ("p999", float),
+    ],
+)
 
 
 class BoxPlot(BaseChart):
+    def __init__(self):
+        super().__init__()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.not_flushed: Set[str] = set()
+
     @staticmethod
-    def median(nums: List[int | float]) -> int | float:
-        n = len(nums)
-        if n % 2 == 0:
-            return (nums[n // 2 - 1] + nums[n // 2]) / 2
-        else:
-            return nums[n // 2]
-
-    def calculate_quartiles(self, data: List[int | float]) -> ChartBox:
-        sorted_data = sorted(data)
-        n = len(sorted_data)
-        if n == 1:
-            return ChartBox(data[0], data[0], data[0], data[0], data[0])
+    def calculate_box(histogram: LatencyHistogram) -> ChartBox:
         return ChartBox(
-            min=min(sorted_data),
-            q1=self.median(sorted_data[: n // 2]),
-            median=self.median(sorted_data),
-            q3=self.median(sorted_data[(n + 1) // 2 :]),
-            max=max(sorted_data),
+            min=histogram.min,
+            q1=histogram.quantile(0.25),
+            median=histogram.quantile(0.5),
+            q3=histogram.quantile(0.75),
+            max=histogram.max,
+            p99=histogram.quantile(0.99),
+            p999=histogram.quantile(0.999),
         )
 
+    def reset(self):
+        self.histograms = {}
+        self.not_flushed = set()
+
     async def update_box(self, value: int | float):
-        prefix = f"load_test:{self._get_load_test_id()}:{self._get_execution_id()}:charts:{self.name}"
         now_time = pendulum.now("UTC").format("YYYY-MM-DD HH:mm")
-        await self._add_to_list(f"{prefix}:data:{now_time}", value)
-        current_data = await self._get_list(f"{prefix}:data:{now_time}") or []
-        box_data = self.calculate_quartiles([float(x) for x in current_data])
-        await self._update_key_value_in_dict(f"{prefix}:current", now_time, json.dumps(box_data))
-        await self.send_update([now_time, *box_data])
-
-    async def get_chart_data(self, load_test_id: str, execution_id: str, chart_name: str) -> Dict[str, List[int]]:
-        data = await self._get_decoded_dict(f"load_test:{load_test_id}:{execution_id}:charts:{chart_name}:current")
-        return {key: json.loads(value) for key, value in data.items()}
+        if now_time not in self.histograms:
+            self.histograms[now_time] = LatencyHistogram()
+        self.histograms[now_time].record(float(value))
+        self.not_flushed.add(now_time)
+
+    async def flush(self):
+        prefix = self._get_prefix(self._get_load_test_id(), self._get_execution_id(), self.name)
+        worker_id = self._get_worker_id()
+        minutes, self.not_flushed = self.not_flushed, set()
+        for minute in minutes:
+            # Each worker overwrites its own cumulative histogram for the minute, so flushes are idempotent
+            await self.buffer.hset(f"{prefix}:sketch:{minute}", worker_id, self.histograms[minute].to_json())
+        minutes and await self.buffer.sadd(f"{prefix}:not_aggregated", *minutes)
+        now_time = pendulum.now("UTC").format("YYYY-MM-DD HH:mm")
+        for minute in [minute for minute in self.histograms if minute < now_time and minute not in self.not_flushed]:
+            del self.histograms[minute]
+
+    async def aggregate(self, load_test_id: str, execution_id: str, chart_name: str):
+        prefix = self._get_prefix(load_test_id, execution_id, chart_name)
+        for minute in sorted(await self._pop_from_set(f"{prefix}:not_aggregated", 1000)):
+            sketches = await self._get_dict(f"{prefix}:sketch:{minute}")
+            merged = LatencyHistogram.merge_all(LatencyHistogram.from_json(sketch) for sketch in sketches.values())
+            if not merged:
+                continue
+            await self._save_point(load_test_id, execution_id, chart_name, minute, list(self.calculate_box(merged)))
@@ -0,0 +1,94 @@
+import time
+from abc import abstractmethod
+from collections import Counter
+from typing import Dict, List
+
+from src.modules.load_test_runner.charts.base import BaseChart
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class CounterChart(BaseChart):
+    """
+    Counts events in interval buckets. Workers flush the counters with HINCRBY, so the Redis hash of a bucket
+    always holds the total of all workers and the supervisor only turns it into the chart values.
+    """
+
+    def __init__(self, interval: int = 1):
+        super().__init__()
+        self.interval = interval
+        self.counters: Dict[int, Counter] = {}
+
+    def reset(self):
+        self.counters = {}
+
+    def _increment(self, **values: int):
+        now = int(time.time())
+        bucket = now - now % self.interval
+        if bucket not in self.counters:
+            self.counters[bucket] = Counter()
+        self.counters[bucket].update(values)
+
+    @abstractmethod
+    def calculate(self, counters: Dict[str, int]) -> List[float]:
+        pass
+
+    async def flush(self):
+        prefix = self._get_prefix(self._get_load_test_id(), self._get_execution_id(), self.name)
+        counters, self.counters = self.counters, {}
+        for bucket, values in counters.items():
+            for field, value in values.items():
+                await self.buffer.hincrby(f"{prefix}:counters:{bucket}", field, value)
+        counters and await self.buffer.sadd(f"{prefix}:not_aggregated", *map(str, counters))
+
+    async def aggregate(self, load_test_id: str, execution_id: str, chart_name: str):
+        prefix = self._get_prefix(load_test_id, execution_id, chart_name)
+        for bucket in sorted(map(int, await self._pop_from_set(f"{prefix}:not_aggregated", 1000))):
+            counters = {k: int(v) for k, v in (await self._get_decoded_dict(f"{prefix}:counters:{bucket}")).items()}
+            x = time.strftime(TIME_FORMAT, time.gmtime(bucket))
+            await self._save_point(load_test_id, execution_id, chart_name, x, self.calculate(counters))
+
+
+class RateCounter(CounterChart):
+    """Events per second, e.g. RPS: [rate]"""
+
+    def add(self, count: int = 1):
+        self._increment(count=count)
+
+    def calculate(self, counters: Dict[str, int]) -> List[float]:
+        return [counters.get("count", 0) / self.interval]
+
+
+class ErrorRatio(CounterChart):
+    """Share of failed events: [error ratio, total]"""
+
+    def update(self, ok: bool):
+        self._increment(total=1, errors=int(not ok))
+
+    def calculate(self, counters: Dict[str, int]) -> List[float]:
+        total = counters.get("total", 0)
+        return [counters.get("errors", 0) / total if total else 0, total]
+
+
+class Apdex(CounterChart):
+    """
+    Application performance index for the threshold T: satisfied <= T < tolerating <= 4T < frustrated.
+    Score = (satisfied + tolerating / 2) / total: [score, total]
+    """
+
+    def __init__(self, threshold: float = 0.5, interval: int = 10):
+        super().__init__(interval)
+        self.threshold = threshold
+
+    def update(self, value: float):
+        if value <= self.threshold:
+            self._increment(total=1, satisfied=1)
+        elif value <= 4 * self.threshold:
+            self._increment(total=1, tolerating=1)
+        else:
+            self._increment(total=1)
+
+    def calculate(self, counters: Dict[str, int]) -> List[float]:
+        total = counters.get("total", 0)
+        score = (counters.get("satisfied", 0) + counters.get("tolerating", 0) / 2) / total if total else 1
+        return [score, total]
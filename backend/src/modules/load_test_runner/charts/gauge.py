@@ -0,0 +1,53 @@
+import json
+import time
+from typing import Dict, List, Set
+
+from src.modules.load_test_runner.charts.base import BaseChart
+from src.modules.load_test_runner.charts.counters import TIME_FORMAT
+
+
+class Gauge(BaseChart):
+    """Sampled value, e.g. queue size or open connections: [last, min, max] per interval over all workers"""
+
+    def __init__(self, interval: int = 1):
+        super().__init__()
+        self.interval = interval
+        # Bucket -> [time of the last sample, last, min, max]
+        self.buckets: Dict[int, List[float]] = {}
+        self.not_flushed: Set[int] = set()
+
+    def reset(self):
+        self.buckets = {}
+        self.not_flushed = set()
+
+    def set(self, value: float):
+        now = time.time()
+        bucket = int(now) - int(now) % self.interval
+        if state := self.buckets.get(bucket):
+            state[0], state[1], state[2], state[3] = now, value, min(state[2], value), max(state[3], value)
+        else:
+            self.buckets[bucket] = [now, value, value, value]
+        self.not_flushed.add(bucket)
+
+    async def flush(self):
+        prefix = self._get_prefix(self._get_load_test_id(), self._get_execution_id(), self.name)
+        worker_id = self._get_worker_id()
+        buckets, self.not_flushed = self.not_flushed, set()
+        for bucket in buckets:
+            await self.buffer.hset(f"{prefix}:state:{bucket}", worker_id, json.dumps(self.buckets[bucket]))
+        buckets and await self.buffer.sadd(f"{prefix}:not_aggregated", *map(str, buckets))
+        now = int(time.time())
+        current_bucket = now - now % self.interval
+        for bucket in [bucket for bucket in self.buckets if bucket < current_bucket and bucket not in self.not_flushed]:
+            del self.buckets[bucket]
+
+    async def aggregate(self, load_test_id: str, execution_id: str, chart_name: str):
+        prefix = self._get_prefix(load_test_id, execution_id, chart_name)
+        for bucket in sorted(map(int, await self._pop_from_set(f"{prefix}:not_aggregated", 1000))):
+            states = [json.loads(state) for state in (await self._get_dict(f"{prefix}:state:{bucket}")).values()]
+            if not states:
+                continue
+            last = max(states, key=lambda state: state[0])[1]
+            values = [last, min(state[2] for state in states), max(state[3] for state in states)]
+            x = time.strftime(TIME_FORMAT, time.gmtime(bucket))
+            await self._save_point(load_test_id, execution_id, chart_name, x, values)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Dict, Iterable
+
+
+class LatencyHistogram:
+    """
+    Mergeable log-bucketed histogram (DDSketch style).
+    Every quantile is returned with a bounded relative error and memory never exceeds max_buckets counters.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def _collapse(self):
+        # Merge the lowest buckets so that the high quantiles keep their accuracy
+        indexes = sorted(self.buckets)
+        to_collapse = indexes[: len(indexes) - self.max_buckets + 1]
+        target = to_collapse[-1]
+        self.buckets[target] = sum(self.buckets.pop(index) for index in to_collapse[:-1]) + self.buckets[target]
+
+    def record(self, value: float, count: int = 1):
+        if value < 0:
+            raise ValueError(f"Latency histogram accepts only non-negative values, got: {value}")
+        if value <= self.min_value:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: LatencyHistogram):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only histograms with the same relative accuracy can be merged")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got: {q}")
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        accumulated = self.zero_count
+        if rank < accumulated:
+            return self.min
+        for index in sorted(self.buckets):
+            accumulated += self.buckets[index]
+            if rank < accumulated:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def to_json(self) -> str:
+        offset = min(self.buckets) if self.buckets else 0
+        dense = [0] * (max(self.buckets) - offset + 1) if self.buckets else []
+        for index, count in self.buckets.items():
+            dense[index - offset] = count
+        return json.dumps(
+            {
+                "a": self.relative_accuracy,
+                "m": self.max_buckets,
+                "z": self.zero_count,
+                "n": self.count,
+                "s": self.sum,
+                "min": self.min if self.count else None,
+                "max": self.max if self.count else None,
+                "o": offset,
+                "b": dense,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> LatencyHistogram:
+        raw = json.loads(data)
+        histogram = cls(relative_accuracy=raw["a"], max_buckets=raw["m"])
+        histogram.buckets = {raw["o"] + i: count for i, count in enumerate(raw["b"]) if count}
+        histogram.zero_count = raw["z"]
+        histogram.count = raw["n"]
+        histogram.sum = raw["s"]
+        histogram.min = raw["min"] if raw["min"] is not None else math.inf
+        histogram.max = raw["max"] if raw["max"] is not None else -math.inf
+        return histogram
+
+    @classmethod
+    def merge_all(cls, histograms: Iterable[LatencyHistogram]) -> LatencyHistogram | None:
+        result = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(relative_accuracy=histogram.relative_accuracy, max_buckets=histogram.max_buckets)
+            result.merge(histogram)
+        return result
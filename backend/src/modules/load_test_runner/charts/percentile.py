@@ -0,0 +1,55 @@
+import time
+from typing import Dict, Sequence, Set
+
+from src.modules.load_test_runner.charts.base import BaseChart
+from src.modules.load_test_runner.charts.counters import TIME_FORMAT
+from src.modules.load_test_runner.charts.histogram import LatencyHistogram
+
+
+class PercentileLine(BaseChart):
+    """Percentiles over time from mergeable histograms: [p50, p90, p95, p99, p999] per interval by default"""
+
+    def __init__(self, percentiles: Sequence[float] = (50, 90, 95, 99, 99.9), interval: int = 10):
+        super().__init__()
+        self.percentiles = tuple(percentiles)
+        self.interval = interval
+        self.histograms: Dict[int, LatencyHistogram] = {}
+        self.not_flushed: Set[int] = set()
+
+    def reset(self):
+        self.histograms = {}
+        self.not_flushed = set()
+
+    def update(self, value: float):
+        now = int(time.time())
+        bucket = now - now % self.interval
+        if bucket not in self.histograms:
+            self.histograms[bucket] = LatencyHistogram()
+        self.histograms[bucket].record(float(value))
+        self.not_flushed.add(bucket)
+
+    async def flush(self):
+        prefix = self._get_prefix(self._get_load_test_id(), self._get_execution_id(), self.name)
+        worker_id = self._get_worker_id()
+        buckets, self.not_flushed = self.not_flushed, set()
+        for bucket in buckets:
+            # Each worker overwrites its own cumulative histogram for the bucket, so flushes are idempotent
+            await self.buffer.hset(f"{prefix}:sketch:{bucket}", worker_id, self.histograms[bucket].to_json())
+        buckets and await self.buffer.sadd(f"{prefix}:not_aggregated", *map(str, buckets))
+        now = int(time.time())
+        current_bucket = now - now % self.interval
+        for bucket in [
+            bucket for bucket in self.histograms if bucket < current_bucket and bucket not in self.not_flushed
+        ]:
+            del self.histograms[bucket]
+
+    async def aggregate(self, load_test_id: str, execution_id: str, chart_name: str):
+        prefix = self._get_prefix(load_test_id, execution_id, chart_name)
+        for bucket in sorted(map(int, await self._pop_from_set(f"{prefix}:not_aggregated", 1000))):
+            sketches = await self._get_dict(f"{prefix}:sketch:{bucket}")
+            merged = LatencyHistogram.merge_all(LatencyHistogram.from_json(sketch) for sketch in sketches.values())
+            if not merged:
+                continue
+            values = [merged.quantile(percentile / 100) for percentile in self.percentiles]
+            x = time.strftime(TIME_FORMAT, time.gmtime(bucket))
+            await self._save_point(load_test_id, execution_id, chart_name, x, values)
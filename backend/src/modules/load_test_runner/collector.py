@@ -9,9 +9,11 @@ from src import crud
 from src.cache.load_test.load_test_cache import LoadTestCache
 from src.cache.load_test.paths import LoadTestPathsCache
 from src.modules.base_collector import BaseCollector
-from src.modules.load_test_runner.charts.base import BaseChart
+from src.modules.load_test_runner.charts import BaseChart, chart_registry
 from src.modules.load_test_runner.config import settings
+from src.modules.load_test_runner.load_profile import LoadProfile
 from src.modules.load_test_runner.load_test_abs import LoadTestAbc
+from src.modules.load_test_runner.thresholds import Threshold
 from src.schemas.common import CollectObjectTypes
 from src.schemas.load_test.load_test import CollectedLoadTest, LoadTest, LoadTestConfig, LoadTestDB, RegisteredLoadTest
 from src.utils.dynamic_form import Field
@@ -31,13 +33,33 @@ class Collector(BaseCollector):
         return self.signature_to_params(load_test.name, signature_parameters)
 
     @staticmethod
-    def get_charts_config(test_class: Type[LoadTestAbc]) -> Dict[str, str]:
+    def get_charts(test_class: Type[LoadTestAbc]) -> Dict[str, BaseChart]:
         result = {}
         if config_cls := getattr(test_class, "Charts", None):
             for alias, field in inspect.getmembers(config_cls, predicate=lambda x: isinstance(x, BaseChart)):
-                result[alias] = field.__class__.__name__
+                result[alias] = field
+        return result
+
+    @staticmethod
+    def get_thresholds(test_class: Type[LoadTestAbc]) -> Dict[str, Threshold]:
+        result = {}
+        if config_cls := getattr(test_class, "Thresholds", None):
+            for alias, field in inspect.getmembers(config_cls, predicate=lambda x: isinstance(x, Threshold)):
+                result[alias] = field
         return result
 
+    @staticmethod
+    def get_charts_config(test_class: Type[LoadTestAbc]) -> Dict[str, str]:
+        return {
+            alias: chart.__class__.__name__
+            for alias, chart in Collector.get_charts(test_class).items()
+            if chart.__class__.__name__ in chart_registry
+        }
+
+    @staticmethod
+    def get_load_profile(test_class: Type[LoadTestAbc]) -> LoadProfile | None:
+        return getattr(test_class, "load_profile", None)
+
     @staticmethod
     def get_execution_config(test_class: Type[LoadTestAbc]) -> LoadTestConfig:
         result = {}
@@ -1,10 +1,20 @@
 from pathlib import Path
+from typing import Dict
 
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     ROOT_PATH: Path = Path("src/modules/load_test_runner/load_tests")
+    WORKER_BUFFER_FLUSH_INTERVAL: float = 0.25
+    WORKER_BUFFER_MAX_SIZE: int = 1000
+    WORKER_BUFFER_MAX_PENDING: int = 10000
+    CHARTS_AGGREGATE_INTERVAL: float = 1.0
+    TASK_STATUS_UPDATE_INTERVAL: float = 1.0
+    # Max execution duration in seconds -> task status history bucket in seconds when the execution is persisted
+    HISTORY_RESOLUTIONS: Dict[int, int] = {60 * 60: 10, 24 * 60 * 60: 60}
+    HISTORY_REDIS_RETENTION: int = 60 * 60
+    WORKER_PROCESS_UVLOOP: bool = False
 
 
 settings = Settings()
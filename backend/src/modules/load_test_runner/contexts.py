@@ -1,5 +1,5 @@
 from contextvars import ContextVar
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import ConfigDict
 
@@ -9,6 +9,9 @@ from src.schemas.environment import EnvUserContext
 class LoadTestExecutionContext(EnvUserContext):
     load_test_id: str
     execution_id: str
+    worker_id: str | None = None
+    # RequestMetrics of the worker, see modules.load_test_runner.metrics
+    request_metrics: Any = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
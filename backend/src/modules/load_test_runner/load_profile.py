@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class LoadStage(BaseModel):
+    duration: float = Field(ge=0, description="Stage duration in seconds")
+    target: float = Field(ge=0, description="Arrival rate (iterations per second) reached at the end of the stage")
+
+
+class LoadProfile(BaseModel):
+    """
+    Open-model load profile: iterations are started at the target arrival rate regardless of how fast
+    the system under test responds. Within a stage the rate changes linearly from the previous target to the
+    stage target, a zero duration stage changes the rate instantly.
+    """
+
+    start_rate: float = Field(0, ge=0)
+    stages: List[LoadStage]
+    max_lag: float = Field(1.0, gt=0, description="Arrivals that can't be started within this delay are dropped")
+    late_threshold: float = Field(0.05, ge=0, description="Arrivals started later than this are reported as late")
+
+    @property
+    def duration(self) -> float:
+        return sum(stage.duration for stage in self.stages)
+
+    def rate_at(self, elapsed: float) -> float | None:
+        """Total arrival rate for all workers, None when the profile is over"""
+        stage_start, stage_start_rate = 0.0, self.start_rate
+        for stage in self.stages:
+            if elapsed < stage_start + stage.duration:
+                progress = (elapsed - stage_start) / stage.duration
+                return stage_start_rate + (stage.target - stage_start_rate) * progress
+            stage_start, stage_start_rate = stage_start + stage.duration, stage.target
+        return None
+
+    @classmethod
+    def constant(cls, rate: float, duration: float, **kwargs) -> LoadProfile:
+        return cls(start_rate=rate, stages=[LoadStage(duration=duration, target=rate)], **kwargs)
+
+    @classmethod
+    def ramp(
+        cls, start_rate: float, end_rate: float, ramp_up: float, steady: float = 0, ramp_down: float = 0, **kwargs
+    ) -> LoadProfile:
+        stages = [LoadStage(duration=ramp_up, target=end_rate)]
+        steady and stages.append(LoadStage(duration=steady, target=end_rate))
+        ramp_down and stages.append(LoadStage(duration=ramp_down, target=0))
+        return cls(start_rate=start_rate, stages=stages, **kwargs)
+
+    @classmethod
+    def step(cls, rates: List[float], step_duration: float, **kwargs) -> LoadProfile:
+        stages = []
+        for rate in rates:
+            stages.extend([LoadStage(duration=0, target=rate), LoadStage(duration=step_duration, target=rate)])
+        return cls(stages=stages, **kwargs)
+
+    @classmethod
+    def spike(
+        cls, base_rate: float, spike_rate: float, duration: float, spike_at: float, spike_duration: float, **kwargs
+    ) -> LoadProfile:
+        stages = [
+            LoadStage(duration=spike_at, target=base_rate),
+            LoadStage(duration=0, target=spike_rate),
+            LoadStage(duration=spike_duration, target=spike_rate),
+            LoadStage(duration=0, target=base_rate),
+            LoadStage(duration=max(duration - spike_at - spike_duration, 0), target=base_rate),
+        ]
+        return cls(start_rate=base_rate, stages=stages, **kwargs)
@@ -1,4 +1,8 @@
 from abc import ABC, abstractmethod
+from typing import Dict
+
+from src.modules.load_test_runner import metrics
+from src.modules.load_test_runner.load_profile import LoadProfile
 
 
 class LoadTestAbc(ABC):
@@ -7,15 +11,37 @@ class LoadTestAbc(ABC):
     class Config:
         maximum_number_of_workers = 10
         concurrency_within_a_single_worker = 20
+        processes_within_a_single_worker = 1
+
+    # Set a profile to run the test in the open model: "iteration" is started at the profile arrival rate
+    # on concurrency_within_a_single_worker prepared instances instead of running "worker" in a closed loop.
+    load_profile: LoadProfile | None = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Intermediate base classes that leave setup or teardown abstract are not load tests themselves
+        if any(getattr(getattr(cls, name), "__isabstractmethod__", False) for name in LoadTestAbc.__abstractmethods__):
+            return
+        if cls.load_profile is None and cls.worker is LoadTestAbc.worker:
+            raise TypeError(f"{cls.__name__} must implement worker or set load_profile")
+        if cls.load_profile is not None and cls.iteration is LoadTestAbc.iteration:
+            raise TypeError(f"{cls.__name__} must implement iteration to use load_profile")
 
     @abstractmethod
     async def setup(self):
         pass
 
-    @abstractmethod
     async def worker(self):
         pass
 
+    async def iteration(self):
+        pass
+
     @abstractmethod
     async def teardown(self):
         pass
+
+    @staticmethod
+    def record(name: str, latency: float, ok: bool = True, size: int = 0, tags: Dict[str, str] | None = None):
+        """Records a request that is not made through the built-in clients, latency in seconds"""
+        metrics.record(name, latency, ok, size, tags)
@@ -0,0 +1,38 @@
+import asyncio
+import random
+import time
+
+from src.modules.load_test_runner.charts.boxplot import BoxPlot
+from src.modules.load_test_runner.load_profile import LoadProfile
+from src.modules.load_test_runner.load_test_abs import LoadTestAbc
+from src.modules.load_test_runner.thresholds import Threshold
+
+
+class OpenModelExampleLoadTest(LoadTestAbc):
+    """Iterations are started at 0 -> 50 RPS ramp, kept for 5 minutes and ramped down"""
+
+    class Config:
+        maximum_number_of_workers = 4
+        concurrency_within_a_single_worker = 25
+
+    class Charts:
+        iteration_time = BoxPlot()
+
+    class Thresholds:
+        iteration_p95 = Threshold("p95(iteration) < 600ms", window=60, delay=30)
+        iteration_errors = Threshold("error_rate(iteration) < 1%", window=60, abort=False)
+
+    load_profile = LoadProfile.ramp(start_rate=0, end_rate=50, ramp_up=60, steady=300, ramp_down=60)
+
+    async def setup(self):
+        pass
+
+    async def iteration(self):
+        start = time.monotonic()
+        await asyncio.sleep(random.uniform(0.05, 0.5))
+        duration = time.monotonic() - start
+        self.record("iteration", duration)
+        await self.Charts.iteration_time.update_box(duration * 1000)
+
+    async def teardown(self):
+        pass
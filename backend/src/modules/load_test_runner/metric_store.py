@@ -0,0 +1,120 @@
+from typing import Dict, List
+
+import pendulum
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src import crud
+from src.cache.lifecycle import load_test_execution_keys
+from src.cache.load_test.report import LoadTestReportCache
+from src.db.session import SessionLocal
+from src.modules.load_test_runner.config import settings
+from src.schemas.load_test.load_test_history import (
+    LoadTestHistoryDB,
+    LoadTestHistoryFull,
+    LoadTestMetrics,
+    LoadTestTaskStatusHistory,
+)
+
+TIME_FORMAT = "YYYY-MM-DD HH:mm:ss"
+
+
+class LoadTestMetricStore:
+    """
+    Live metrics are kept in Redis at full resolution. When an execution finishes they are downsampled,
+    persisted in the DB and the Redis keys of the execution are expired.
+    """
+
+    def __init__(self, load_test_id: str, db_session_maker: async_sessionmaker[AsyncSession] | None = None):
+        self.load_test_id = load_test_id
+        self.report_cache = LoadTestReportCache(load_test_id)
+        self.db_session = db_session_maker if db_session_maker else SessionLocal
+
+    @staticmethod
+    def get_resolution(duration: float) -> int:
+        for max_duration, resolution in sorted(settings.HISTORY_RESOLUTIONS.items()):
+            if duration <= max_duration:
+                return resolution
+        return max(settings.HISTORY_RESOLUTIONS.values())
+
+    @staticmethod
+    def get_bucket(time_string: str, resolution: int) -> str:
+        timestamp = pendulum.from_format(time_string, TIME_FORMAT, tz="UTC").int_timestamp
+        return pendulum.from_timestamp(timestamp - timestamp % resolution, tz="UTC").format(TIME_FORMAT)
+
+    def downsample(
+        self, history: Dict[str, LoadTestTaskStatusHistory], resolution: int
+    ) -> Dict[str, LoadTestTaskStatusHistory]:
+        # Task statuses are gauges, so the last sample of a bucket represents the whole bucket
+        result = {}
+        for time_string in sorted(history):
+            result[self.get_bucket(time_string, resolution)] = history[time_string]
+        return result
+
+    def downsample_metrics(self, metrics: LoadTestMetrics | None, resolution: int) -> LoadTestMetrics | None:
+        if not metrics:
+            return None
+        # Request counters are summed, latency is already stored per minute
+        throughput: Dict[str, Dict[str, List[int]]] = {}
+        for time_string, endpoints in metrics.throughput.items():
+            bucket = throughput.setdefault(self.get_bucket(time_string, resolution), {})
+            for name, values in endpoints.items():
+                bucket[name] = [a + b for a, b in zip(bucket.get(name, [0, 0, 0]), values)]
+        return LoadTestMetrics(throughput=throughput, latency=metrics.latency)
+
+    async def persist(self, history: LoadTestHistoryFull):
+        end_time = history.end_time or pendulum.now("UTC")
+        resolution = self.get_resolution((end_time - history.start_time).total_seconds())
+        history_in_db = LoadTestHistoryDB(
+            id=history.execution_id,
+            load_test_id=history.load_test_id,
+            params=history.params,
+            config_values=history.config_values,
+            chart_config=history.chart_config,
+            number_of_tasks=history.number_of_tasks,
+            status=history.status,
+            failure_reason=history.failure_reason[:1000] if history.failure_reason else None,
+            root_folder=history.root_folder,
+            environment=history.env_name,
+            workers=history.workers,
+            resolution=resolution,
+            task_status_history=self.downsample(history.task_status_history, resolution),
+            charts=history.charts,
+            arrivals=history.arrivals,
+            metrics=self.downsample_metrics(history.metrics, resolution),
+            user_id=history.user_id,
+            start_time=history.start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            end_time=end_time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        try:
+            async with self.db_session() as db:
+                await crud.load_test_history.create(db, obj_in=history_in_db)
+        except Exception as e:
+            print(f"Exception during saving load test report in db: {e}")
+            raise e
+        await load_test_execution_keys.expire(load_test_id=self.load_test_id, execution_id=history.execution_id)
+
+    async def load(self, execution_id: str) -> LoadTestHistoryFull | None:
+        async with self.db_session() as db:
+            history = await crud.load_test_history.get(db, execution_id)
+        if not history:
+            return None
+        return LoadTestHistoryFull(
+            execution_id=history.id,
+            load_test_id=history.load_test_id,
+            params=history.params,
+            config_values=history.config_values,
+            chart_config=history.chart_config,
+            number_of_tasks=history.number_of_tasks,
+            status=history.status,
+            failure_reason=history.failure_reason,
+            root_folder=history.root_folder,
+            env_name=history.environment,
+            user_id=history.user_id,
+            start_time=pendulum.instance(history.start_time, tz="UTC"),
+            end_time=pendulum.instance(history.end_time, tz="UTC") if history.end_time else None,
+            workers=history.workers,
+            task_status_history=history.task_status_history,
+            charts=history.charts,
+            arrivals=history.arrivals,
+            metrics=history.metrics,
+        )
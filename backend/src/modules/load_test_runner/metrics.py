@@ -0,0 +1,203 @@
+import json
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from src.cache.base import CacheBase
+from src.cache.keys import hash_tag
+from src.cache.load_test.public_event_channel import LoadTestPublicEventChannel
+from src.cache.write_buffer import RedisWriteBuffer
+from src.modules.load_test_runner.charts.histogram import LatencyHistogram
+from src.modules.load_test_runner.contexts import load_test_context
+from src.schemas.load_test.load_test_history import LoadTestMetrics
+
+SECOND_FORMAT = "%Y-%m-%d %H:%M:%S"
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+COUNTERS = ("count", "errors", "bytes")
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Path segments replaced by ":id" in endpoint names: numbers, uuids and long hex strings
+ID_SEGMENT = re.compile(r"\d+|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}")
+
+
+def metric_name(name: str, tags: Dict[str, str] | None = None) -> str:
+    if not tags:
+        return name
+    return f"{name}{{{','.join(f'{key}={value}' for key, value in sorted(tags.items()))}}}"
+
+
+def endpoint_path(uri: str) -> str:
+    """Path of the URI without the query, so requests to one endpoint with different ids share a metric"""
+    path = uri.split("?", 1)[0].split("#", 1)[0]
+    return "/".join(":id" if ID_SEGMENT.fullmatch(segment) else segment for segment in path.split("/"))
+
+
+def latency_summary(histogram: LatencyHistogram) -> List[float]:
+    """[min, p50, p90, p95, p99, max, mean]"""
+    return [histogram.min, *(histogram.quantile(q) for q in LATENCY_QUANTILES), histogram.max, histogram.mean]
+
+
+class RequestMetrics(CacheBase[Any, Any]):
+    """
+    Per endpoint request counters (per second) and latency histograms (per minute).
+    Workers accumulate them in memory and flush through the write buffer, the supervisor merges all workers.
+    """
+
+    def __init__(self, load_test_id: str, execution_id: str, worker_id: str | None = None):
+        self.load_test_id = load_test_id
+        self.execution_id = execution_id
+        self.worker_id = worker_id
+        self.prefix = f"load_test:{load_test_id}:{hash_tag(execution_id)}:metrics"
+        self.buffer: RedisWriteBuffer | None = None
+        self.channel = LoadTestPublicEventChannel()
+
+        self.counters: Dict[int, Dict[str, List[int]]] = {}
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.not_flushed: Set[str] = set()
+        self._last_second = 0
+        self._last_minute = ""
+
+        # Aggregated data of the last window seconds kept in memory by the supervisor to evaluate thresholds
+        self.window = 0
+        self.window_counters: Dict[int, Dict[str, List[int]]] = {}
+        self.window_histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        super().__init__()
+
+    def attach_buffer(self, buffer: RedisWriteBuffer):
+        self.buffer = buffer
+        buffer.add_collector(self.flush)
+
+    def get_keys(self) -> List[str]:
+        """Keys written by the supervisor, the per second and per minute keys of the workers are not included"""
+        return [f"{self.prefix}:{part}" for part in ("not_aggregated", "throughput", "latency")]
+
+    def record(self, name: str, latency: float, ok: bool = True, size: int = 0):
+        second = int(time.time())
+        if second != self._last_second:
+            self._last_second, self._last_minute = second, time.strftime(MINUTE_FORMAT, time.gmtime(second))
+        counters = self.counters.setdefault(second, {}).setdefault(name, [0, 0, 0])
+        counters[0] += 1
+        counters[1] += not ok
+        counters[2] += size
+        histograms = self.histograms.setdefault(self._last_minute, {})
+        if name not in histograms:
+            histograms[name] = LatencyHistogram()
+        histograms[name].record(max(latency, 0))
+        self.not_flushed.add(self._last_minute)
+
+    async def flush(self):
+        counters, self.counters = self.counters, {}
+        for second, endpoints in counters.items():
+            for name, values in endpoints.items():
+                for counter, value in zip(COUNTERS, values):
+                    value and await self.buffer.hincrby(f"{self.prefix}:counters:{second}", f"{name}:{counter}", value)
+        minutes, self.not_flushed = self.not_flushed, set()
+        for minute in minutes:
+            for name, histogram in self.histograms[minute].items():
+                # Cumulative histogram of the worker for the minute, so flushes are idempotent
+                field = json.dumps([self.worker_id, name])
+                await self.buffer.hset(f"{self.prefix}:sketch:{minute}", field, histogram.to_json())
+        not_aggregated = [f"s:{second}" for second in counters] + [f"m:{minute}" for minute in minutes]
+        not_aggregated and await self.buffer.sadd(f"{self.prefix}:not_aggregated", *not_aggregated)
+        current_minute = time.strftime(MINUTE_FORMAT, time.gmtime())
+        for minute in [minute for minute in self.histograms if minute < current_minute]:
+            del self.histograms[minute]
+
+    async def aggregate(self):
+        for item in sorted(await self._pop_from_set(f"{self.prefix}:not_aggregated", 1000)):
+            kind, _, value = item.partition(":")
+            if kind == "s":
+                await self._aggregate_second(int(value))
+            else:
+                await self._aggregate_minute(value)
+
+    async def _aggregate_second(self, second: int):
+        # Counters are incremented by every worker, so the hash always holds the running total of the second
+        data: Dict[str, List[int]] = {}
+        for field, value in (await self._get_decoded_dict(f"{self.prefix}:counters:{second}")).items():
+            name, _, counter = field.rpartition(":")
+            data.setdefault(name, [0, 0, 0])[COUNTERS.index(counter)] = int(value)
+        if self.window:
+            self.window_counters[second] = data
+        time_string = time.strftime(SECOND_FORMAT, time.gmtime(second))
+        await self._update_key_value_in_dict(f"{self.prefix}:throughput", time_string, json.dumps(data))
+        await self.channel.update_metrics(self.load_test_id, self.execution_id, "throughput", time_string, data)
+
+    async def _aggregate_minute(self, minute: str):
+        histograms: Dict[str, List[LatencyHistogram]] = {}
+        for field, sketch in (await self._get_dict(f"{self.prefix}:sketch:{minute}")).items():
+            _, name = json.loads(field)
+            histograms.setdefault(name, []).append(LatencyHistogram.from_json(sketch))
+        merged = {name: LatencyHistogram.merge_all(items) for name, items in histograms.items()}
+        if self.window:
+            self.window_histograms[minute] = merged
+        data = {name: latency_summary(histogram) for name, histogram in merged.items()}
+        await self._update_key_value_in_dict(f"{self.prefix}:latency", minute, json.dumps(data))
+        await self.channel.update_metrics(self.load_test_id, self.execution_id, "latency", minute, data)
+
+    @staticmethod
+    def _is_matched(name: str, metric: str | None) -> bool:
+        return metric is None or name == metric or name.startswith(f"{metric}{{")
+
+    def get_window_counters(self, seconds: int, metric: str | None = None) -> Tuple[int, int, int]:
+        """Requests and errors of the last seconds and the number of seconds the data covers"""
+        now = int(time.time())
+        for second in [second for second in self.window_counters if second <= now - self.window]:
+            del self.window_counters[second]
+        count = errors = 0
+        for second, endpoints in self.window_counters.items():
+            if second > now - seconds:
+                for name, values in endpoints.items():
+                    if self._is_matched(name, metric):
+                        count, errors = count + values[0], errors + values[1]
+        covered = now - min(self.window_counters, default=now) + 1
+        return count, errors, min(seconds, covered)
+
+    def get_window_histogram(self, seconds: int, metric: str | None = None) -> LatencyHistogram | None:
+        oldest_minute = time.strftime(MINUTE_FORMAT, time.gmtime(time.time() - max(seconds, self.window)))
+        for minute in [minute for minute in self.window_histograms if minute < oldest_minute]:
+            del self.window_histograms[minute]
+        since = time.strftime(MINUTE_FORMAT, time.gmtime(time.time() - seconds))
+        return LatencyHistogram.merge_all(
+            histogram
+            for minute, histograms in self.window_histograms.items()
+            if minute >= since
+            for name, histogram in histograms.items()
+            if self._is_matched(name, metric)
+        )
+
+    async def get_data(self) -> LoadTestMetrics | None:
+        throughput = await self._get_decoded_dict(f"{self.prefix}:throughput")
+        latency = await self._get_decoded_dict(f"{self.prefix}:latency")
+        if not throughput and not latency:
+            return None
+        return LoadTestMetrics(
+            throughput={key: json.loads(value) for key, value in throughput.items()},
+            latency={key: json.loads(value) for key, value in latency.items()},
+        )
+
+
+def record(name: str, latency: float, ok: bool = True, size: int = 0, tags: Dict[str, str] | None = None):
+    """Records one request of a load test, does nothing outside a load test worker"""
+    context = load_test_context.get(None)
+    if context and context.request_metrics:
+        context.request_metrics.record(metric_name(name, tags), latency, ok, size)
+
+
+class RequestMeasurement:
+    def __init__(self):
+        self.ok = True
+        self.size = 0
+
+
+@contextmanager
+def measure_request(name: str, tags: Dict[str, str] | None = None) -> Iterator[RequestMeasurement]:
+    """Records the duration of the block, the request is failed if the block raises. Cancelled requests are skipped"""
+    measurement = RequestMeasurement()
+    started = time.perf_counter()
+    try:
+        yield measurement
+    except Exception:
+        record(name, time.perf_counter() - started, False, measurement.size, tags)
+        raise
+    record(name, time.perf_counter() - started, measurement.ok, measurement.size, tags)
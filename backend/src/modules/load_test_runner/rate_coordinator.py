@@ -0,0 +1,30 @@
+from typing import Dict, Set
+
+from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
+from src.schemas.load_test.load_test_history import LoadTestWorkerStatusEnum
+
+
+class LoadTestRateCoordinator:
+    """
+    Splits the load profile arrival rate between working workers. Every worker refills a local token bucket
+    from its share, so the rate is enforced without a Redis round trip per iteration.
+    Shares are recomputed whenever a worker joins or leaves and published through the internal channel,
+    workers replay the channel from the beginning, so late joiners always get the latest shares.
+    """
+
+    def __init__(self, load_test_id: str, execution_id: str):
+        self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id)
+        self.active_workers: Set[str] = set()
+
+    def calculate_shares(self) -> Dict[str, float]:
+        return {worker_id: 1 / len(self.active_workers) for worker_id in sorted(self.active_workers)}
+
+    async def update_worker(self, worker_id: str, status: LoadTestWorkerStatusEnum):
+        active_workers = set(self.active_workers)
+        if status == LoadTestWorkerStatusEnum.working:
+            active_workers.add(worker_id)
+        else:
+            active_workers.discard(worker_id)
+        if active_workers != self.active_workers:
+            self.active_workers = active_workers
+            await self.internal_channel.update_rate_shares(self.calculate_shares())
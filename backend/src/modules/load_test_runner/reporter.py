@@ -1,19 +1,23 @@
-from typing import Dict, Type
+from typing import Dict
 
 from pendulum import now
 
+from src.cache.channel_hub import get_snapshot_key
+from src.cache.lifecycle import load_test_execution_keys
+from src.cache.load_test.arrivals import LoadTestArrivalsCache
 from src.cache.load_test.current import LoadTestCurrentCache
+from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
+from src.cache.load_test.public_event_channel import LoadTestPublicEventChannel
 from src.cache.load_test.report import LoadTestReportCache
 from src.cache.load_test.tasks import LoadTestTaskCache
 from src.cache.load_test.workers import LoadTestWorkerCache
 from src.models import User
-from src.modules.load_test_runner.charts.base import BaseChart
-from src.modules.load_test_runner.charts.boxplot import BoxPlot
+from src.modules.load_test_runner.charts import chart_registry
+from src.modules.load_test_runner.metric_store import LoadTestMetricStore
+from src.modules.load_test_runner.metrics import RequestMetrics
 from src.schemas.load_test.load_test import StartLoadTestRequest
 from src.schemas.load_test.load_test_history import LoadTestHistory, LoadTestHistoryFull
 
-chart_classes: Dict[str, Type[BaseChart]] = {"BoxPlot": BoxPlot}
-
 
 class LoadTestReporter:
     def __init__(self, load_test_id: str):
@@ -36,15 +40,38 @@ class LoadTestReporter:
             start_time=now(tz="UTC"),
         )
         await self.report_cache.create(execution_id, new_script_history)
+        await self.track_keys(execution_id, start_request.chart_config)
         await self.current_execution_cache.save(self.load_test_id, execution_id)
 
-    async def get_history(self, execution_id: str) -> LoadTestHistoryFull:
+    async def track_keys(self, execution_id: str, chart_config: Dict[str, str] | None):
+        """Keys of the execution written without the worker buffer, the buffer records the keys it writes"""
+        keys = [
+            self.report_cache.get_key(execution_id),
+            LoadTestArrivalsCache(self.load_test_id, execution_id).key,
+            LoadTestWorkerCache(self.load_test_id, execution_id).key,
+            *LoadTestTaskCache(self.load_test_id, execution_id).get_keys(),
+            LoadTestInternalEventChannel(self.load_test_id, execution_id).key,
+            channel_key := LoadTestPublicEventChannel.get_key(execution_id),
+            get_snapshot_key(channel_key),
+            *RequestMetrics(self.load_test_id, execution_id).get_keys(),
+        ]
+        for chart_name, chart_type in (chart_config or {}).items():
+            if chart_class := chart_registry.get(chart_type, None):
+                keys.extend(chart_class.get_keys(self.load_test_id, execution_id, chart_name))
+        await load_test_execution_keys.track(keys)
+
+    async def get_history(self, execution_id: str) -> LoadTestHistoryFull | None:
         load_test_history = await self.report_cache.get(execution_id)
+        if not load_test_history:
+            # Redis keys of finished executions are expired after they are persisted
+            return await LoadTestMetricStore(self.load_test_id).load(execution_id)
         workers = await LoadTestWorkerCache(self.load_test_id, execution_id).get_all()
         task_status_history = await LoadTestTaskCache(self.load_test_id, execution_id).get_status_history()
+        arrivals = await LoadTestArrivalsCache(self.load_test_id, execution_id).get()
+        metrics = await RequestMetrics(self.load_test_id, execution_id).get_data()
         charts_data = {}
         for chart_name, chart_type in load_test_history.chart_config.items():
-            if chart_class := chart_classes.get(chart_type, None):
+            if chart_class := chart_registry.get(chart_type, None):
                 charts_data[chart_name] = await chart_class().get_chart_data(
                     load_test_id=load_test_history.load_test_id, execution_id=execution_id, chart_name=chart_name
                 )
@@ -53,6 +80,8 @@ class LoadTestReporter:
             workers=workers,
             task_status_history=task_status_history,
             charts=charts_data,
+            arrivals=arrivals,
+            metrics=metrics,
         )
 
     async def get_last_history(self) -> LoadTestHistoryFull | None:
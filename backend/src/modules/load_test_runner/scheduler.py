@@ -0,0 +1,98 @@
+import asyncio
+import time
+import traceback
+from typing import Any, Callable, Coroutine, Generic, Set, TypeVar
+
+from src.modules.load_test_runner.load_profile import LoadProfile
+from src.schemas.load_test.load_test_history import LoadTestArrivalStatistic
+from src.utils.rate_limiter import TokenBucket
+
+Instance = TypeVar("Instance")
+
+RATE_UPDATE_INTERVAL = 0.1
+
+
+class ArrivalRateScheduler(Generic[Instance]):
+    """
+    Starts iterations at this worker's share of the profile arrival rate on a pool of prepared instances.
+    When every instance is busy, the arrival waits and its lag is measured (coordinated omission),
+    arrivals that can't be started within profile.max_lag are dropped instead of piling up.
+    """
+
+    def __init__(self, profile: LoadProfile, origin: float, share: float):
+        self.profile = profile
+        self.origin = origin
+        self.share = share
+        self.bucket = TokenBucket(rate=0, max_lag=profile.max_lag, poll_interval=RATE_UPDATE_INTERVAL)
+        self.statistic = LoadTestArrivalStatistic()
+        self.not_reported = LoadTestArrivalStatistic()
+
+    def _elapsed(self) -> float:
+        return time.time() - self.origin
+
+    def _count(self, counter: str, value: int = 1):
+        setattr(self.statistic, counter, getattr(self.statistic, counter) + value)
+        setattr(self.not_reported, counter, getattr(self.not_reported, counter) + value)
+
+    def take_not_reported(self) -> LoadTestArrivalStatistic:
+        result, self.not_reported = self.not_reported, LoadTestArrivalStatistic()
+        result.max_lag = self.statistic.max_lag
+        return result
+
+    def set_share(self, share: float):
+        self.share = share
+        self._update_rate()
+
+    def _update_rate(self):
+        self.bucket.set_rate((self.profile.rate_at(self._elapsed()) or 0) * self.share)
+
+    async def _update_rate_regularly(self):
+        while True:
+            self._update_rate()
+            await asyncio.sleep(RATE_UPDATE_INTERVAL)
+
+    def _count_overflow(self):
+        if dropped := self.bucket.take_overflow():
+            self._count("scheduled", dropped)
+            self._count("dropped", dropped)
+
+    async def _run_iteration(
+        self,
+        instances: asyncio.Queue[Instance],
+        instance: Instance,
+        iteration: Callable[[Instance], Coroutine[Any, Any, None]],
+    ):
+        try:
+            await iteration(instance)
+        except Exception:
+            self._count("failed")
+            traceback.print_exc()
+        finally:
+            instances.put_nowait(instance)
+
+    async def run(self, instances: asyncio.Queue[Instance], iteration: Callable[[Instance], Coroutine[Any, Any, None]]):
+        in_flight: Set[asyncio.Task] = set()
+        rate_updater = asyncio.create_task(self._update_rate_regularly())
+        try:
+            while self.profile.rate_at(self._elapsed()) is not None:
+                due = await self.bucket.acquire(timeout=RATE_UPDATE_INTERVAL)
+                self._count_overflow()
+                if due is None:
+                    continue
+                self._count("scheduled")
+                instance = await instances.get()
+                lag = time.monotonic() - due
+                if lag > self.profile.max_lag:
+                    self._count("dropped")
+                    instances.put_nowait(instance)
+                    continue
+                self._count("started")
+                if lag > self.profile.late_threshold:
+                    self._count("late")
+                self.statistic.max_lag = max(self.statistic.max_lag, lag)
+                task = asyncio.create_task(self._run_iteration(instances, instance, iteration))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            rate_updater.cancel()
+        in_flight and await asyncio.gather(*in_flight)
@@ -1,12 +1,23 @@
 import asyncio
+import time
+from datetime import datetime
 from typing import Dict, List
 
 import pendulum
 
+from src.cache.load_test.arrivals import LoadTestArrivalsCache
 from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
 from src.cache.load_test.public_event_channel import LoadTestPublicEventChannel
 from src.cache.load_test.report import LoadTestReportCache
 from src.cache.load_test.tasks import LoadTestTaskCache
+from src.modules.load_test_runner.charts.base import BaseChart
+from src.modules.load_test_runner.collector import Collector
+from src.modules.load_test_runner.config import settings
+from src.modules.load_test_runner.metric_store import LoadTestMetricStore
+from src.modules.load_test_runner.metrics import RequestMetrics
+from src.modules.load_test_runner.rate_coordinator import LoadTestRateCoordinator
+from src.modules.load_test_runner.reporter import LoadTestReporter
+from src.modules.load_test_runner.thresholds import LoadTestThresholds
 from src.schemas.load_test.load_test_events import LoadTestInternalEventTypeEnum, WorkerStatusInternalUpdate
 from src.schemas.load_test.load_test_history import (
     LoadTestHistoryUpdate,
@@ -25,12 +36,19 @@ class LoadTestSupervisor:
         self.internal_channel = LoadTestInternalEventChannel(load_test_id, execution_id)
         self.public_channel = LoadTestPublicEventChannel()
         self.task_cache = LoadTestTaskCache(load_test_id, execution_id)
+        self.arrivals_cache = LoadTestArrivalsCache(load_test_id, execution_id)
+        self.rate_coordinator = LoadTestRateCoordinator(load_test_id, execution_id)
+        self.request_metrics = RequestMetrics(load_test_id, execution_id)
 
         self.stop_event = asyncio.Event()
         self.supervisor_tasks: List[asyncio.Task] = []
 
         self.execution_status = LoadTestStatusEnum.pending
         self.workers: Dict[str, LoadTestWorkerStatusEnum] = {}
+        self.charts: Dict[str, BaseChart] = {}
+        self.thresholds = LoadTestThresholds({})
+        self.running_since: float | None = None
+        self.aborted = False
 
     def start_sync(self):
         asyncio.get_event_loop().run_until_complete(self.start())
@@ -41,10 +59,19 @@ class LoadTestSupervisor:
                 case LoadTestInternalEventTypeEnum.worker_status_update:
                     await self.handle_worker_status_update(message.data)
                 case LoadTestInternalEventTypeEnum.start_task_updates:
-                    self.supervisor_tasks.append(asyncio.create_task(self.task_status_regular_update()))
+                    if not self.supervisor_tasks:
+                        self.supervisor_tasks.append(asyncio.create_task(self.task_status_regular_update()))
+                        self.supervisor_tasks.append(asyncio.create_task(self.charts_regular_update()))
                     await asyncio.sleep(0)  # Start task immediately
 
     async def start(self):
+        load_test_report = await self.report_cache.get(self.execution_id)
+        load_test = await Collector().collect_load_test_by_id(self.load_test_id, load_test_report.root_folder)
+        # Charts are copied from the test class to aggregate with the same settings the workers use
+        for chart_name, chart in Collector.get_charts(load_test.callable).items():
+            self.charts[chart_name] = chart.for_aggregation()
+        self.thresholds = LoadTestThresholds(Collector.get_thresholds(load_test.callable))
+        self.request_metrics.window = self.thresholds.window
         try:
             async with asyncio.TaskGroup() as tg:
                 tg.create_task(self.wait_for_stop_event())
@@ -54,7 +81,14 @@ class LoadTestSupervisor:
         finally:
             for task in self.supervisor_tasks:
                 not task.done() and task.cancel()
-            await self.update_execution_status(LoadTestStatusEnum.finished)
+            await self.aggregate_charts()
+            await self.update_execution_status(
+                LoadTestStatusEnum.failed if self.thresholds.failed else LoadTestStatusEnum.finished,
+                end_time=pendulum.now("UTC"),
+                failure_reason=self.thresholds.get_failure_reason(),
+            )
+            history = await LoadTestReporter(self.load_test_id).get_history(self.execution_id)
+            await LoadTestMetricStore(self.load_test_id).persist(history)
 
     async def wait_for_stop_event(self):
         await self.stop_event.wait()
@@ -69,21 +103,59 @@ class LoadTestSupervisor:
             await self.public_channel.update_task_status_history(
                 self.load_test_id, self.execution_id, now_time, task_history
             )
+            if arrivals := await self.arrivals_cache.get():
+                await self.public_channel.update_arrival_statistic(self.load_test_id, self.execution_id, arrivals)
+            await self.check_thresholds()
             if all((status == LoadTestWorkerStatusEnum.finished for status in self.workers.values())):
                 self.execution_status = LoadTestStatusEnum.finished
                 self.stop_event.set()
-            await asyncio.sleep(3)
+            await asyncio.sleep(settings.TASK_STATUS_UPDATE_INTERVAL)
+
+    async def check_thresholds(self):
+        if not self.thresholds.thresholds or self.running_since is None:
+            return
+        if failed := self.thresholds.evaluate(self.request_metrics, time.monotonic() - self.running_since):
+            for reason in failed.values():
+                print(f"Load test {self.load_test_id} threshold failed: {reason}")
+            await self.update_execution_status(
+                self.execution_status, failure_reason=self.thresholds.get_failure_reason()
+            )
+            if self.thresholds.should_abort and not self.aborted:
+                self.aborted = True
+                await self.internal_channel.send_stop_workers_event()
+
+    async def charts_regular_update(self):
+        while True:
+            await self.aggregate_charts()
+            await asyncio.sleep(settings.CHARTS_AGGREGATE_INTERVAL)
+
+    async def aggregate_charts(self):
+        await asyncio.gather(
+            self.request_metrics.aggregate(),
+            *[
+                chart.aggregate(self.load_test_id, self.execution_id, chart_name)
+                for chart_name, chart in self.charts.items()
+            ],
+        )
 
     async def handle_worker_status_update(self, data: WorkerStatusInternalUpdate):
         await self.public_channel.update_worker_status(
             self.load_test_id, self.execution_id, data.worker_id, data.status
         )
         self.workers[data.worker_id] = data.status
+        await self.rate_coordinator.update_worker(data.worker_id, data.status)
         if self.execution_status == LoadTestStatusEnum.pending and data.status == LoadTestWorkerStatusEnum.working:
+            self.running_since = time.monotonic()
             await self.update_execution_status(LoadTestStatusEnum.running)
 
-    async def update_execution_status(self, new_status: LoadTestStatusEnum):
+    async def update_execution_status(
+        self, new_status: LoadTestStatusEnum, end_time: datetime | None = None, failure_reason: str | None = None
+    ):
         self.execution_status = new_status
         update = LoadTestHistoryUpdate(status=new_status)
+        if end_time:
+            update.end_time = end_time
+        if failure_reason:
+            update.failure_reason = failure_reason
         await self.report_cache.update(self.execution_id, update)
         await self.public_channel.update_execution_status(self.load_test_id, self.execution_id, update)
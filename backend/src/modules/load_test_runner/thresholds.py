@@ -0,0 +1,98 @@
+import math
+import operator
+import re
+from typing import Callable, Dict
+
+from src.modules.load_test_runner.metrics import RequestMetrics
+
+EXPRESSION = re.compile(
+    r"^\s*(?P<aggregation>p\d+(?:\.\d+)?|avg|min|max|error_rate|rps|count)\s*"
+    r"(?:\((?P<metric>[^)]*)\))?\s*"
+    r"(?P<operator><=|>=|<|>)\s*"
+    r"(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>ms|s|%)?\s*$"
+)
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+UNITS = {None: 1, "s": 1, "ms": 0.001, "%": 0.01}
+
+
+class Threshold:
+    """
+    Service level threshold checked by the supervisor over a sliding window of the request metrics:
+    "<aggregation>[(<metric>)] <operator> <value>[ms|s|%]", e.g. "p95(http_login) < 300ms" or "error_rate < 1%".
+    Aggregations: p<percentile>, avg, min, max (latency), error_rate, rps and count. Without a metric all requests
+    are used, a metric also matches all its tagged variants. Latency windows are rounded up to whole minutes.
+    """
+
+    def __init__(self, expression: str, window: int = 60, abort: bool = True, delay: int = 0, min_requests: int = 1):
+        if not (match := EXPRESSION.match(expression)):
+            raise ValueError(f"Invalid threshold expression: {expression}")
+        self.expression = expression.strip()
+        self.aggregation = match["aggregation"]
+        self.metric = match["metric"].strip() if match["metric"] else None
+        self.operator = OPERATORS[match["operator"]]
+        self.value = float(match["value"]) * UNITS[match["unit"]]
+        self.window = window
+        self.abort = abort
+        self.delay = delay
+        self.min_requests = min_requests
+
+    def observe(self, metrics: RequestMetrics) -> float | None:
+        count, errors, seconds = metrics.get_window_counters(self.window, self.metric)
+        if count < self.min_requests:
+            return None
+        match self.aggregation:
+            case "count":
+                return count
+            case "rps":
+                return count / seconds
+            case "error_rate":
+                return errors / count
+        histogram = metrics.get_window_histogram(self.window, self.metric)
+        if not histogram:
+            return None
+        match self.aggregation:
+            case "avg":
+                return histogram.mean
+            case "min":
+                return histogram.min
+            case "max":
+                return histogram.max
+        return histogram.quantile(float(self.aggregation[1:]) / 100)
+
+    def is_passed(self, value: float) -> bool:
+        return self.operator(value, self.value)
+
+
+class LoadTestThresholds:
+    def __init__(self, thresholds: Dict[str, Threshold]):
+        self.thresholds = thresholds
+        self.failed: Dict[str, str] = {}
+
+    @property
+    def window(self) -> int:
+        return max((threshold.window for threshold in self.thresholds.values()), default=0)
+
+    @property
+    def should_abort(self) -> bool:
+        return any(self.thresholds[name].abort for name in self.failed)
+
+    def evaluate(self, metrics: RequestMetrics, elapsed: float) -> Dict[str, str]:
+        """Checks thresholds that have not failed yet, returns the newly failed ones with the observed values"""
+        failed = {}
+        for name, threshold in self.thresholds.items():
+            if name in self.failed or elapsed < threshold.delay:
+                continue
+            value = threshold.observe(metrics)
+            if value is None or math.isnan(value) or threshold.is_passed(value):
+                continue
+            failed[name] = f"{name}: {threshold.expression} failed with {value:.4g} over {threshold.window}s"
+        self.failed.update(failed)
+        return failed
+
+    def get_failure_reason(self) -> str | None:
+        return "; ".join(self.failed.values()) if self.failed else None
@@ -1,19 +1,25 @@
 import asyncio
-import inspect
+import sys
 from collections import defaultdict
+from datetime import datetime
 from functools import partial
 from typing import Any, Callable, Coroutine, DefaultDict, Dict, List, Type
 
+from src.cache.load_test.arrivals import LoadTestArrivalsCache
 from src.cache.load_test.internal_event_channel import LoadTestInternalEventChannel
 from src.cache.load_test.report import LoadTestReportCache
 from src.cache.load_test.tasks import LoadTestTaskCache
 from src.cache.load_test.workers import LoadTestWorkerCache
+from src.cache.write_buffer import RedisWriteBuffer
 from src.modules.environment.env import env
-from src.modules.load_test_runner.charts.base import BaseChart
 from src.modules.load_test_runner.collector import Collector
+from src.modules.load_test_runner.config import settings
 from src.modules.load_test_runner.contexts import LoadTestExecutionContext, load_test_context
+from src.modules.load_test_runner.load_profile import LoadProfile
 from src.modules.load_test_runner.load_test_abs import LoadTestAbc
-from src.schemas.load_test.load_test import LoadTest
+from src.modules.load_test_runner.metrics import RequestMetrics
+from src.modules.load_test_runner.scheduler import ArrivalRateScheduler
+from src.schemas.load_test.load_test import LoadTest, LoadTestConfig
 from src.schemas.load_test.load_test_events import LoadTestInternalEventTypeEnum
 from src.schemas.load_test.load_test_history import (
     LoadTestTaskStatusEnum,
@@ -23,33 +29,66 @@ from src.schemas.load_test.load_test_history import (
 
 
 class LoadTestWorkerManager:
-    def __init__(self, load_test_id: str, execution_id: str, worker_id: str):
+    def __init__(
+        self, load_test_id: str, execution_id: str, worker_id: str, process_index: int | None = None, processes: int = 1
+    ):
         self.load_test_id = load_test_id
         self.execution_id = execution_id
         self.worker_id = worker_id
+        # A worker process shares the worker id with its parent and writes charts and arrivals under its own id
+        self.process_index = process_index
+        self.processes = processes
+        self.process_id = worker_id if process_index is None else f"{worker_id}:p{process_index}"
         self.collector = Collector()
         self.report_cache = LoadTestReportCache(load_test_id)
-        self.worker_cache = LoadTestWorkerCache(load_test_id, execution_id)
-        self.tasks_cache = LoadTestTaskCache(load_test_id, execution_id)
+        self.buffer = RedisWriteBuffer(
+            tick=settings.WORKER_BUFFER_FLUSH_INTERVAL,
+            max_size=settings.WORKER_BUFFER_MAX_SIZE,
+            max_pending=settings.WORKER_BUFFER_MAX_PENDING,
+        )
+        self.worker_cache = LoadTestWorkerCache(load_test_id, execution_id, self.buffer)
+        self.tasks_cache = LoadTestTaskCache(load_test_id, execution_id, self.buffer)
+        self.arrivals_cache = LoadTestArrivalsCache(load_test_id, execution_id, self.buffer)
         self.command_channel = LoadTestInternalEventChannel(load_test_id, execution_id)
+        self.request_metrics = RequestMetrics(load_test_id, execution_id, self.process_id)
+        self.request_metrics.attach_buffer(self.buffer)
 
         self.teardown_callbacks: DefaultDict[str, List[Callable[..., Coroutine[Any, Any, None]]]] = defaultdict(list)
+        self.scheduler: ArrivalRateScheduler[LoadTestAbc] | None = None
+        self.rate_share: float | None = None
+        self.child_processes: Dict[str, asyncio.subprocess.Process] = {}
 
     def start_sync(self):
         asyncio.get_event_loop().run_until_complete(self.start())
 
-    async def listen_for_stop_event(self):
+    async def listen_for_events(self):
         async for message in self.command_channel.listen():
             if message.type == LoadTestInternalEventTypeEnum.stop_all_workers:
                 raise WorkerFinishedException
             if message.type == LoadTestInternalEventTypeEnum.stop_specific_worker and message.data == self.worker_id:
                 print("stop_specific_worker", message.data, self.worker_id, flush=True)
                 raise WorkerFinishedException
+            if message.type == LoadTestInternalEventTypeEnum.rate_shares_update and self.worker_id in message.data:
+                self.update_rate_share(message.data[self.worker_id])
+
+    def update_rate_share(self, share: float):
+        self.rate_share = share
+        if self.scheduler:
+            self.scheduler.set_share(share / self.processes)
 
     async def start(self):
+        load_test_context.set(
+            LoadTestExecutionContext(
+                load_test_id=self.load_test_id,
+                execution_id=self.execution_id,
+                worker_id=self.process_id,
+                request_metrics=self.request_metrics,
+            )
+        )
         try:
             async with asyncio.TaskGroup() as tg:
-                tg.create_task(self.listen_for_stop_event())
+                tg.create_task(self.listen_for_events())
+                tg.create_task(self.buffer.run())
                 tg.create_task(self._start())
         except* WorkerFinishedException:
             pass
@@ -60,11 +99,17 @@ class LoadTestWorkerManager:
                     for task_id, callback_list in self.teardown_callbacks.items()
                 ]
             )
-            await self.worker_cache.update_status(self.worker_id, LoadTestWorkerStatusEnum.finished)
+            await self.join_child_processes()
+            if self.process_index is None:
+                await self.worker_cache.update_status(self.worker_id, LoadTestWorkerStatusEnum.finished)
+            await self.buffer.close()
 
     async def _start(self):
-        load_test_context.set(LoadTestExecutionContext(load_test_id=self.load_test_id, execution_id=self.execution_id))
         load_test_report = await self.report_cache.get(self.execution_id)
+        config_values = load_test_report.config_values
+        if self.process_index is None and config_values.processes_within_a_single_worker > 1:
+            await self.start_child_processes(config_values)
+            raise WorkerFinishedException
         load_test = await self.collector.collect_load_test_by_id(self.load_test_id, load_test_report.root_folder)
         env.prime_environment(
             env_name=load_test_report.env_name,
@@ -73,14 +118,94 @@ class LoadTestWorkerManager:
         )
         self.prime_charts_with_names(load_test.callable)
         input_params = self.collector.process_input_params(load_test.params, load_test_report.params)
-        concurrency = load_test_report.config_values.concurrency_within_a_single_worker
+        task_ids = self.get_task_ids(config_values.concurrency_within_a_single_worker)
+        if self.process_index is None:
+            await self.worker_cache.update_status(self.worker_id, LoadTestWorkerStatusEnum.working)
+            await self.tasks_cache.create_multi({task_id: LoadTestTaskStatusEnum.pending for task_id in task_ids})
+        else:
+            # Tasks are created by the parent worker, a process only tracks the statuses of its own part
+            self.tasks_cache.statuses.update({task_id: LoadTestTaskStatusEnum.pending for task_id in task_ids})
+        if load_profile := self.collector.get_load_profile(load_test.callable):
+            await self.start_open_model(load_test, input_params, task_ids, load_profile, load_test_report.start_time)
+        else:
+            await asyncio.gather(*[self.start_one_task(load_test, input_params, task_id) for task_id in task_ids])
+
+    def get_task_ids(self, concurrency: int) -> List[str]:
+        if self.process_index is None:
+            return [f"{self.worker_id}:{i}" for i in range(concurrency)]
+        return [f"{self.worker_id}:{i}" for i in range(self.process_index, concurrency, self.processes)]
+
+    async def start_child_processes(self, config_values: LoadTestConfig):
+        """Splits the worker tasks between processes with their own event loops to use more than one core"""
+        concurrency = config_values.concurrency_within_a_single_worker
+        processes = min(config_values.processes_within_a_single_worker, concurrency)
         await self.worker_cache.update_status(self.worker_id, LoadTestWorkerStatusEnum.working)
         await self.tasks_cache.create_multi(
             {f"{self.worker_id}:{i}": LoadTestTaskStatusEnum.pending for i in range(concurrency)}
         )
+        await self.spawn_child_processes(processes)
+        await self.join_child_processes()
+
+    def get_child_process_command(self, process_index: int, processes: int) -> List[str]:
+        return [
+            sys.executable,
+            "-m",
+            "src.modules.load_test_runner.worker_process",
+            self.load_test_id,
+            self.execution_id,
+            self.worker_id,
+            str(process_index),
+            str(processes),
+        ]
+
+    async def spawn_child_processes(self, processes: int):
+        # New interpreters instead of multiprocessing: a Celery prefork worker is daemonic and can't have children
+        for process_index in range(processes):
+            command = self.get_child_process_command(process_index, processes)
+            self.child_processes[f"{self.worker_id}:p{process_index}"] = await asyncio.create_subprocess_exec(*command)
+
+    async def join_child_processes(self):
+        # Processes listen for the stop events by themselves and finish after their teardowns
+        await asyncio.gather(*[process.wait() for process in self.child_processes.values()])
+        for name, process in self.child_processes.items():
+            if process.returncode:
+                print(f"Load test worker process {name} exited with code {process.returncode}", flush=True)
+        self.child_processes = {}
+
+    async def start_open_model(
+        self, load_test: LoadTest, input_params: Dict, task_ids: List[str], load_profile: LoadProfile, origin: datetime
+    ):
+        instances: asyncio.Queue[LoadTestAbc] = asyncio.Queue()
         await asyncio.gather(
-            *[self.start_one_task(load_test, input_params, f"{self.worker_id}:{i}") for i in range(concurrency)]
+            *[self.prepare_one_task(load_test, input_params, task_id, instances) for task_id in task_ids]
         )
+        self.scheduler = ArrivalRateScheduler(load_profile, origin.timestamp(), await self.get_rate_share())
+        self.buffer.add_collector(self.flush_arrival_statistic)
+        await self.scheduler.run(instances, lambda instance: instance.iteration())
+        raise WorkerFinishedException
+
+    async def get_rate_share(self) -> float:
+        if self.rate_share is not None:
+            return self.rate_share / self.processes
+        # The coordinator hasn't sent the shares yet, estimate them from the workers that are not finished
+        workers = await self.worker_cache.get_all()
+        active_workers = [
+            worker_id for worker_id, status in workers.items() if status != LoadTestWorkerStatusEnum.finished
+        ]
+        return 1 / max(len(active_workers), 1) / self.processes
+
+    async def flush_arrival_statistic(self):
+        not_reported = self.scheduler.take_not_reported()
+        if not_reported.scheduled or not_reported.failed:
+            await self.arrivals_cache.add(self.process_id, not_reported)
+
+    async def prepare_one_task(
+        self, load_test: LoadTest, input_params: Dict, task_id: str, instances: asyncio.Queue[LoadTestAbc]
+    ):
+        load_test_instance = load_test.callable(**input_params)
+        await self.run_one_task_setup(load_test_instance, task_id)
+        await self.tasks_cache.update_status(task_id, LoadTestTaskStatusEnum.working)
+        instances.put_nowait(load_test_instance)
 
     async def start_one_task(self, load_test: LoadTest, input_params: Dict, task_id: str):
         load_test_instance = load_test.callable(**input_params)
@@ -107,8 +232,8 @@ class LoadTestWorkerManager:
         await self.tasks_cache.update_status(task_id, LoadTestTaskStatusEnum.working)
         await load_test_instance.worker()
 
-    @staticmethod
-    def prime_charts_with_names(test_class: Type[LoadTestAbc]):
-        if config_cls := getattr(test_class, "Charts", None):
-            for alias, field in inspect.getmembers(config_cls, predicate=lambda x: isinstance(x, BaseChart)):
-                field.name = alias
+    def prime_charts_with_names(self, test_class: Type[LoadTestAbc]):
+        for alias, field in Collector.get_charts(test_class).items():
+            field.name = alias
+            field.reset()
+            field.attach_buffer(self.buffer)
@@ -0,0 +1,25 @@
+import argparse
+
+from src.modules.load_test_runner.config import settings
+from src.modules.load_test_runner.worker_manager import LoadTestWorkerManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a part of the tasks of a load test worker in its own process")
+    parser.add_argument("load_test_id")
+    parser.add_argument("execution_id")
+    parser.add_argument("worker_id")
+    parser.add_argument("process_index", type=int)
+    parser.add_argument("processes", type=int)
+    args = parser.parse_args()
+    if settings.WORKER_PROCESS_UVLOOP:
+        import uvloop
+
+        uvloop.install()
+    LoadTestWorkerManager(
+        args.load_test_id, args.execution_id, args.worker_id, args.process_index, args.processes
+    ).start_sync()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     ROOT_PATH: Path = Path("src/modules/script_runner/scripts")
+    # Redis keys of a finished execution expire after it, the logs are only kept in Redis
+    EXECUTION_REDIS_RETENTION: int = 60 * 60 * 24 * 30
 
 
 settings = Settings()
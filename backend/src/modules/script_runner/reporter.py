@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import crud
+from src.cache.lifecycle import script_execution_keys
 from src.cache.script_runner.script_event_channel import ScriptEventChannel
 from src.cache.script_runner.script_history import ScriptHistoryCache
 from src.cache.script_runner.script_history_log import ScriptHistoryLogCache
@@ -67,6 +68,13 @@ class Reporter:
             start_time=now(tz="UTC"),
         )
         await self.history_cache.create(execution_id, new_script_history)
+        await script_execution_keys.track(
+            [
+                self.history_cache.get_key(execution_id),
+                self.history_log_cache.get_key(execution_id),
+                self.event_channel.get_key(execution_id),
+            ]
+        )
         await self.last_script_cache.save(self.script_id, execution_id)
 
     async def add_log(self, execution_id: str, message: str):
@@ -198,6 +206,7 @@ class Reporter:
         await self.event_channel.update_status(self.script_id, execution_id, status)
         await self.event_channel.close_channel(execution_id)
         await self._save_script_report_in_db(execution_id)
+        await script_execution_keys.expire(script_id=self.script_id, execution_id=execution_id)
 
     async def finish_script_report_with_error(
         self, execution_id: str, error: Exception, context: ScriptExecutionContext, phase_name: str = ""
@@ -222,9 +231,11 @@ class Reporter:
         await self.event_channel.update_status(self.script_id, execution_id, ScriptStatusEnum.fail)
         await self.event_channel.close_channel(execution_id)
         await self._save_script_report_in_db(execution_id)
+        await script_execution_keys.expire(script_id=self.script_id, execution_id=execution_id)
 
-    async def get_script_history(self, execution_id: str) -> ScriptFullHistory:
-        script_history = await self.history_cache.get(execution_id)
+    async def get_script_history(self, execution_id: str) -> ScriptFullHistory | None:
+        if not (script_history := await self.history_cache.get(execution_id)):
+            return None
         log = await self.history_log_cache.get(execution_id)
         return ScriptFullHistory(**script_history.model_dump(), log=log)
 
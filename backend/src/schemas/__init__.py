@@ -1,3 +1,3 @@
-from .health import Version
+from .health import RedisKeyFamilyReport, Version
 from .token import Token, TokenPayload
 from .user import SignUpRequest, User, UserCreate, UserInDB, UserUpdate
@@ -59,6 +59,7 @@ class AutoTestHistoryDB(BaseModel):
     assets_path: Dict[str, Asset] = {}
     generated_params: Dict[str, str] = {}
     errors: Dict[StageEnum, List[TestError]] = {}
+    duration: float | None = None
 
 
 class AutoTestHistory(AutoTestHistoryDB):
@@ -96,11 +97,31 @@ class AutoTestItem(BaseModel):
 
 class TestResultTree(BaseModel):
     status: ResultTreeStatus
+    version: int | None = None
     first_level: List[str] | None = None
     groups: Dict[str, AutoTestGroup] | None = None
     items: Dict[str, AutoTestItem] | None = None
 
 
+class TestResultTreeChange(BaseModel):
+    version: int
+    items: Dict[str, StatusEnum] = {}
+    # Increments of the result by status of the groups
+    groups: Dict[str, Dict[StatusEnum, int]] = {}
+
+
+class TestResultTreeChanges(BaseModel):
+    status: ResultTreeStatus
+    version: int
+    changes: List[TestResultTreeChange] = []
+
+
+class CachedTestResultTree(BaseModel):
+    version: int = 0
+    tree: TestResultTree
+    item_groups: Dict[str, List[str]]
+
+
 class AutoTestStatistic(BaseModel):
     date: datetime
     status: StatusEnum
@@ -1,5 +1,18 @@
+from typing import List
+
 from pydantic import BaseModel
 
 
 class Version(BaseModel):
     version: str
+
+
+class RedisKeyFamilyReport(BaseModel):
+    name: str
+    patterns: List[str]
+    ttl: int | None
+    keys: int
+    sampled_keys: int
+    sampled_bytes: int
+    estimated_bytes: int
+    estimated_keys_without_ttl: int
@@ -6,22 +6,15 @@ from src.core.config import settings
 from src.modules.load_test_runner.load_test_abs import LoadTestAbc
 from src.schemas.common import CollectedObject
 from src.schemas.environment import EnvEnum, EnvOverwriteParam
+from src.schemas.load_test.load_test_config import LoadTestConfig
 from src.utils.dynamic_form import Field
 from src.utils.hash_funcs import md5
-from src.utils.pydantic_helper import UpdatableModel
 
 
 class RegisteredLoadTest(CollectedObject):
     callable: Type[LoadTestAbc]
 
 
-class LoadTestConfig(UpdatableModel):
-    maximum_number_of_workers: int
-    concurrency_within_a_single_worker: int
-
-    model_config = ConfigDict(extra="allow")
-
-
 class LoadTest(RegisteredLoadTest):
     params: Dict[str, Field]
     charts: Dict[str, str]
@@ -0,0 +1,11 @@
+from pydantic import ConfigDict
+
+from src.utils.pydantic_helper import UpdatableModel
+
+
+class LoadTestConfig(UpdatableModel):
+    maximum_number_of_workers: int
+    concurrency_within_a_single_worker: int
+    processes_within_a_single_worker: int = 1
+
+    model_config = ConfigDict(extra="allow")
@@ -1,9 +1,13 @@
 from enum import StrEnum
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from pydantic import BaseModel
 
-from src.schemas.load_test.load_test_history import LoadTestTaskStatusHistory, LoadTestWorkerStatusEnum
+from src.schemas.load_test.load_test_history import (
+    LoadTestArrivalStatistic,
+    LoadTestTaskStatusHistory,
+    LoadTestWorkerStatusEnum,
+)
 
 
 class LoadTestEventTypeEnum(StrEnum):
@@ -11,6 +15,8 @@ class LoadTestEventTypeEnum(StrEnum):
     worker = "worker"
     task = "task"
     chart = "chart"
+    arrival = "arrival"
+    metrics = "metrics"
 
 
 class LoadTestEvent(BaseModel):
@@ -41,6 +47,18 @@ class ChartMessage(BaseModel):
     data: Any
 
 
+class ArrivalMessage(BaseModel):
+    load_test_id: str
+    data: LoadTestArrivalStatistic
+
+
+class MetricsMessage(BaseModel):
+    load_test_id: str
+    kind: str
+    time_string: str
+    data: Dict[str, List[float]]
+
+
 class LoadTestExecutionEvent(LoadTestEvent):
     type: LoadTestEventTypeEnum = LoadTestEventTypeEnum.execution
     data: ExecutionMessage
@@ -61,6 +79,16 @@ class LoadTestChartEvent(LoadTestEvent):
     data: ChartMessage
 
 
+class LoadTestArrivalEvent(LoadTestEvent):
+    type: LoadTestEventTypeEnum = LoadTestEventTypeEnum.arrival
+    data: ArrivalMessage
+
+
+class LoadTestMetricsEvent(LoadTestEvent):
+    type: LoadTestEventTypeEnum = LoadTestEventTypeEnum.metrics
+    data: MetricsMessage
+
+
 # Internal command channel
 
 
@@ -69,6 +97,7 @@ class LoadTestInternalEventTypeEnum(StrEnum):
     stop_specific_worker = "stop_specific_worker"
     worker_status_update = "worker_status_update"
     start_task_updates = "start_task_updates"
+    rate_shares_update = "rate_shares_update"
 
 
 class LoadTestInternalEvent(BaseModel):
@@ -97,3 +126,8 @@ class LoadTestWorkerStatusUpdate(LoadTestInternalEvent):
 
 class LoadTestStartTaskUpdatesEvent(LoadTestInternalEvent):
     type: LoadTestInternalEventTypeEnum = LoadTestInternalEventTypeEnum.start_task_updates
+
+
+class LoadTestRateSharesUpdate(LoadTestInternalEvent):
+    type: LoadTestInternalEventTypeEnum = LoadTestInternalEventTypeEnum.rate_shares_update
+    data: Dict[str, float]
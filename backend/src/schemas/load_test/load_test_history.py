@@ -2,10 +2,10 @@ from datetime import datetime
 from enum import StrEnum
 from typing import Any, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 from src.schemas.environment import EnvEnum, EnvOverwriteParam
-from src.schemas.load_test.load_test import LoadTestConfig
+from src.schemas.load_test.load_test_config import LoadTestConfig
 from src.utils.pydantic_helper import all_optional
 
 
@@ -13,6 +13,7 @@ class LoadTestStatusEnum(StrEnum):
     pending = "pending"
     running = "running"
     finished = "finished"
+    failed = "failed"
 
 
 class LoadTestHistory(BaseModel):
@@ -31,6 +32,7 @@ class LoadTestHistory(BaseModel):
 
     start_time: datetime
     end_time: datetime | None = None
+    failure_reason: str | None = None
 
 
 @all_optional
@@ -60,6 +62,26 @@ class LoadTestTaskStatusHistory(BaseModel):
     finished: int = 0
 
 
+class LoadTestArrivalStatistic(BaseModel):
+    scheduled: int = 0
+    started: int = 0
+    late: int = 0
+    dropped: int = 0
+    failed: int = 0
+    max_lag: float = 0
+
+    @computed_field
+    @property
+    def coordinated_omission(self) -> bool:
+        return bool(self.late or self.dropped)
+
+
+class LoadTestMetrics(BaseModel):
+    # Time string -> endpoint -> [count, errors, bytes] for throughput, [min, p50, p90, p95, p99, max, mean] for latency
+    throughput: Dict[str, Dict[str, List[int]]] = {}
+    latency: Dict[str, Dict[str, List[float]]] = {}
+
+
 class WorkerFinishedException(BaseException):
     pass
 
@@ -72,3 +94,27 @@ class LoadTestHistoryFull(LoadTestHistory):
     workers: Dict[str, LoadTestWorkerStatusEnum]
     task_status_history: Dict[str, LoadTestTaskStatusHistory]
     charts: Dict[str, Any]
+    arrivals: LoadTestArrivalStatistic | None = None
+    metrics: LoadTestMetrics | None = None
+
+
+class LoadTestHistoryDB(BaseModel):
+    id: str
+    load_test_id: str
+    params: Dict[str, str | int | float | bool | List[str | int | float] | None] = {}
+    config_values: LoadTestConfig
+    chart_config: Dict[str, str] | None = None
+    number_of_tasks: int
+    status: LoadTestStatusEnum
+    failure_reason: str | None = None
+    root_folder: str
+    environment: EnvEnum
+    workers: Dict[str, LoadTestWorkerStatusEnum]
+    resolution: int
+    task_status_history: Dict[str, LoadTestTaskStatusHistory]
+    charts: Dict[str, Any]
+    arrivals: LoadTestArrivalStatistic | None = None
+    metrics: LoadTestMetrics | None = None
+    user_id: int
+    start_time: str
+    end_time: str | None = None
@@ -9,6 +9,11 @@ def run_tests(run_id: str):
     TestManager(run_id).run_all_sync()
 
 
+@celery_app.task(ignore_result=True)
+def run_test_shard(run_id: str, shard_index: int):
+    TestManager(run_id).run_shard_sync(shard_index)
+
+
 @celery_app.task(ignore_result=True)
 def start_load_task(load_test_id: str, execution_id: str, worker_id: str):
     LoadTestWorkerManager(load_test_id, execution_id, worker_id).start_sync()
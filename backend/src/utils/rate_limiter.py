@@ -1,4 +1,6 @@
 import asyncio
+import math
+import time
 from asyncio import Lock, Semaphore
 from typing import Dict, Literal, Optional
 
@@ -94,6 +96,66 @@ class RedisRateLimiter:
         await self.release(exc_type, exc_val, exc_tb)
 
 
+class TokenBucket:
+    """
+    In-process token bucket, the refill rate can be changed at any moment without a Redis round trip.
+    acquire returns the monotonic time at which the acquired token became available, so callers can measure lag.
+    Tokens not acquired within max_lag after they became available are lost and counted in overflow,
+    without max_lag they are kept until acquired.
+    """
+
+    def __init__(self, rate: float, max_lag: float | None = None, poll_interval: float = 0.1):
+        self.rate = rate
+        self.max_lag = max_lag
+        self.poll_interval = poll_interval
+        self.overflow = 0
+        self._next_due = time.monotonic()
+        self._rate_changed = asyncio.Event()
+
+    def set_rate(self, rate: float):
+        now = time.monotonic()
+        if self.rate <= 0:
+            self._next_due = max(self._next_due, now)
+        elif rate > 0:
+            self._next_due = now - (now - self._next_due) * self.rate / rate
+        if rate != self.rate:
+            self.rate = rate
+            self._rate_changed.set()
+
+    def _drop_overflow(self, now: float):
+        if self.max_lag is None:
+            return
+        if (dropped := math.ceil((now - self.max_lag - self._next_due) * self.rate)) > 0:
+            self.overflow += dropped
+            self._next_due += dropped / self.rate
+
+    def take_overflow(self) -> int:
+        dropped, self.overflow = self.overflow, 0
+        return dropped
+
+    async def acquire(self, timeout: Optional[float] = None) -> float | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._rate_changed.clear()
+            now = time.monotonic()
+            wait = self.poll_interval
+            if self.rate > 0:
+                self._drop_overflow(now)
+                if self._next_due <= now:
+                    due = self._next_due
+                    self._next_due += 1 / self.rate
+                    return due
+                wait = min(self._next_due - now, wait)
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                wait = min(deadline - now, wait)
+            try:
+                await asyncio.wait_for(self._rate_changed.wait(), wait)
+            except TimeoutError:
+                pass
+
+
 class LockManager(metaclass=Singleton):
     locks: Dict[str, SingleLock] = {}
 
@@ -0,0 +1,22 @@
+import os
+
+# Settings required at import time, the tests don't connect to these services
+for name, value in {
+    "PROJECT_NAME": "firefly",
+    "PROJECT_VERSION": "test",
+    "CELERY_BROKER": "redis://localhost",
+    "CELERY_BACKEND": "redis://localhost",
+    "REDIS_CACHE": "redis://localhost",
+    "DB_SERVER": "localhost",
+    "DB_USER": "firefly",
+    "DB_PASSWORD": "firefly",
+    "DB_NAME": "firefly",
+    "FIRST_USER_EMAIL": "admin@example.com",
+    "FIRST_USER_FULLNAME": "admin",
+    "FIRST_USER_PASSWORD": "admin",
+    "MINIO_HOST": "localhost",
+    "MINIO_BUCKET_NAME": "firefly",
+    "MINIO_ACCESS_KEY": "firefly",
+    "MINIO_SECRET_KEY": "firefly",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,42 @@
+import pytest
+
+from src.modules.load_test_runner.load_profile import LoadProfile
+from src.modules.load_test_runner.load_test_abs import LoadTestAbc
+
+
+class Hooks:
+    async def setup(self):
+        pass
+
+    async def teardown(self):
+        pass
+
+
+def test_closed_model_requires_worker():
+    with pytest.raises(TypeError, match="must implement worker"):
+
+        class NoWorker(Hooks, LoadTestAbc):
+            pass
+
+    class ClosedModel(Hooks, LoadTestAbc):
+        async def worker(self):
+            pass
+
+
+def test_open_model_requires_iteration():
+    with pytest.raises(TypeError, match="must implement iteration"):
+
+        class NoIteration(Hooks, LoadTestAbc):
+            load_profile = LoadProfile.constant(1, 1)
+
+    class OpenModel(Hooks, LoadTestAbc):
+        load_profile = LoadProfile.constant(1, 1)
+
+        async def iteration(self):
+            pass
+
+
+def test_abstract_base_classes_are_not_validated():
+    class SharedSetup(LoadTestAbc):
+        async def setup(self):
+            pass
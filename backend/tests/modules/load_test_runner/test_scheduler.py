@@ -0,0 +1,28 @@
+import asyncio
+import time
+
+import pytest
+
+from src.modules.load_test_runner.load_profile import LoadProfile
+from src.modules.load_test_runner.scheduler import ArrivalRateScheduler
+
+
+async def iteration(_: int):
+    pass
+
+
+async def run_constant_profile(rate: float, duration: float, instances: int) -> ArrivalRateScheduler:
+    scheduler = ArrivalRateScheduler(LoadProfile.constant(rate, duration), time.time(), share=1)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for instance in range(instances):
+        queue.put_nowait(instance)
+    await scheduler.run(queue, iteration)
+    return scheduler
+
+
+@pytest.mark.parametrize("rate", [1000, 5000])
+def test_free_instances_reach_the_arrival_rate(rate: float):
+    duration = 2
+    scheduler = asyncio.run(run_constant_profile(rate, duration, instances=10))
+    assert scheduler.statistic.started >= 0.99 * rate * duration
+    assert scheduler.statistic.dropped == 0
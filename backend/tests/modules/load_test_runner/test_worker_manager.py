@@ -0,0 +1,30 @@
+import asyncio
+import multiprocessing
+from multiprocessing.queues import Queue
+
+from src.modules.load_test_runner.worker_manager import LoadTestWorkerManager
+
+
+def start_child_processes(results: Queue):
+    async def start():
+        manager = LoadTestWorkerManager("load_test", "execution", "worker")
+        command = manager.get_child_process_command
+        # The real entrypoint only prints its usage, the processes don't connect to Redis
+        manager.get_child_process_command = lambda index, processes: [*command(index, processes), "--help"]
+        await manager.spawn_child_processes(3)
+        processes = list(manager.child_processes.values())
+        await manager.join_child_processes()
+        return [process.returncode for process in processes]
+
+    results.put((multiprocessing.current_process().daemon, asyncio.run(start())))
+
+
+def test_child_processes_start_from_daemonic_process():
+    # A Celery prefork worker is a daemonic process like this one
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    parent = context.Process(target=start_child_processes, args=(results,), daemon=True)
+    parent.start()
+    parent.join(60)
+    assert results.get(timeout=1) == (True, [0, 0, 0])
+    assert parent.exitcode == 0
@@ -73,7 +73,7 @@ export const LoadTestExecutionButton = ({
             )}
             <RunButton
                 text={'Stop load'}
-                isDisabled={currentExecutionStatus === 'finished'}
+                isDisabled={currentExecutionStatus === 'finished' || currentExecutionStatus === 'failed'}
                 runCallback={stopLoadTest}
                 isSuccess={false}
             />
@@ -4,4 +4,7 @@ export const api = {
   async fetch(testRunId) {
     return apiClient.get(`/autotest/test_run/tree/${testRunId}`);
   },
+  async fetchChanges(testRunId, since) {
+    return apiClient.get(`/autotest/test_run/tree/${testRunId}/changes/`, { params: { since } });
+  },
 };
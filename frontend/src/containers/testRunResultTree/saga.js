@@ -1,10 +1,18 @@
 import { fork, takeLatest, call, put, select} from 'redux-saga/effects';
-import {actions, testRunTreeStatusSelector} from './slice';
+import {actions, testRunTreeStatusSelector, testRunTreeVersionSelector} from './slice';
 import { api } from './api';
 
 function* fetchTestRunTree({ payload: { testRunId } }) {
   const status = yield select(testRunTreeStatusSelector, testRunId);
-  if (status !== 'finished') {
+  const version = yield select(testRunTreeVersionSelector, testRunId);
+  if (status !== 'finished' && version !== undefined && version !== null) {
+    try {
+      const { data } = yield call(api.fetchChanges, testRunId, version);
+      yield put(actions.applyChanges({testRunId, data}));
+    } catch (e) {
+      yield put(actions.fetchError({testRunId, e}));
+    }
+  } else if (status !== 'finished') {
     yield put(actions.fetchStart({testRunId}));
     try {
       const { data } = yield call(api.fetch, testRunId);
@@ -31,6 +31,23 @@ export const testRunTreeSlice = createSlice({
       state.testRuns[testRunId] = data;
       state.testRuns[testRunId]['fetchStatus'] = 'success';
     },
+    applyChanges: (state, { payload: { testRunId, data } }) => {
+      const testRun = state.testRuns[testRunId];
+      for (const change of data.changes) {
+        if (change.version <= testRun.version) continue;
+        for (const [itemId, status] of Object.entries(change.items)) {
+          testRun.items[itemId].status = status;
+        }
+        for (const [groupId, increments] of Object.entries(change.groups)) {
+          const resultByStatus = testRun.groups[groupId].resultByStatus;
+          for (const [status, value] of Object.entries(increments)) {
+            resultByStatus[status] = (resultByStatus[status] || 0) + value;
+          }
+        }
+        testRun.version = change.version;
+      }
+      testRun.status = data.status;
+    },
     fetchError: (state, { payload: { testRunId, e } }) => {
       state.testRuns[testRunId] = { fetchStatus: 'error' };
       console.log('Fetch test run tree error', e);
@@ -58,6 +75,11 @@ export function useTestRunTreeSelector(testRunId, selector) {
   );
 }
 
+export function testRunTreeVersionSelector(state, testRunId) {
+  return (state[testRunTreeSlice.name].testRuns[testRunId] || initialStatistic)
+    .version;
+}
+
 export function testRunTreeStatusSelector(state, testRunId) {
   return (state[testRunTreeSlice.name].testRuns[testRunId] || initialStatistic)
     .status;
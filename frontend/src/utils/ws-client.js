@@ -15,7 +15,14 @@ export class WebSocketManager {
         return eventChannel((emit) => {
             const createWs = () => {
                 this.ws = createWebSocketConnection(uri);
-                this.ws.onmessage = (message) => emit(message.data);
+                this.ws.onmessage = (message) => {
+                    // The server coalesces events into frames, a frame of several events is a JSON array
+                    if (message.data.startsWith('[')) {
+                        JSON.parse(message.data).forEach((event) => emit(JSON.stringify(event)));
+                    } else {
+                        emit(message.data);
+                    }
+                };
                 this.ws.onclose = (e) => {
                     if (e.code === 1005) {
                         emit(END);